@@ -0,0 +1,66 @@
+"""Benchmark of the concurrent weather fetcher.
+
+A local stub of the Weather API is started in a background thread and the weather is
+fetched for the given numbers of geo cells with the given concurrency limits. The stub
+answers each request after the configured latency, which simulates the round trip to
+the real API.
+
+Usage (the configuration is read from the `.env` file, like in the app):
+
+    poetry run python benchmarks/weather_fetcher.py
+    poetry run python benchmarks/weather_fetcher.py --latency 0.1 --concurrency 1 10
+"""
+import argparse
+import os
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "todo_app.core.settings.default")
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from todo_app.system.document_store import SingletonMeta  # noqa: E402
+from todo_app.system.weather.api import fetch_weather  # noqa: E402
+from todo_app.system.weather.cells import GeoCell  # noqa: E402
+from todo_app.system.weather.client import WeatherClient  # noqa: E402
+from todo_app.system.weather.fetcher import fetch_weather_for_cells  # noqa: E402
+from todo_app.system.weather.stub_server import StubWeatherServer  # noqa: E402
+
+
+def main():
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--cells", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    server = StubWeatherServer(("127.0.0.1", 0), latency=args.latency)
+    server.start()
+    settings.WEATHER_API_URL = server.url
+
+    print(f"Stub latency: {args.latency * 1000:.0f} ms")
+    print(f"{'cells':>8} {'concurrency':>12} {'time [s]':>10} {'cells/s':>10}")
+
+    for count in args.cells:
+        cells = [
+            GeoCell(key=str(index), lat=index / 100, lon=0.0) for index in range(count)
+        ]
+        for concurrency in args.concurrency:
+            settings.WEATHER_FETCH_CONCURRENCY = concurrency
+            # The size of the connection pool depends on the concurrency limit, so a
+            # new client is created for each run.
+            SingletonMeta._instances.pop(WeatherClient, None)
+            start_time = time.perf_counter()
+            results = fetch_weather_for_cells(cells, fetch_weather)
+            elapsed = time.perf_counter() - start_time
+            assert all(results.values()), "Some requests have failed."
+            throughput = count / elapsed
+            print(f"{count:>8} {concurrency:>12} {elapsed:>10.2f} {throughput:>10.1f}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark of the memory used to find the geo cells with stale weather.
+
+The given numbers of active tasks are created in the document store and the peak memory
+allocated while grouping them into geo cells is measured with tracemalloc, both for
+full documents read through a caching queryset and for the projected cursor of the
+stale cells and the tasks counted by the document store for each batch of them, used
+by the weather refresh. The created tasks and cells are deleted afterwards.
+
+Usage (the configuration is read from the `.env` file, like in the app):
+
+    poetry run python benchmarks/weather_refresh_memory.py
+    poetry run python benchmarks/weather_refresh_memory.py --tasks 10000 100000
+"""
+import argparse
+import os
+import random
+import tracemalloc
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "todo_app.core.settings.default")
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from todo_app.system.weather.cells import GeoCell, get_cell_key  # noqa: E402
+from todo_app.system.weather.persistence import create_weather_cells  # noqa: E402
+from todo_app.system.weather.refresh import get_stale_cells  # noqa: E402
+from todo_app.todo.models import Location, Task, WeatherCell  # noqa: E402
+
+
+def get_stale_cells_with_documents() -> dict[str, GeoCell]:
+    """Return the geo cells of all active tasks, reading the full documents."""
+    result = {}
+    precision = settings.WEATHER_CELL_PRECISION
+    tasks = Task.objects.filter(marked_as_done_at="").limit(
+        settings.WEATHER_REFRESH_MAX_TASKS
+    )
+
+    for task in tasks:
+        key = get_cell_key(task.location.lat, task.location.lon, precision)
+        if key not in result:
+            result[key] = GeoCell(key=key, lat=task.location.lat, lon=task.location.lon)
+        result[key].tasks += 1
+
+    return result
+
+
+def measure(func) -> float:
+    """Call the function and return the peak of the allocated memory in MiB."""
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def main():
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--tasks", type=int, nargs="+", default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    now = timezone.now()
+
+    print(f"{'tasks':>8} {'documents [MiB]':>16} {'projected [MiB]':>16}")
+
+    for count in args.tasks:
+        settings.WEATHER_REFRESH_MAX_TASKS = count
+        locations = [
+            (rng.uniform(-60, 60), rng.uniform(-180, 180)) for _ in range(count)
+        ]
+        cell_keys = [
+            get_cell_key(lat, lon, settings.WEATHER_CELL_PRECISION)
+            for lat, lon in locations
+        ]
+        # The cells of the tasks have never been refreshed, so their weather is stale.
+        task_ids = Task.objects.insert(
+            [
+                Task(
+                    content=f"Benchmark task {index} " + "x" * 200,
+                    location=Location(lat=lat, lon=lon, label="Benchmark location"),
+                    cell_key=cell_key,
+                    created_at=now,
+                )
+                for index, ((lat, lon), cell_key) in enumerate(
+                    zip(locations, cell_keys)
+                )
+            ],
+            load_bulk=False,
+        )
+        # The tasks are inserted in bulk, so their cells are not created on save.
+        create_weather_cells(cell_keys)
+
+        try:
+            documents = measure(get_stale_cells_with_documents)
+            projected = measure(get_stale_cells)
+        finally:
+            Task.objects.filter(id__in=task_ids).delete()
+            WeatherCell.objects.filter(key__in=cell_keys).delete()
+
+        print(f"{count:>8} {documents:>16.1f} {projected:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
+from unittest.mock import MagicMock, patch
+
 import pytest
+from mongomock import aggregate
+from redis import Redis
+from todo_app.system.cache import CacheConnection
 from todo_app.system.document_store import DocumentStoreConnection
-from todo_app.todo.models import Location, Task, Weather
+from todo_app.todo.models import Location, Task, Weather, WeatherCell
 from django.utils import timezone
 
 
@@ -12,13 +17,67 @@ def clear_document_store():
         db.drop_collection(name)
 
 
+def _handle_union_with_stage(in_collection, database, options):
+    """Append the documents read by the pipeline from the other collection."""
+    documents = list(database.get_collection(options["coll"]).find())
+    pipeline = options.get("pipeline", [])
+    return in_collection + list(
+        aggregate.process_pipeline(documents, database, pipeline, None)
+    )
+
+
+@pytest.fixture(autouse=True, scope="session")
+def union_with_stage():
+    """Add the `$unionWith` stage, which is not implemented by mongomock."""
+    with patch.dict(
+        aggregate._PIPELINE_HANDLERS, {"$unionWith": _handle_union_with_stage}
+    ):
+        yield
+
+
+@pytest.fixture(autouse=True, name="cache_client")
+def cache_client_fixture():
+    """Replace the cache client with a mock, so the tests don't require Redis.
+
+    By default, the cache is empty and all the locks can be acquired. Transactions are
+    executed against an empty cache too.
+    """
+
+    def transaction(func, *watches, **kwargs):
+        pipe = MagicMock()
+        pipe.hmget.side_effect = lambda key, *fields: [None] * len(fields)
+        pipe.time.return_value = (0, 0)
+        return func(pipe)
+
+    client = MagicMock(spec=Redis)
+    client.get.return_value = None
+    client.set.return_value = True
+    client.mget.return_value = [None, None]
+    client.hmget.return_value = [None, None]
+    client.transaction.side_effect = transaction
+
+    with patch.object(CacheConnection(), "client", client):
+        yield client
+
+
+def _create_task(**kwargs) -> Task:
+    """Create a task and the geo cell with sample weather it belongs to."""
+    task = Task.objects.create(**kwargs)
+    WeatherCell(
+        key=task.cell_key,
+        lat=task.location.lat,
+        lon=task.location.lon,
+        weather=Weather(main="Snow", temperature=0.0),
+    ).save()
+    return task
+
+
 @pytest.fixture(name="task")
 def task_fixture():
     """Create and return a sample task."""
-    return Task.objects.create(
+    return _create_task(
         content="Sample task",
         location=Location(lat=10, lon=20, label="Sample location"),
-        weather=Weather(main="Snow", temperature=0.0),
     )
 
 
@@ -26,10 +85,9 @@ def task_fixture():
 def create_active_tasks():
     """Create sample active tasks."""
     for index in range(5):
-        Task.objects.create(
+        _create_task(
             content=f"Sample task {index}",
             location=Location(lat=index, lon=index, label=f"Location {index}"),
-            weather=Weather(main="Snow", temperature=0.0),
         )
 
 
@@ -37,9 +95,8 @@ def create_active_tasks():
 def create_finished_tasks():
     """Create sample active tasks."""
     for index in range(5):
-        Task.objects.create(
+        _create_task(
             content=f"Finished task {index}",
             marked_as_done_at=timezone.now(),
             location=Location(lat=index, lon=index, label=f"Location {index}"),
-            weather=Weather(main="Snow", temperature=0.0),
         )
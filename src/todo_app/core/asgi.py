@@ -2,9 +2,11 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from todo_app.core.middleware import DisconnectMiddleware
+
 os.environ.setdefault(
     "DJANGO_SETTINGS_MODULE",
     "todo_app.core.settings.default",
 )
 
-application = get_asgi_application()
+application = DisconnectMiddleware(get_asgi_application())
@@ -1,9 +1,12 @@
 from typing import Literal
 
-from pydantic import DirectoryPath, Field, SecretStr, field_validator
+from pydantic import DirectoryPath, Field, SecretStr, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pytz import all_timezones
 
+# Number of seconds between the reloads of the task list by the browser.
+TASK_LIST_RELOAD_INTERVAL = 60
+
 
 class AppConfig(BaseSettings):
     """App configuration.
@@ -17,6 +20,9 @@ class AppConfig(BaseSettings):
     secret_key: SecretStr
     static_files_dir: DirectoryPath
     time_zone: str = Field("Europe/London")
+    task_page_size: int = Field(20, ge=1)
+    task_list_version_timeout: int = Field(300, ge=1)
+    task_events: bool = Field(False)
 
     database_host: str
     database_port: int
@@ -34,6 +40,42 @@ class AppConfig(BaseSettings):
     cache_port: int
 
     weather_api_key: str
+    weather_api_url: str = Field("https://api.openweathermap.org")
+    weather_provider: Literal["openweather", "fake"] = Field("openweather")
+    weather_secondary_provider: Literal["openweather", "fake"] | None = Field(None)
+    weather_hedge_delay: float = Field(1.0, gt=0)
+    weather_forecast_mode: bool = Field(False)
+    weather_forecast_max_age: int = Field(10800, ge=1)
+    weather_cell_precision: int = Field(2, ge=0, le=6)
+    weather_cache_ttl: int = Field(50, ge=1)
+    weather_cache_lock_timeout: int = Field(32, ge=1)
+    weather_fetch_concurrency: int = Field(10, ge=1)
+    weather_fetch_timeout: float = Field(35.0, gt=0)
+    weather_http_connect_timeout: float = Field(3.0, gt=0)
+    weather_http_read_timeout: float = Field(5.0, gt=0)
+    weather_http_retries: int = Field(2, ge=0)
+    weather_http_backoff_factor: float = Field(0.5, ge=0)
+    weather_rate_limit: float = Field(1.0, gt=0)
+    weather_rate_limit_burst: int = Field(10, ge=1)
+    weather_rate_limit_max_wait: float = Field(5.0, ge=0)
+    weather_circuit_breaker_failure_threshold: int = Field(5, ge=1)
+    weather_circuit_breaker_reset_timeout: int = Field(30, ge=1)
+    weather_circuit_breaker_trial_requests: int = Field(3, ge=1)
+    weather_max_age: int = Field(55, ge=0)
+    weather_max_refresh_interval: int = Field(900, ge=0)
+    weather_change_threshold: float = Field(1.0, ge=0)
+    weather_view_timeout: int = Field(600, ge=1)
+    weather_refresh_chunk_size: int = Field(100, ge=1)
+    weather_refresh_max_tasks: int = Field(10000, ge=1)
+    weather_refresh_batch_size: int = Field(1000, ge=1)
+    weather_refresh_lock_timeout: int = Field(120, ge=1)
+    weather_prefetch_timeout: int = Field(60, ge=1)
+    weather_retry_max_attempts: int = Field(5, ge=0)
+    weather_retry_backoff: int = Field(60, ge=1)
+    weather_retry_dead_letter_size: int = Field(1000, ge=1)
+    weather_write_batch_size: int = Field(500, ge=1)
+    weather_write_tolerance: float = Field(0.0, ge=0)
+    weather_write_concern: int | Literal["majority"] = Field(1)
 
     model_config = SettingsConfigDict(
         case_sensitive=False,
@@ -58,6 +100,27 @@ class AppConfig(BaseSettings):
 
         return SecretStr(value)
 
+    @field_validator("weather_api_url")
+    @classmethod
+    def normalize_weather_api_url(cls, value: str) -> str:
+        """Make sure the URL does not end with a slash."""
+        return value.rstrip("/")
+
+    @field_validator("weather_secondary_provider", mode="before")
+    @classmethod
+    def normalize_weather_secondary_provider(cls, value: str | None) -> str | None:
+        """Make sure an empty value means no secondary backend."""
+        return value or None
+
+    @field_validator("weather_write_concern")
+    @classmethod
+    def validate_weather_write_concern(cls, value: int | str) -> int | str:
+        """Make sure the number of nodes is not negative."""
+        if isinstance(value, int) and value < 0:
+            raise ValueError("The write concern cannot be negative.")
+
+        return value
+
     @field_validator("time_zone")
     @classmethod
     def validate_time_zone(cls, value: str) -> str:
@@ -66,3 +129,61 @@ class AppConfig(BaseSettings):
             raise ValueError("Timezone '%s' is incorrect." % value)
 
         return value
+
+    @model_validator(mode="after")
+    def validate_task_list_version_timeout(self) -> "AppConfig":
+        """Make sure the viewed tasks are recorded again before they stop being viewed.
+
+        The views are recorded only when the list is rendered, and the reloads are
+        answered with "304 Not Modified" until the version of the list expires. So the
+        version has to expire, and the list has to be reloaded, before the tasks are no
+        longer considered recently viewed.
+        """
+        if (
+            self.task_list_version_timeout + TASK_LIST_RELOAD_INTERVAL
+            >= self.weather_view_timeout
+        ):
+            raise ValueError(
+                "The version of the task list has to expire at least %d seconds before"
+                " the views of the tasks." % TASK_LIST_RELOAD_INTERVAL
+            )
+
+        return self
+
+    @model_validator(mode="after")
+    def validate_weather_fetch_timeout(self) -> "AppConfig":
+        """Make sure all the waits of a weather fetch fit within its timeout.
+
+        A fetch waits for the rate limit and then for the Weather API, including the
+        retries and their backoff, or for another worker that fetches the same entry of
+        the cache. With hedged requests, the secondary backend may be called after the
+        hedge delay. The lock of the cache entry is held for the whole fetch, so it
+        does not expire before the fetch is finished.
+        """
+        attempts = self.weather_http_retries + 1
+        backoff = sum(
+            self.weather_http_backoff_factor * (2**retry + 1)
+            for retry in range(1, self.weather_http_retries)
+        )
+        request_time = (
+            self.weather_rate_limit_max_wait
+            + attempts
+            * (self.weather_http_connect_timeout + self.weather_http_read_timeout)
+            + backoff
+        )
+        if self.weather_secondary_provider:
+            request_time += self.weather_hedge_delay
+
+        required_time = max(request_time, self.weather_cache_lock_timeout)
+        if required_time > self.weather_fetch_timeout:
+            raise ValueError(
+                "The weather fetch timeout is shorter than the waits of a fetch "
+                "(%s seconds)." % required_time
+            )
+        if self.weather_cache_lock_timeout < request_time:
+            raise ValueError(
+                "The weather cache lock timeout is shorter than the waits of a fetch "
+                "(%s seconds)." % request_time
+            )
+
+        return self
@@ -0,0 +1,67 @@
+import asyncio
+
+from django.http import HttpRequest
+
+# Key of the scope of an ASGI request with the event set when the client disconnects.
+DISCONNECTED_KEY = "todo_app.disconnected"
+
+
+class DisconnectMiddleware:
+    """ASGI middleware that lets the views find out that the client has disconnected.
+
+    Django 4.2 stops reading the messages of a request once its body has been read, so
+    it does not notice that the client has disconnected until it fails to send the
+    response, and an endless stream is never closed. The middleware keeps reading the
+    messages after the body and sets the event stored in the scope of the request
+    when the client disconnects.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive, send) -> None:
+        """Serve the request, with the event stored in its scope if it's HTTP."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        disconnected = asyncio.Event()
+        scope[DISCONNECTED_KEY] = disconnected
+        watcher: asyncio.Task | None = None
+
+        async def watch() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected.set()
+
+        async def receive_request() -> dict:
+            nonlocal watcher
+            if watcher is not None:
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+            elif not message.get("more_body", False):
+                watcher = asyncio.create_task(watch())
+            return message
+
+        try:
+            await self.app(scope, receive_request, send)
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+
+def get_disconnected(request: HttpRequest) -> asyncio.Event | None:
+    """Return the event set when the client of the given request disconnects.
+
+    Args:
+        request (HttpRequest): The request to check.
+
+    Returns:
+        asyncio.Event | None: The event, or None if the request is not served through
+            DisconnectMiddleware, for example by a WSGI server.
+    """
+    return getattr(request, "scope", {}).get(DISCONNECTED_KEY)
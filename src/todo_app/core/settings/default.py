@@ -66,6 +66,8 @@ DOCUMENT_STORE_USER = config.document_store_user
 DOCUMENT_STORE_PASSWORD = config.document_store_password.get_secret_value()
 DOCUMENT_STORE_NAME = config.document_store_name
 
+CACHE_URL = f"redis://{config.cache_host}:{config.cache_port}/3"
+
 CELERY_APP_NAME = "celeryapp"
 CELERY_BROKER_URL = f"redis://{config.cache_host}:{config.cache_port}/1"
 CELERY_RESULT_BACKEND = f"redis://{config.cache_host}:{config.cache_port}/2"
@@ -78,12 +80,56 @@ CELERY_APP_CONFIGURATION = {
     "result_serializer": "json",
     "timezone": config.time_zone,
     "enable_utc": True,
+    # With Redis, each priority step (0, 3, 6 and 9) has its own list, and the lists
+    # with lower values are consumed first. The default priority falls into step 3.
+    "task_default_priority": 5,
+    # Each worker process reserves only the task it's about to execute, so the
+    # prefetches don't wait behind the refresh chunks reserved in advance.
+    "worker_prefetch_multiplier": 1,
 }
 CELERY_ROUTES = {
     "system.celery.tasks.*": {"queue": "weather"},
 }
 
 WEATHER_API_KEY = config.weather_api_key
+WEATHER_API_URL = config.weather_api_url
+WEATHER_PROVIDER = config.weather_provider
+WEATHER_SECONDARY_PROVIDER = config.weather_secondary_provider
+WEATHER_HEDGE_DELAY = config.weather_hedge_delay
+WEATHER_FORECAST_MODE = config.weather_forecast_mode
+WEATHER_FORECAST_MAX_AGE = config.weather_forecast_max_age
+WEATHER_CELL_PRECISION = config.weather_cell_precision
+WEATHER_CACHE_TTL = config.weather_cache_ttl
+WEATHER_CACHE_LOCK_TIMEOUT = config.weather_cache_lock_timeout
+WEATHER_FETCH_CONCURRENCY = config.weather_fetch_concurrency
+WEATHER_FETCH_TIMEOUT = config.weather_fetch_timeout
+WEATHER_HTTP_CONNECT_TIMEOUT = config.weather_http_connect_timeout
+WEATHER_HTTP_READ_TIMEOUT = config.weather_http_read_timeout
+WEATHER_HTTP_RETRIES = config.weather_http_retries
+WEATHER_HTTP_BACKOFF_FACTOR = config.weather_http_backoff_factor
+WEATHER_RATE_LIMIT = config.weather_rate_limit
+WEATHER_RATE_LIMIT_BURST = config.weather_rate_limit_burst
+WEATHER_RATE_LIMIT_MAX_WAIT = config.weather_rate_limit_max_wait
+WEATHER_CIRCUIT_BREAKER_FAILURE_THRESHOLD = (
+    config.weather_circuit_breaker_failure_threshold
+)
+WEATHER_CIRCUIT_BREAKER_RESET_TIMEOUT = config.weather_circuit_breaker_reset_timeout
+WEATHER_CIRCUIT_BREAKER_TRIAL_REQUESTS = config.weather_circuit_breaker_trial_requests
+WEATHER_MAX_AGE = config.weather_max_age
+WEATHER_MAX_REFRESH_INTERVAL = config.weather_max_refresh_interval
+WEATHER_CHANGE_THRESHOLD = config.weather_change_threshold
+WEATHER_VIEW_TIMEOUT = config.weather_view_timeout
+WEATHER_REFRESH_CHUNK_SIZE = config.weather_refresh_chunk_size
+WEATHER_REFRESH_MAX_TASKS = config.weather_refresh_max_tasks
+WEATHER_REFRESH_BATCH_SIZE = config.weather_refresh_batch_size
+WEATHER_REFRESH_LOCK_TIMEOUT = config.weather_refresh_lock_timeout
+WEATHER_PREFETCH_TIMEOUT = config.weather_prefetch_timeout
+WEATHER_RETRY_MAX_ATTEMPTS = config.weather_retry_max_attempts
+WEATHER_RETRY_BACKOFF = config.weather_retry_backoff
+WEATHER_RETRY_DEAD_LETTER_SIZE = config.weather_retry_dead_letter_size
+WEATHER_WRITE_BATCH_SIZE = config.weather_write_batch_size
+WEATHER_WRITE_TOLERANCE = config.weather_write_tolerance
+WEATHER_WRITE_CONCERN = config.weather_write_concern
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -140,6 +186,9 @@ LOGGING = {
 }
 
 TIME_ZONE = config.time_zone
+TASK_PAGE_SIZE = config.task_page_size
+TASK_LIST_VERSION_TIMEOUT = config.task_list_version_timeout
+TASK_EVENTS = config.task_events
 LANGUAGE_CODE = "en-us"
 USE_I18N = True
 USE_TZ = True
@@ -0,0 +1,20 @@
+from django.conf import settings
+from redis import Redis
+
+from todo_app.system.document_store import SingletonMeta
+
+
+class CacheConnection(metaclass=SingletonMeta):
+    """Cache connection handler.
+
+    It's implemented as a singleton to make sure only one connection pool to the cache
+    is created in each process.
+    """
+
+    def __init__(self):
+        self.client = Redis.from_url(
+            settings.CACHE_URL,
+            decode_responses=True,
+            socket_connect_timeout=1,
+            socket_timeout=1,
+        )
@@ -1,61 +1,187 @@
 import logging
+from contextlib import nullcontext
+from dataclasses import asdict
 
-import requests
+from celery import chord
 from celery.schedules import crontab
 from django.conf import settings
+from kombu.exceptions import OperationalError
+from redis.exceptions import RedisError
 
+from todo_app.system.cache import CacheConnection
 from todo_app.system.celery.app import app
+from todo_app.system.lock import DistributedLock
+from todo_app.system.weather.cells import GeoCell
+from todo_app.system.weather.refresh import (
+    get_stale_cells,
+    summarize_weather_refresh,
+    update_weather_for_cells,
+    update_weather_for_task,
+)
+from todo_app.system.weather.retries import RetryQueue
 
 logger = logging.getLogger("celeryapp")
 
+WEATHER_REFRESH_SKIPPED_KEY = "weather:refresh:skipped"
+# The prefetch is consumed before the chunks of the periodic refresh, which have the
+# default priority.
+WEATHER_PREFETCH_PRIORITY = 0
 
-def update_weather_for_task(task) -> None:
-    """Update the weather data for the specified task.
+
+def get_weather_refresh_lock() -> DistributedLock:
+    """Return the lock held by the weather refresh while it's in progress."""
+    return DistributedLock("weather:refresh", settings.WEATHER_REFRESH_LOCK_TIMEOUT)
+
+
+def get_weather_prefetch_lock(task_id: str) -> DistributedLock:
+    """Return the lock held while the weather prefetch of the task is queued."""
+    return DistributedLock(
+        f"weather:prefetch:{task_id}", settings.WEATHER_PREFETCH_TIMEOUT
+    )
+
+
+@app.task
+def prefetch_weather_for_task_task(task_id: str, lock_token: str) -> None:
+    """Celery task that fetches the weather for a new or moved task.
+
+    The prefetch is not queued anymore, so its lock is released before the task is
+    read. A change of the location made from now on queues a new prefetch.
+    """
+    from todo_app.todo.models import Task
+
+    get_weather_prefetch_lock(task_id).release(lock_token)
+
+    task = Task.objects.filter(id=task_id).first()
+    if task is None:
+        logger.debug("Task %s has been removed before its weather prefetch.", task_id)
+        return
+
+    update_weather_for_task(task)
+
+
+def dispatch_weather_prefetch(task_id: str) -> None:
+    """Queue the weather prefetch of the task, unless it's already queued.
+
+    The prefetch is consumed ahead of the periodic refresh and it uses the cached
+    weather of the task's geo cell if it's available, so a new task, or a task with a
+    changed location, gets its weather right away.
 
     Args:
-        task (todo_app.todo.models.Task): Task to update the weather for.
+        task_id (str): ID of the task.
     """
-    from todo_app.todo.models import Weather
-
-    url = "https://api.openweathermap.org/data/2.5/weather"
-    params = {
-        "lat": str(task.location.lat),
-        "lon": str(task.location.lon),
-        "appid": settings.WEATHER_API_KEY,
-        "units": "metric",
-    }
-    response = requests.get(url, params=params)
-    if response.status_code != 200:
-        logger.error(
-            "Weather for task %s has not been updated. The response with status code %d"
-            "has been received.",
-            str(task.id),
-            response.status_code,
+    lock = get_weather_prefetch_lock(task_id)
+    lock_token = lock.acquire()
+    if lock_token is None:
+        logger.debug("Weather prefetch for task %s is already queued.", task_id)
+        return
+
+    try:
+        prefetch_weather_for_task_task.apply_async(
+            (task_id, lock_token), priority=WEATHER_PREFETCH_PRIORITY
         )
+    except OperationalError as ex:
+        lock.release(lock_token)
+        logger.warning(
+            "Weather prefetch for task %s has not been queued: %s", task_id, ex
+        )
+
+
+@app.task
+def update_weather_for_cells_task(
+    cells: list[dict], lock_token: str | None = None
+) -> dict[str, int]:
+    """Celery task that updates the weather data for a chunk of geo cells.
+
+    The lock of the weather refresh is renewed while the chunk is updated.
+    """
+    lock = nullcontext()
+    if lock_token is not None:
+        lock = get_weather_refresh_lock().renewed(lock_token)
+
+    with lock:
+        return update_weather_for_cells(GeoCell(**cell) for cell in cells)
+
+
+@app.task
+def summarize_weather_refresh_task(
+    summaries: list[dict[str, int]], lock_token: str | None = None
+) -> dict[str, int]:
+    """Celery task that combines the summaries of all chunks of the weather refresh.
+
+    The weather refresh is finished at this point, so its lock is released.
+    """
+    result = summarize_weather_refresh(summaries)
+    if lock_token is not None:
+        get_weather_refresh_lock().release(lock_token)
+    return result
+
+
+def dispatch_weather_refresh() -> None:
+    """Split the weather refresh of active tasks with stale weather into chunks.
+
+    Each chunk is updated by a separate Celery task, so the refresh is distributed
+    across all the workers consuming the weather queue. Once all chunks are finished,
+    their summaries are combined.
+
+    The refresh holds a lock until it's finished. If the previous refresh is still in
+    progress, the new one is skipped; its tasks are picked up by the next refresh
+    since their weather is still stale. If a chunk fails, the lock is released when
+    its lease expires.
+    """
+    lock = get_weather_refresh_lock()
+    lock_token = lock.acquire()
+    if lock_token is None:
+        logger.info("Weather refresh skipped, the previous one is still in progress.")
+        try:
+            CacheConnection().client.incr(WEATHER_REFRESH_SKIPPED_KEY)
+        except RedisError:
+            pass
         return
 
-    data = response.json()
-    # It is possible to meet more than one weather condition for a requested location.
-    # The first weather condition in API respond is primary and this is what we use.
-    task.weather = Weather(
-        main=data["weather"][0]["main"],
-        temperature=data["main"]["temp"],
-    )
-    task.save()
+    try:
+        cells = [asdict(cell) for cell in get_stale_cells().values()]
+    except Exception:
+        lock.release(lock_token)
+        raise
 
+    size = settings.WEATHER_REFRESH_CHUNK_SIZE
+    chunks = [cells[index : index + size] for index in range(0, len(cells), size)]
 
-def update_weather_for_active_tasks() -> None:
-    """Update the weather data for all active tasks."""
-    from todo_app.todo.models import Task
+    if not chunks:
+        logger.debug("There are no active tasks with stale weather.")
+        lock.release(lock_token)
+        return
 
-    for task in Task.objects.filter(marked_as_done_at=""):
-        update_weather_for_task(task)
+    logger.debug(
+        "Updating the weather for %d geo cells in %d chunks.", len(cells), len(chunks)
+    )
+    chord([update_weather_for_cells_task.s(chunk, lock_token) for chunk in chunks])(
+        summarize_weather_refresh_task.s(lock_token=lock_token)
+    )
 
 
 @app.task
 def update_weather_for_active_tasks_task():
-    """Celery task that updates the weather data for all active tasks."""
-    update_weather_for_active_tasks()  # pragma: no cover
+    """Celery task that dispatches the weather refresh of all active tasks."""
+    dispatch_weather_refresh()
+
+
+@app.task
+def retry_weather_for_cells_task() -> dict[str, int]:
+    """Celery task that fetches the weather of the geo cells whose retry is due.
+
+    The cells are taken from the retry queue in chunks, until there are no due
+    retries left. The cells that fail again are queued for a later retry, with a
+    longer backoff.
+    """
+    queue = RetryQueue()
+    summaries = []
+    while cells := queue.pop_due(settings.WEATHER_REFRESH_CHUNK_SIZE):
+        summaries.append(update_weather_for_cells(cells))
+
+    if not summaries:
+        return {}
+    return summarize_weather_refresh(summaries)
 
 
 # This dictionary can be used to define scheduled tasks which will be
@@ -101,4 +227,9 @@ SCHEDULED_TASKS = {
         update_weather_for_active_tasks_task,
         [],
     ),
+    "retry_weather_for_cells_task": (
+        crontab(),  # Execute every minute
+        retry_weather_for_cells_task,
+        [],
+    ),
 }
@@ -0,0 +1,83 @@
+from django.utils import timezone
+from mongoengine.queryset.visitor import Q
+
+
+def get_indexed_documents() -> list:
+    """Return the document classes with the declared indexes."""
+    from todo_app.todo.models import Task, WeatherCell
+
+    return [Task, WeatherCell]
+
+
+def get_hot_queries() -> dict:
+    """Return the queries run on every view of the task list and every refresh.
+
+    The task list is read with an aggregation, which is returned as the document class
+    it's run on and its stages. The other queries are returned as query sets.
+
+    Returns:
+        dict[str, mongoengine.queryset.QuerySet | tuple[type, list[dict]]]: Queries
+            indexed by their names.
+    """
+    from todo_app.todo.models import Task, WeatherCell
+    from todo_app.todo.views.list import (
+        get_task_list_paginators,
+        get_task_list_pipeline,
+    )
+
+    paginators = get_task_list_paginators()
+    now = timezone.now()
+    return {
+        "task list": (
+            Task,
+            get_task_list_pipeline(paginators, dict.fromkeys(paginators)),
+        ),
+        # The active tasks are counted only for a batch of the stale cells.
+        "active tasks of geo cells": Task.objects.filter(
+            marked_as_done_at="", cell_key__in=["0.00:0.00"]
+        ).only("cell_key"),
+        "geo cells with stale weather": WeatherCell.objects.filter(
+            Q(weather__next_refresh_at=None) | Q(weather__next_refresh_at__lte=now)
+        ).order_by("weather.next_refresh_at"),
+    }
+
+
+def find_collection_scans() -> list[str]:
+    """Return the names of the hot queries that scan the whole collection.
+
+    The winning plan of each query is checked, so the queries that would use an index
+    only if it existed are found as well. The plan of an aggregation contains the plans
+    of all its reads, including the ones of `$unionWith`.
+    """
+    return [
+        name
+        for name, query in get_hot_queries().items()
+        if _has_collection_scan(_explain(query))
+    ]
+
+
+def _explain(query) -> dict:
+    """Return the winning plan of the query set or the plan of the aggregation."""
+    if not isinstance(query, tuple):
+        return query.explain()["queryPlanner"]["winningPlan"]
+
+    document, pipeline = query
+    collection = document._get_collection()
+    return collection.database.command(
+        "explain",
+        {"aggregate": collection.name, "pipeline": pipeline, "cursor": {}},
+        verbosity="queryPlanner",
+    )
+
+
+def _has_collection_scan(plan) -> bool:
+    """Check if any stage of the plan, or of its input stages, is a collection scan.
+
+    The rejected plans are skipped.
+    """
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            return True
+        plan = [value for key, value in plan.items() if key != "rejectedPlans"]
+
+    return isinstance(plan, list) and any(_has_collection_scan(item) for item in plan)
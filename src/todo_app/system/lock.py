@@ -0,0 +1,118 @@
+import logging
+import threading
+import uuid
+from contextlib import contextmanager
+from functools import partial
+
+from redis.exceptions import RedisError
+
+from todo_app.system.cache import CacheConnection
+
+logger = logging.getLogger("celeryapp")
+
+
+class DistributedLock:
+    """Lock stored in the cache, so it's shared by all the workers.
+
+    The lock is held for the given lease and it's released automatically when the
+    lease expires, so a crashed holder doesn't block the others forever. A long
+    operation keeps the lock by renewing the lease. Only the holder of the token
+    returned by `acquire` can renew or release the lock.
+
+    If the cache is not available, the lock is always acquired.
+
+    Args:
+        name (str): Name of the lock.
+        lease (float): Number of seconds the lock is held for without renewal.
+    """
+
+    key_prefix = "lock"
+
+    def __init__(self, name: str, lease: float):
+        self.client = CacheConnection().client
+        self.key = f"{self.key_prefix}:{name}"
+        self.lease = lease
+
+    def acquire(self) -> str | None:
+        """Acquire the lock if it's not held by anyone else.
+
+        Returns:
+            str | None: Token of the holder or None if the lock is already held.
+        """
+        token = uuid.uuid4().hex
+        try:
+            if not self.client.set(self.key, token, nx=True, px=self._lease_ms):
+                return None
+        except RedisError as ex:
+            logger.warning("Lock %s is not available: %s", self.key, ex)
+
+        return token
+
+    def extend(self, token: str) -> bool:
+        """Renew the lease of the lock held by the holder of the given token.
+
+        Returns:
+            bool: True if the lease has been renewed, False if the lock is not held
+                with the given token anymore.
+        """
+        return self._execute(partial(self._extend, token=token))
+
+    def release(self, token: str) -> bool:
+        """Release the lock held by the holder of the given token.
+
+        Returns:
+            bool: True if the lock has been released, False if it's not held with the
+                given token anymore.
+        """
+        return self._execute(partial(self._release, token=token))
+
+    @contextmanager
+    def renewed(self, token: str):
+        """Keep renewing the lease of the lock while the block is executed.
+
+        The lease is renewed when the block starts and then three times per lease.
+        """
+        stopped = threading.Event()
+
+        def renew():
+            while not stopped.wait(self.lease / 3):
+                if not self.extend(token):
+                    logger.warning("Lock %s has been lost.", self.key)
+                    return
+
+        self.extend(token)
+        thread = threading.Thread(target=renew, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stopped.set()
+            thread.join()
+
+    @property
+    def _lease_ms(self) -> int:
+        return int(self.lease * 1000)
+
+    def _execute(self, func) -> bool:
+        """Execute the given function in a transaction and return its result."""
+        try:
+            return self.client.transaction(func, self.key, value_from_callable=True)
+        except RedisError as ex:
+            logger.warning("Lock %s is not available: %s", self.key, ex)
+            return False
+
+    def _extend(self, pipe, token: str) -> bool:
+        if pipe.get(self.key) != token:
+            return False
+
+        pipe.multi()
+        pipe.pexpire(self.key, self._lease_ms)
+        return True
+
+    def _release(self, pipe, token: str) -> bool:
+        if pipe.get(self.key) != token:
+            return False
+
+        pipe.multi()
+        pipe.delete(self.key)
+        return True
@@ -0,0 +1,213 @@
+import random
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from todo_app.system.document_store import SingletonMeta
+from todo_app.system.weather.api import OpenWeatherProvider
+from todo_app.system.weather.cache import WeatherCache
+from todo_app.system.weather.cells import get_cell_key
+from todo_app.system.weather.circuit_breaker import CircuitBreaker
+from todo_app.system.weather.client import WeatherClient
+from todo_app.system.weather.persistence import create_weather_cells
+from todo_app.system.weather.rate_limiter import RateLimiter
+from todo_app.system.weather.refresh import get_cells, update_weather_for_cells
+from todo_app.system.weather.stub_server import StubWeatherServer
+
+
+class BenchmarkWeatherCache(WeatherCache):
+    """Weather cache with its own entries, so the shared ones are not affected."""
+
+    key_prefix = "weather:benchmark"
+
+
+class BenchmarkCircuitBreaker(CircuitBreaker):
+    """Circuit breaker with its own state, so the shared one is not affected."""
+
+    key = "weather:benchmark:circuit_breaker"
+
+
+class BenchmarkRateLimiter(RateLimiter):
+    """Rate limiter with its own bucket, so the shared one is not affected."""
+
+    key = "weather:benchmark:rate_limiter"
+    throttled_key = "weather:benchmark:rate_limiter:throttled"
+
+
+class BenchmarkWeatherProvider(OpenWeatherProvider):
+    """Weather API backend that doesn't affect the shared state of the requests.
+
+    It has its own circuit breaker, rate limiter and counter of the requests, so the
+    failures and the requests of the stub don't stop or throttle the requests to the
+    Weather API.
+    """
+
+    circuit_breaker_class = BenchmarkCircuitBreaker
+    rate_limiter_class = BenchmarkRateLimiter
+    requests_key = "weather:benchmark:api:requests"
+
+
+class Command(BaseCommand):
+    """Measure the refresh of the weather against a local stub of the Weather API.
+
+    The given number of active tasks is created in the document store, in geo cells
+    that don't exist yet, and the weather of those cells is refreshed in this process,
+    like it's done by a single worker. The refresh uses a separate weather cache,
+    circuit breaker and rate limiter, the failed cells are not queued for a retry and
+    the task lists are not notified, while the rate limit and the circuit breaker are
+    applied as configured. The created tasks, cells and cache entries are deleted
+    afterwards.
+    """
+
+    help = "Benchmark the weather refresh against a local stub of the Weather API."
+
+    def add_arguments(self, parser):  # noqa: D102
+        parser.add_argument(
+            "--tasks",
+            help="Number of tasks to create. Default: 1000.",
+            metavar="value",
+            default=1000,
+            type=int,
+        )
+        parser.add_argument(
+            "--locations",
+            help="Number of distinct locations of the tasks. Default: the number of"
+            " tasks.",
+            metavar="value",
+            type=int,
+        )
+        parser.add_argument(
+            "--latency",
+            help="Number of seconds each request to the stub takes. Default: 0.05.",
+            metavar="value",
+            default=0.05,
+            type=float,
+        )
+        parser.add_argument(
+            "--error-rate",
+            help="Fraction of the requests that fail with status 500. Default: 0.",
+            metavar="value",
+            default=0.0,
+            type=float,
+        )
+        parser.add_argument(
+            "--too-many-requests-rate",
+            help="Fraction of the requests rejected with status 429. Default: 0.",
+            metavar="value",
+            default=0.0,
+            type=float,
+        )
+        parser.add_argument(
+            "--seed",
+            help="Seed of the generated locations and failed requests.",
+            metavar="value",
+            type=int,
+        )
+
+    def handle(self, *args, **options):  # noqa: D102
+        from todo_app.todo.models import Location, Task, WeatherCell
+
+        locations_count = options["locations"]
+        if locations_count is None:
+            locations_count = options["tasks"]
+        if options["tasks"] < 1 or locations_count < 1:
+            raise CommandError("The numbers of tasks and locations must be positive.")
+
+        rng = random.Random(options["seed"])
+        precision = settings.WEATHER_CELL_PRECISION
+        locations = []
+        while len(locations) < locations_count:
+            candidates = [
+                (round(rng.uniform(-60, 60), 4), round(rng.uniform(-180, 180), 4))
+                for _ in range(locations_count - len(locations))
+            ]
+            # The weather of the existing cells is not overwritten by the stub.
+            existing = set(
+                WeatherCell.objects.filter(
+                    key__in=[
+                        get_cell_key(*location, precision) for location in candidates
+                    ]
+                ).scalar("key")
+            )
+            locations += [
+                location
+                for location in candidates
+                if get_cell_key(*location, precision) not in existing
+            ]
+        cell_keys = list({get_cell_key(lat, lon, precision) for lat, lon in locations})
+
+        server = StubWeatherServer(
+            ("127.0.0.1", 0),
+            latency=options["latency"],
+            error_rate=options["error_rate"],
+            too_many_requests_rate=options["too_many_requests_rate"],
+            seed=options["seed"],
+        )
+        server.start()
+        settings.WEATHER_API_URL = server.url
+        # The client could have been created for the real API.
+        SingletonMeta._instances.pop(WeatherClient, None)
+
+        cache = BenchmarkWeatherCache()
+        cache_keys = [
+            *{cache.get_key(lat, lon) for lat, lon in locations},
+            f"{cache.key_prefix}:hits",
+            f"{cache.key_prefix}:misses",
+            BenchmarkCircuitBreaker.key,
+            BenchmarkRateLimiter.key,
+            BenchmarkRateLimiter.throttled_key,
+            BenchmarkWeatherProvider.requests_key,
+        ]
+        cache.client.delete(*cache_keys)
+
+        now = timezone.now()
+        tasks = []
+        for index in range(options["tasks"]):
+            lat, lon = locations[index % len(locations)]
+            tasks.append(
+                Task(
+                    content=f"Benchmark task {index}",
+                    location=Location(lat=lat, lon=lon, label="Benchmark"),
+                    cell_key=get_cell_key(lat, lon, precision),
+                    created_at=now,
+                )
+            )
+        task_ids = Task.objects.insert(tasks, load_bulk=False)
+        # The tasks are inserted in bulk, so their cells are not created on save.
+        create_weather_cells(cell_keys)
+
+        try:
+            start_time = time.perf_counter()
+            summary = update_weather_for_cells(
+                get_cells(cell_keys=cell_keys).values(),
+                cache=cache,
+                fetch=BenchmarkWeatherProvider().fetch,
+                retry=False,
+                notify=False,
+            )
+            elapsed = time.perf_counter() - start_time
+        finally:
+            Task.objects.filter(id__in=task_ids).delete()
+            WeatherCell.objects.filter(key__in=cell_keys).delete()
+            cache.client.delete(*cache_keys)
+            server.shutdown()
+            server.server_close()
+
+        requests_count = sum(server.requests.values())
+        requests_by_status = ", ".join(
+            f"{status_code}: {count}"
+            for status_code, count in sorted(server.requests.items())
+        )
+        self.stdout.write(f"Tasks: {summary['tasks']} in {summary['cells']} cells")
+        self.stdout.write(
+            f"Wall time: {elapsed:.2f} s ({summary['tasks'] / elapsed:.1f} tasks/s)"
+        )
+        self.stdout.write(f"API calls: {requests_count} ({requests_by_status})")
+        self.stdout.write(
+            f"Mongo writes: {summary['bulk_writes']} bulk writes for"
+            f" {summary['updated_cells']} cells, weather of"
+            f" {summary['written_cells']} cells written and"
+            f" {summary['skipped_cells']} skipped"
+        )
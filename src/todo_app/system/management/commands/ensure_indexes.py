@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from todo_app.system.indexes import find_collection_scans, get_indexed_documents
+
+
+def _format_index(index: list) -> str:
+    return ", ".join(f"{'-' if order == -1 else ''}{name}" for name, order in index)
+
+
+class Command(BaseCommand):
+    """Build the indexes declared on the documents and report the drift.
+
+    The missing indexes are built in the background. The indexes that exist in the
+    document store but are not declared are only reported, they have to be dropped
+    manually if they are not needed anymore.
+    """
+
+    help = "Build the declared indexes of the document store and report the drift."
+
+    def add_arguments(self, parser):  # noqa: D102
+        parser.add_argument(
+            "--check",
+            help="Only report the drift and fail if there is any, without building the"
+            " indexes.",
+            action="store_true",
+        )
+        parser.add_argument(
+            "--explain",
+            help="Fail if the query plan of any hot query scans the whole collection.",
+            action="store_true",
+        )
+
+    def handle(self, *args, **options):  # noqa: D102
+        has_drift = False
+
+        for document in get_indexed_documents():
+            name = document._get_collection_name()
+            drift = document.compare_indexes()
+            # The collection that does not exist yet has no indexes at all, but the
+            # index on the ID is created with it.
+            drift["missing"] = [
+                index for index in drift["missing"] if index != [("_id", 1)]
+            ]
+            for index in drift["missing"]:
+                self.stdout.write(f"{name}: missing index ({_format_index(index)})")
+            for index in drift["extra"]:
+                self.stdout.write(
+                    f"{name}: index ({_format_index(index)}) is not declared"
+                )
+            has_drift = has_drift or bool(drift["missing"] or drift["extra"])
+
+            if not options["check"]:
+                document.ensure_indexes()
+                self.stdout.write(f"{name}: declared indexes are built.")
+
+        if options["check"] and has_drift:
+            raise CommandError("The indexes differ from the declared ones.")
+
+        if options["explain"]:
+            scans = find_collection_scans()
+            if scans:
+                raise CommandError(
+                    f"Queries scanning the whole collection: {', '.join(scans)}."
+                )
+            self.stdout.write("All the hot queries use indexes.")
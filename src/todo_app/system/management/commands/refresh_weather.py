@@ -0,0 +1,199 @@
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict
+from datetime import datetime
+
+import django
+from bson import ObjectId
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from redis.exceptions import RedisError
+
+from todo_app.system.weather.api import get_api_requests
+from todo_app.system.weather.cache import WeatherCache
+from todo_app.system.weather.cells import GeoCell
+from todo_app.system.weather.rate_limiter import RateLimiter
+from todo_app.system.weather.refresh import (
+    get_cells,
+    summarize_weather_refresh,
+    update_weather_for_cells,
+)
+
+
+def _parse_time(value: str) -> datetime:
+    """Parse the ISO 8601 time; the time without a timezone is in the local one."""
+    try:
+        result = datetime.fromisoformat(value)
+    except ValueError as ex:
+        raise argparse.ArgumentTypeError(f"invalid time: {value!r}") from ex
+
+    if timezone.is_naive(result):
+        result = timezone.make_aware(result)
+    return result
+
+
+def _setup_worker() -> None:
+    """Set up Django in a worker process."""
+    django.setup()
+
+
+def _update_chunk(cells: list[dict]) -> dict[str, int]:
+    """Update the weather of a chunk of geo cells in a worker."""
+    return update_weather_for_cells(GeoCell(**cell) for cell in cells)
+
+
+def _get_stats() -> dict[str, int] | None:
+    """Return the numbers of API requests and cache hits and misses so far."""
+    try:
+        return {"api_requests": get_api_requests(), **WeatherCache().get_stats()}
+    except RedisError:
+        return None
+
+
+class Command(BaseCommand):
+    """Refresh the weather of the selected geo cells right away.
+
+    The weather of the cells of the active tasks is refreshed, regardless of the
+    schedule of their next refresh, unless the cells are narrowed down by the options.
+    The cells are split into chunks updated in parallel by a pool of threads or
+    processes, and the throughput, the API requests, the cache hits, the calls
+    throttled by the rate limiter and the writes are reported when the refresh is
+    finished.
+
+    The API requests, the cache hits and the throttled calls are counted by all the
+    workers, so they include the concurrent periodic refresh, if there is any.
+    """
+
+    help = "Refresh the weather of the selected geo cells right away."
+
+    def add_arguments(self, parser):  # noqa: D102
+        parser.add_argument(
+            "--workers",
+            help="Number of chunks of geo cells updated in parallel. Default: 1.",
+            metavar="value",
+            default=1,
+            type=int,
+        )
+        parser.add_argument(
+            "--pool",
+            help="Type of the pool of workers. Default: thread.",
+            choices=("thread", "process"),
+            default="thread",
+        )
+        parser.add_argument(
+            "--since",
+            help="Refresh only the geo cells whose weather has not been fetched since"
+            " this ISO 8601 time, eg. the beginning of an outage.",
+            metavar="time",
+            type=_parse_time,
+        )
+        parser.add_argument(
+            "--ids",
+            help="Refresh only the geo cells of these tasks, active or finished.",
+            metavar="id",
+            nargs="+",
+        )
+        parser.add_argument(
+            "--cell",
+            help="Refresh only these geo cells.",
+            metavar="key",
+            nargs="+",
+        )
+        parser.add_argument(
+            "--limit",
+            help="Maximum number of geo cells to refresh; the most overdue first.",
+            metavar="value",
+            type=int,
+        )
+        parser.add_argument(
+            "--dry-run",
+            help="List the geo cells that would be refreshed without refreshing them.",
+            action="store_true",
+        )
+
+    def handle(self, *args, **options):  # noqa: D102
+        if options["workers"] < 1:
+            raise CommandError("The number of workers must be positive.")
+        if options["limit"] is not None and options["limit"] < 1:
+            raise CommandError("The limit must be positive.")
+        invalid_ids = [
+            task_id
+            for task_id in options["ids"] or []
+            if not ObjectId.is_valid(task_id)
+        ]
+        if invalid_ids:
+            raise CommandError(f"Invalid task IDs: {', '.join(invalid_ids)}.")
+
+        cells = get_cells(
+            task_ids=options["ids"],
+            cell_keys=options["cell"],
+            since=options["since"],
+            limit=options["limit"],
+        )
+        tasks = sum(cell.tasks for cell in cells.values())
+
+        if options["dry_run"]:
+            for cell in cells.values():
+                self.stdout.write(f"{cell.key}: {cell.tasks} tasks")
+            self.stdout.write(
+                f"Weather of {len(cells)} geo cells with {tasks} tasks would be"
+                " refreshed."
+            )
+            return
+
+        if not cells:
+            self.stdout.write("There are no geo cells to refresh.")
+            return
+
+        data = [asdict(cell) for cell in cells.values()]
+        size = settings.WEATHER_REFRESH_CHUNK_SIZE
+        chunks = [data[index : index + size] for index in range(0, len(data), size)]
+
+        stats_before = _get_stats()
+        limiter_before = RateLimiter().get_stats()
+        start_time = time.perf_counter()
+        with self._create_pool(options["pool"], options["workers"]) as pool:
+            summaries = list(pool.map(_update_chunk, chunks))
+        elapsed = time.perf_counter() - start_time
+        stats_after = _get_stats()
+        limiter_after = RateLimiter().get_stats()
+
+        summary = summarize_weather_refresh(summaries)
+        self.stdout.write(f"Tasks: {tasks} in {len(cells)} cells")
+        self.stdout.write(
+            f"Wall time: {elapsed:.2f} s ({len(cells) / elapsed:.1f} cells/s,"
+            f" {tasks / elapsed:.1f} tasks/s)"
+        )
+        if stats_before is None or stats_after is None:
+            self.stdout.write("API calls and cache hits: not available")
+        else:
+            diff = {key: stats_after[key] - stats_before[key] for key in stats_after}
+            self.stdout.write(f"API calls: {diff['api_requests']}")
+            self.stdout.write(f"Cache: {diff['hits']} hits, {diff['misses']} misses")
+        if limiter_before is None or limiter_after is None:
+            self.stdout.write("Rate limiter: not available")
+        else:
+            throttled = limiter_after["throttled"] - limiter_before["throttled"]
+            self.stdout.write(
+                f"Rate limiter: {throttled} calls throttled,"
+                f" {limiter_after['tokens']:.1f} tokens left"
+            )
+        self.stdout.write(
+            f"Mongo writes: weather of {summary['written_cells']} cells written and"
+            f" {summary['skipped_cells']} skipped, {summary['failed_cells']} cells"
+            f" failed and {summary['deferred_cells']} deferred"
+        )
+
+    def _create_pool(self, pool: str, workers: int):
+        if pool == "process":
+            # The connections of the parent process can't be shared with the forked
+            # workers, so the workers are started from scratch.
+            return ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_setup_worker,
+            )
+        return ThreadPoolExecutor(max_workers=workers)
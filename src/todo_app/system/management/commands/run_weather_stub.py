@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+
+from todo_app.system.weather.stub_server import StubWeatherServer
+
+
+class Command(BaseCommand):
+    """Run a local stand-in for the Weather API.
+
+    Point TODO_WEATHER_API_URL to the printed URL to use it instead of the real API.
+    """
+
+    help = "Run a local stub of the Weather API."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):  # noqa: D102
+        parser.add_argument("--host", default="127.0.0.1", help="Default: 127.0.0.1.")
+        parser.add_argument("--port", default=8001, type=int, help="Default: 8001.")
+        parser.add_argument(
+            "--latency",
+            help="Number of seconds each request takes. Default: 0.05.",
+            metavar="value",
+            default=0.05,
+            type=float,
+        )
+        parser.add_argument(
+            "--error-rate",
+            help="Fraction of the requests that fail with status 500. Default: 0.",
+            metavar="value",
+            default=0.0,
+            type=float,
+        )
+        parser.add_argument(
+            "--too-many-requests-rate",
+            help="Fraction of the requests rejected with status 429. Default: 0.",
+            metavar="value",
+            default=0.0,
+            type=float,
+        )
+
+    def handle(self, *args, **options):  # noqa: D102
+        server = StubWeatherServer(
+            (options["host"], options["port"]),
+            latency=options["latency"],
+            error_rate=options["error_rate"],
+            too_many_requests_rate=options["too_many_requests_rate"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Weather API stub is listening on {server.url}")
+        )
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
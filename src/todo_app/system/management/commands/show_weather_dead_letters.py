@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand
+
+from todo_app.system.weather.retries import RetryQueue
+
+
+class Command(BaseCommand):
+    """Show the geo cells whose weather has not been fetched in all the retries."""
+
+    help = "Show the geo cells whose weather retries have been exhausted."
+
+    def handle(self, *args, **options):  # noqa: D102
+        dead_letters = RetryQueue().get_dead_letters()
+        for entry in dead_letters:
+            failed_at = datetime.fromtimestamp(entry["failed_at"], timezone.utc)
+            self.stdout.write(
+                f"{failed_at.isoformat(timespec='seconds')} {entry['cell']['key']}:"
+                f" {entry['attempts']} attempts, {entry['cell']['tasks']} tasks"
+            )
+
+        self.stdout.write(f"Geo cells with exhausted retries: {len(dead_letters)}.")
@@ -0,0 +1,70 @@
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+
+from todo_app.system.weather.cells import get_cell_key
+from todo_app.system.weather.persistence import create_weather_cells
+from todo_app.todo.version import TaskListVersion
+
+
+class Command(BaseCommand):
+    """Set the keys of the geo cells of all the tasks and create the missing cells.
+
+    It has to be executed once the weather is moved from the tasks to the geo cells,
+    and whenever the precision of the cells changes, so it's run on every deploy. Only
+    the tasks with a different cell key or with the weather embedded by the previous
+    versions are updated, and the embedded weather is removed. The cells of the active
+    tasks are created when the tasks are saved, so the cells of the updated tasks, and
+    of the tasks saved by the previous versions, are created here.
+    """
+
+    help = "Set the keys of the geo cells of all the tasks."
+
+    def handle(self, *args, **options):  # noqa: D102
+        from todo_app.todo.models import Task
+
+        collection = Task._get_collection()
+        precision = settings.WEATHER_CELL_PRECISION
+        size = settings.WEATHER_WRITE_BATCH_SIZE
+        operations = []
+        count = 0
+
+        for task in collection.find({}, {"location": 1, "cell_key": 1, "weather": 1}):
+            cell_key = get_cell_key(
+                task["location"]["lat"], task["location"]["lon"], precision
+            )
+            if task.get("cell_key") == cell_key and "weather" not in task:
+                continue
+
+            operations.append(
+                UpdateOne(
+                    {"_id": task["_id"]},
+                    {"$set": {"cell_key": cell_key}, "$unset": {"weather": ""}},
+                )
+            )
+            if len(operations) == size:
+                collection.bulk_write(operations, ordered=False)
+                count += len(operations)
+                operations = []
+
+        if operations:
+            collection.bulk_write(operations, ordered=False)
+            count += len(operations)
+
+        if count:
+            TaskListVersion().bump()
+        self.stdout.write(f"Cell keys of {count} tasks have been updated.")
+
+        cell_keys = (
+            row["_id"]
+            for row in collection.aggregate(
+                [
+                    {"$match": {"marked_as_done_at": None, "cell_key": {"$ne": None}}},
+                    {"$group": {"_id": "$cell_key"}},
+                ]
+            )
+        )
+        while batch := list(islice(cell_keys, size)):
+            create_weather_cells(batch)
@@ -0,0 +1,169 @@
+import logging
+
+import requests
+from django.utils import timezone
+from redis.exceptions import RedisError
+
+from todo_app.system.cache import CacheConnection
+from todo_app.system.weather.circuit_breaker import CircuitBreaker
+from todo_app.system.weather.client import WeatherClient
+from todo_app.system.weather.providers import (
+    FORECAST_INTERVAL,
+    WeatherFetchSkippedError,
+    WeatherProvider,
+    get_forecast_size,
+    get_weather_provider,
+)
+from todo_app.system.weather.rate_limiter import RateLimiter
+
+logger = logging.getLogger("celeryapp")
+
+API_REQUESTS_KEY = "weather:api:requests"
+
+
+def fetch_weather(lat: float, lon: float):
+    """Fetch the current weather for the given coordinates from the configured backend.
+
+    Args:
+        lat (float): Latitude.
+        lon (float): Longitude.
+
+    Returns:
+        todo_app.todo.models.Weather | None: Current weather or None if it was not
+            possible to fetch it.
+
+    Raises:
+        WeatherFetchSkippedError: If no request has been sent.
+    """
+    return get_weather_provider().fetch(lat, lon)
+
+
+def fetch_forecast(lat: float, lon: float):
+    """Fetch the forecast for the given coordinates from the configured backend.
+
+    Args:
+        lat (float): Latitude.
+        lon (float): Longitude.
+
+    Returns:
+        todo_app.todo.models.Forecast | None: Forecast or None if it was not possible
+            to fetch it.
+
+    Raises:
+        WeatherFetchSkippedError: If no request has been sent.
+    """
+    return get_weather_provider().fetch_forecast(lat, lon)
+
+
+def get_api_requests() -> int:
+    """Return the number of requests sent to the Weather API by all the workers."""
+    return int(CacheConnection().client.get(API_REQUESTS_KEY) or 0)
+
+
+class OpenWeatherProvider(WeatherProvider):
+    """Backend that fetches the weather from the Weather API.
+
+    The requests are skipped while the API is failing and they are limited to the
+    configured rate. The skipped requests raise WeatherFetchSkippedError. The state of
+    the circuit breaker and the rate limiter and the number of requests are shared by
+    all the workers.
+    """
+
+    name = "openweather"
+    circuit_breaker_class = CircuitBreaker
+    rate_limiter_class = RateLimiter
+    requests_key = API_REQUESTS_KEY
+
+    def fetch(self, lat: float, lon: float):  # noqa: D102
+        from todo_app.todo.models import Weather
+
+        data = self._get("/data/2.5/weather", lat, lon)
+        if data is None:
+            return None
+
+        # It is possible to meet more than one weather condition for a requested
+        # location. The first weather condition in API respond is primary and this is
+        # what we use.
+        return Weather(
+            main=data["weather"][0]["main"],
+            temperature=data["main"]["temp"],
+            fetched_at=timezone.now(),
+        )
+
+    def fetch_forecast(self, lat: float, lon: float):  # noqa: D102
+        from todo_app.todo.models import Forecast
+
+        data = self._get("/data/2.5/forecast", lat, lon, cnt=str(get_forecast_size()))
+        if data is None:
+            return None
+
+        # The slots of the forecast are always 3 hours apart, so only the time of the
+        # first one is stored.
+        slots = data["list"]
+        return Forecast(
+            fetched_at=int(timezone.now().timestamp()),
+            starts_at=slots[0]["dt"],
+            interval=FORECAST_INTERVAL,
+            conditions=[slot["weather"][0]["main"] for slot in slots],
+            temperatures=[slot["main"]["temp"] for slot in slots],
+        )
+
+    def _get(self, path: str, lat: float, lon: float, **params) -> dict | None:
+        """Request the given endpoint for the coordinates and return the data."""
+        circuit_breaker = self.circuit_breaker_class()
+        if not circuit_breaker.allow_request():
+            logger.debug(
+                "Weather for location (%s, %s) has not been fetched. The Weather API is"
+                " failing.",
+                str(lat),
+                str(lon),
+            )
+            raise WeatherFetchSkippedError()
+
+        if not self.rate_limiter_class().acquire():
+            logger.warning(
+                "Weather for location (%s, %s) has not been fetched. The rate limit has"
+                " been reached.",
+                str(lat),
+                str(lon),
+            )
+            raise WeatherFetchSkippedError()
+
+        try:
+            CacheConnection().client.incr(self.requests_key)
+        except RedisError:
+            pass
+
+        params = {
+            "lat": str(lat),
+            "lon": str(lon),
+            "units": "metric",
+            **params,
+        }
+        try:
+            response = WeatherClient().get(path, params=params)
+        except requests.RequestException as ex:
+            circuit_breaker.record_failure()
+            logger.error(
+                "Weather for location (%s, %s) has not been fetched: %s",
+                str(lat),
+                str(lon),
+                ex,
+            )
+            return None
+
+        if response.status_code != 200:
+            # Client errors, eg. an invalid API key, don't mean that the API is failing.
+            if response.status_code == 429 or response.status_code >= 500:
+                circuit_breaker.record_failure()
+            logger.error(
+                "Weather for location (%s, %s) has not been fetched. The response with"
+                " status code %d has been received.",
+                str(lat),
+                str(lon),
+                response.status_code,
+            )
+            return None
+
+        circuit_breaker.record_success()
+        return response.json()
@@ -0,0 +1,144 @@
+import logging
+import time
+from typing import Callable
+
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from todo_app.system.cache import CacheConnection
+from todo_app.system.lock import DistributedLock
+from todo_app.system.weather.cells import get_cell_key
+
+logger = logging.getLogger("celeryapp")
+
+
+class WeatherCache:
+    """Weather cache shared by all the workers.
+
+    The weather is stored in the cache using the key of the geo cell the coordinates
+    belong to, so all the requests for nearby locations are served from the same entry.
+    Only one worker fetches an expired entry, the others wait for it to be refreshed.
+    """
+
+    key_prefix = "weather:cache"
+    poll_interval = 0.05
+
+    def __init__(self):
+        self.client = CacheConnection().client
+        self.ttl = settings.WEATHER_CACHE_TTL
+        self.lock_timeout = settings.WEATHER_CACHE_LOCK_TIMEOUT
+
+    def get_key(self, lat: float, lon: float) -> str:
+        """Return the cache key for the given coordinates."""
+        cell_key = get_cell_key(lat, lon, settings.WEATHER_CELL_PRECISION)
+        return f"{self.key_prefix}:{cell_key}"
+
+    def get(self, lat: float, lon: float):
+        """Return the cached weather for the given coordinates.
+
+        Args:
+            lat (float): Latitude.
+            lon (float): Longitude.
+
+        Returns:
+            todo_app.todo.models.Weather | None: Cached weather or None if it's not in
+                the cache.
+        """
+        from todo_app.todo.models import Weather
+
+        value = self.client.get(self.get_key(lat, lon))
+        self.client.incr(f"{self.key_prefix}:{'misses' if value is None else 'hits'}")
+
+        if value is None:
+            return None
+
+        return Weather.from_json(value)
+
+    def set(self, lat: float, lon: float, weather) -> None:
+        """Store the weather for the given coordinates in the cache.
+
+        Args:
+            lat (float): Latitude.
+            lon (float): Longitude.
+            weather (todo_app.todo.models.Weather): Weather to store.
+        """
+        self.client.set(self.get_key(lat, lon), weather.to_json(), ex=self.ttl)
+
+    def get_or_fetch(self, lat: float, lon: float, fetch: Callable):
+        """Return the cached weather or fetch it if it's not in the cache.
+
+        If the weather is not in the cache, only the worker that acquires the lock for
+        the entry fetches it. The other workers wait until the entry is available or the
+        lock is released or expires. If the cache is not available, the weather is
+        fetched directly.
+
+        Args:
+            lat (float): Latitude.
+            lon (float): Longitude.
+            fetch (Callable): Function that takes the coordinates and returns the
+                weather or None.
+
+        Returns:
+            todo_app.todo.models.Weather | None: Weather for the given coordinates or
+                None if it was not possible to get it.
+        """
+        lock = DistributedLock(self.get_key(lat, lon), self.lock_timeout)
+
+        try:
+            weather = self.get(lat, lon)
+            if weather is not None:
+                return weather
+
+            lock_token = lock.acquire()
+            if lock_token is None:
+                return self._wait_for_entry(lat, lon, lock.key)
+        except RedisError as ex:
+            logger.warning("Weather cache is not available: %s", ex)
+            return fetch(lat, lon)
+
+        weather = None
+        try:
+            weather = fetch(lat, lon)
+        finally:
+            # The lock is released even if the fetch is skipped, so the other workers
+            # don't wait for it. It's released only if it's still held with the token,
+            # so the lock of another worker is not released.
+            try:
+                if weather is not None:
+                    self.set(lat, lon, weather)
+            except RedisError as ex:
+                logger.warning("Weather cache is not available: %s", ex)
+            lock.release(lock_token)
+
+        return weather
+
+    def get_stats(self) -> dict[str, int]:
+        """Return the number of cache hits and misses."""
+        hits, misses = self.client.mget(
+            f"{self.key_prefix}:hits", f"{self.key_prefix}:misses"
+        )
+        return {"hits": int(hits or 0), "misses": int(misses or 0)}
+
+    def _wait_for_entry(self, lat: float, lon: float, lock_key: str):
+        """Wait until another worker stores the weather in the cache.
+
+        The wait ends early if the other worker releases the lock without storing the
+        weather, when its fetch has failed or has been skipped.
+        """
+        from todo_app.todo.models import Weather
+
+        deadline = time.monotonic() + self.lock_timeout
+
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            # The weather is stored before the lock is released, so it's read after
+            # the lock is checked.
+            locked = self.client.exists(lock_key)
+            value = self.client.get(self.get_key(lat, lon))
+            if value is not None:
+                return Weather.from_json(value)
+            if not locked:
+                break
+
+        logger.warning("Weather for location (%s, %s) has not been cached.", lat, lon)
+        return None
@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+
+# Fields of the weather stored for a cell that are used to schedule its next refresh.
+LAST_WEATHER_FIELDS = ("main", "temperature", "refresh_interval")
+
+
+@dataclass
+class GeoCell:
+    """Geo cell with active tasks that share the same (rounded) location.
+
+    The weather is fetched once for each cell, using the coordinates of the cell, and
+    stored once for all the tasks in it. The weather stored for the cell before is
+    used to schedule its next refresh.
+    """
+
+    key: str
+    lat: float
+    lon: float
+    tasks: int = 0
+    last_weather: dict | None = None
+
+
+def get_cell_key(lat: float, lon: float, precision: int) -> str:
+    """Return the key of the geo cell the given coordinates belong to.
+
+    The coordinates are rounded to the given number of decimal places. With the
+    precision set to 2, the size of a cell is roughly 1.1 km x 1.1 km at the equator.
+
+    Args:
+        lat (float): Latitude.
+        lon (float): Longitude.
+        precision (int): Number of decimal places the coordinates are rounded to.
+
+    Returns:
+        str: Key of the cell, for example "51.51:-0.13".
+    """
+    # Adding 0.0 turns negative zero into zero, so both end up in the same cell.
+    lat = round(lat, precision) + 0.0
+    lon = round(lon, precision) + 0.0
+    return f"{lat:.{precision}f}:{lon:.{precision}f}"
+
+
+def get_cell_location(key: str) -> tuple[float, float]:
+    """Return the coordinates of the geo cell with the given key.
+
+    Args:
+        key (str): Key of the cell, for example "51.51:-0.13".
+
+    Returns:
+        tuple[float, float]: Rounded latitude and longitude of the cell.
+    """
+    lat, lon = key.split(":")
+    return float(lat), float(lon)
@@ -0,0 +1,139 @@
+import logging
+
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from todo_app.system.cache import CacheConnection
+
+logger = logging.getLogger("celeryapp")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Circuit breaker that stops the requests to the Weather API while it's failing.
+
+    The state of the circuit is stored in the cache, so it's shared by all the workers:
+
+    * closed - the requests are sent; the circuit opens after the configured number of
+      consecutive failures,
+    * open - the requests are skipped; after the configured timeout the circuit
+      becomes half-open,
+    * half-open - only the configured number of trial requests is sent; the circuit
+      closes if all of them succeed and opens again on the first failure.
+
+    If the cache is not available, the circuit is considered closed.
+    """
+
+    key = "weather:circuit_breaker"
+
+    def __init__(self):
+        self.client = CacheConnection().client
+        self.failure_threshold = settings.WEATHER_CIRCUIT_BREAKER_FAILURE_THRESHOLD
+        self.reset_timeout = settings.WEATHER_CIRCUIT_BREAKER_RESET_TIMEOUT
+        self.trial_requests = settings.WEATHER_CIRCUIT_BREAKER_TRIAL_REQUESTS
+
+    def allow_request(self) -> bool:
+        """Check whether a request to the Weather API can be sent.
+
+        Returns:
+            bool: True if the request can be sent, False if it should be skipped.
+        """
+        return self._execute(self._allow_request, default=True)
+
+    def record_success(self) -> None:
+        """Record a successful request to the Weather API."""
+        self._execute(self._record_success)
+
+    def record_failure(self) -> None:
+        """Record a failed request to the Weather API."""
+        if self._execute(self._record_failure, default=False):
+            logger.warning(
+                "Weather API is failing, the requests are skipped for %d seconds.",
+                self.reset_timeout,
+            )
+
+    def get_state(self) -> str:
+        """Return the current state of the circuit."""
+        return self.client.hget(self.key, "state") or CLOSED
+
+    def _execute(self, func, default=None):
+        """Execute the given function in a transaction and return its result.
+
+        If the cache is not available, the default value is returned.
+        """
+        try:
+            return self.client.transaction(func, self.key, value_from_callable=True)
+        except RedisError as ex:
+            logger.warning("Weather circuit breaker is not available: %s", ex)
+            return default
+
+    @staticmethod
+    def _get_time(pipe) -> float:
+        """Return the current time of the cache, which is the same for all workers."""
+        seconds, microseconds = pipe.time()
+        return seconds + microseconds / 1_000_000
+
+    def _allow_request(self, pipe) -> bool:
+        """Check the state of the circuit and reserve a trial request if needed."""
+        state, opened_at, trials = pipe.hmget(self.key, "state", "opened_at", "trials")
+
+        if state is None:
+            return True
+
+        now = self._get_time(pipe)
+        # A half-open circuit is reset as well, in case the workers sending the trial
+        # requests have never recorded their results.
+        if now - float(opened_at) >= self.reset_timeout:
+            pipe.multi()
+            pipe.delete(self.key)
+            pipe.hset(
+                self.key,
+                mapping={"state": HALF_OPEN, "opened_at": now, "trials": 1},
+            )
+            return True
+
+        if state == OPEN or int(trials) >= self.trial_requests:
+            return False
+
+        pipe.multi()
+        pipe.hincrby(self.key, "trials", 1)
+        return True
+
+    def _record_success(self, pipe) -> None:
+        """Reset the failures and close the circuit after successful trial requests."""
+        state, failures, successes = pipe.hmget(
+            self.key, "state", "failures", "successes"
+        )
+
+        if state == OPEN:
+            # The request has been sent before the circuit opened.
+            return
+
+        if state == HALF_OPEN and int(successes or 0) + 1 < self.trial_requests:
+            pipe.multi()
+            pipe.hincrby(self.key, "successes", 1)
+        elif state == HALF_OPEN or failures is not None:
+            pipe.multi()
+            pipe.delete(self.key)
+
+    def _record_failure(self, pipe) -> bool:
+        """Record the failure and return True if the circuit has been opened."""
+        state, failures = pipe.hmget(self.key, "state", "failures")
+
+        if state == OPEN:
+            return False
+
+        failures = int(failures or 0) + 1
+        if state == HALF_OPEN or failures >= self.failure_threshold:
+            now = self._get_time(pipe)
+            pipe.multi()
+            pipe.delete(self.key)
+            pipe.hset(self.key, mapping={"state": OPEN, "opened_at": now})
+            return True
+
+        pipe.multi()
+        pipe.hset(self.key, "failures", failures)
+        return False
@@ -0,0 +1,65 @@
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+from todo_app.system.document_store import SingletonMeta
+
+
+class WeatherClient(metaclass=SingletonMeta):
+    """HTTP client used for all the requests to the Weather API.
+
+    It's implemented as a singleton, so all the requests made by a process share the
+    same pool of keep-alive connections. Requests that fail with status 5xx are retried
+    with exponential backoff and jitter. The "Retry-After" header is ignored, so the
+    retries always fit within the timeout of a weather fetch. Requests rejected with
+    status 429 are not retried here, as the retries would not be counted by the rate
+    limiter; the cell is retried later from the retry queue instead.
+    """
+
+    retry_status_codes = (500, 502, 503, 504)
+
+    def __init__(self):
+        retry = Retry(
+            total=settings.WEATHER_HTTP_RETRIES,
+            backoff_factor=settings.WEATHER_HTTP_BACKOFF_FACTOR,
+            backoff_jitter=settings.WEATHER_HTTP_BACKOFF_FACTOR,
+            status_forcelist=self.retry_status_codes,
+            allowed_methods=("GET",),
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=settings.WEATHER_FETCH_CONCURRENCY,
+            max_retries=retry,
+        )
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.timeout = (
+            settings.WEATHER_HTTP_CONNECT_TIMEOUT,
+            settings.WEATHER_HTTP_READ_TIMEOUT,
+        )
+
+    def get(self, path: str, params: dict) -> requests.Response:
+        """Perform a GET request to the Weather API.
+
+        The API key is added to the query parameters.
+
+        Args:
+            path (str): Path of the endpoint, for example "/data/2.5/weather".
+            params (dict): Query parameters.
+
+        Returns:
+            requests.Response: Response from the Weather API.
+
+        Raises:
+            requests.RequestException: If the request fails.
+        """
+        return self.session.get(
+            f"{settings.WEATHER_API_URL}{path}",
+            params={**params, "appid": settings.WEATHER_API_KEY},
+            timeout=self.timeout,
+        )
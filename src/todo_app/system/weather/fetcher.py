@@ -0,0 +1,107 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable
+
+from django.conf import settings
+
+from todo_app.system.weather.cells import GeoCell
+from todo_app.system.weather.providers import WeatherFetchSkippedError
+
+logger = logging.getLogger("celeryapp")
+
+
+async def _fetch_for_cell(
+    cell: GeoCell,
+    fetch: Callable,
+    semaphore: asyncio.Semaphore,
+    executor: ThreadPoolExecutor,
+    timeout: float,
+) -> tuple | None:
+    """Fetch the weather for the given cell once a slot is available.
+
+    The fetch is not interrupted after the timeout, it's only not waited for anymore.
+
+    Returns:
+        tuple[str, todo_app.todo.models.Weather | None] | None: Key of the cell and the
+            weather, or None if it was not possible to fetch it in time. None is
+            returned instead of the tuple if the fetch has been skipped.
+    """
+    # The slot is released when the thread finishes, even after a timeout, so the
+    # timeout only starts once the fetch is running in a thread of its own.
+    await semaphore.acquire()
+    future = asyncio.get_running_loop().run_in_executor(
+        executor, fetch, cell.lat, cell.lon
+    )
+    future.add_done_callback(lambda _: semaphore.release())
+
+    done, _ = await asyncio.wait({future}, timeout=timeout)
+    if done and isinstance(future.exception(), WeatherFetchSkippedError):
+        return None
+    if done:
+        weather = future.result()
+    else:
+        logger.warning("Weather for geo cell %s has timed out.", cell.key)
+        weather = None
+
+    return cell.key, weather
+
+
+async def fetch_weather_for_cells_async(
+    cells: Iterable[GeoCell], fetch: Callable, *, concurrency: int, timeout: float
+) -> dict:
+    """Fetch the weather for the given cells concurrently.
+
+    The fetch function is blocking, so it's executed in a pool of threads. The number
+    of requests in progress never exceeds the concurrency limit, including the ones
+    that have timed out and are still running.
+
+    Args:
+        cells (Iterable[GeoCell]): Cells to fetch the weather for.
+        fetch (Callable): Function that takes the coordinates and returns the weather
+            or None, or raises WeatherFetchSkippedError.
+        concurrency (int): Maximum number of requests in progress.
+        timeout (float): Maximum number of seconds to wait for a single request, from
+            the moment it starts.
+
+    Returns:
+        dict[str, todo_app.todo.models.Weather | None]: Weather indexed by the cell key.
+            The cells whose fetch has been skipped are left out.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    try:
+        results = await asyncio.gather(
+            *(
+                _fetch_for_cell(cell, fetch, semaphore, executor, timeout)
+                for cell in cells
+            )
+        )
+    finally:
+        # The fetches that have timed out finish in the background.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return dict(result for result in results if result is not None)
+
+
+def fetch_weather_for_cells(cells: Iterable[GeoCell], fetch: Callable) -> dict:
+    """Fetch the weather for the given cells using the configured concurrency limit.
+
+    Args:
+        cells (Iterable[GeoCell]): Cells to fetch the weather for.
+        fetch (Callable): Function that takes the coordinates and returns the weather
+            or None, or raises WeatherFetchSkippedError.
+
+    Returns:
+        dict[str, todo_app.todo.models.Weather | None]: Weather indexed by the cell key.
+            The cells whose fetch has been skipped are left out.
+    """
+    return asyncio.run(
+        fetch_weather_for_cells_async(
+            cells,
+            fetch,
+            concurrency=settings.WEATHER_FETCH_CONCURRENCY,
+            timeout=settings.WEATHER_FETCH_TIMEOUT,
+        )
+    )
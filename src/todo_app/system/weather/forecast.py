@@ -0,0 +1,90 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+from todo_app.system.weather.api import fetch_forecast
+from todo_app.system.weather.cells import GeoCell
+from todo_app.system.weather.fetcher import fetch_weather_for_cells
+from todo_app.system.weather.persistence import write_forecasts
+
+
+def get_forecast_weather(forecast, at: datetime):
+    """Return the weather at the given time from the forecast.
+
+    The temperature is interpolated linearly between the surrounding slots and the
+    condition of the nearest slot is used. The time up to one interval before the
+    first slot is covered by the first slot.
+
+    Args:
+        forecast (todo_app.todo.models.Forecast): Forecast of a geo cell.
+        at (datetime): Time of the weather.
+
+    Returns:
+        todo_app.todo.models.Weather | None: Weather at the given time or None if the
+            forecast does not cover it.
+    """
+    from todo_app.todo.models import Weather
+
+    last = len(forecast.temperatures) - 1
+    offset = (at.timestamp() - forecast.starts_at) / forecast.interval
+    if last < 0 or not -1 <= offset <= last:
+        return None
+
+    offset = max(offset, 0.0)
+    index = int(offset)
+    temperature = forecast.temperatures[index]
+    if index < last:
+        temperature += (offset - index) * (
+            forecast.temperatures[index + 1] - temperature
+        )
+
+    return Weather(
+        main=forecast.conditions[int(offset + 0.5)],
+        temperature=round(temperature, 2),
+        fetched_at=at,
+    )
+
+
+def get_weather_from_forecasts(cells: dict[str, GeoCell]) -> dict:
+    """Return the current weather of the given geo cells from their forecasts.
+
+    The stored forecast of a cell is used until it reaches the configured maximum age
+    or stops covering the current time. Only then a new forecast is fetched, once for
+    each cell, and stored for the following refreshes.
+
+    Args:
+        cells (dict[str, GeoCell]): Cells indexed by the cell key.
+
+    Returns:
+        dict[str, todo_app.todo.models.Weather | None]: Weather indexed by the cell key,
+            or None if it was not possible to fetch the forecast. The cells whose
+            forecast fetch has been skipped are left out.
+    """
+    from todo_app.todo.models import WeatherCell
+
+    now = timezone.now()
+    min_fetched_at = now.timestamp() - settings.WEATHER_FORECAST_MAX_AGE
+    results = dict.fromkeys(cells)
+
+    for cell in WeatherCell.objects.filter(key__in=list(cells)).only("key", "forecast"):
+        if cell.forecast is not None and cell.forecast.fetched_at > min_fetched_at:
+            results[cell.key] = get_forecast_weather(cell.forecast, now)
+
+    missing = [cells[key] for key, weather in results.items() if weather is None]
+    if not missing:
+        return results
+
+    fetched = fetch_weather_for_cells(missing, fetch_forecast)
+    for cell in missing:
+        if cell.key not in fetched:
+            del results[cell.key]
+    forecasts = {
+        key: forecast for key, forecast in fetched.items() if forecast is not None
+    }
+    write_forecasts(forecasts.items())
+
+    for key, forecast in forecasts.items():
+        results[key] = get_forecast_weather(forecast, now)
+
+    return results
@@ -0,0 +1,160 @@
+from typing import Iterable
+
+from django.conf import settings
+from pymongo import UpdateOne, WriteConcern
+from pymongo.errors import BulkWriteError
+
+from todo_app.system.weather.cells import get_cell_location
+from todo_app.todo.events import publish_weather_change
+from todo_app.todo.version import TaskListVersion
+
+# Error code of an insert of a document that already exists.
+DUPLICATE_KEY_ERROR = 11000
+
+
+def create_weather_cells(keys: Iterable[str]) -> None:
+    """Create the documents of the given geo cells that don't exist yet.
+
+    The cells are created without the weather. The cells created by another worker in
+    the meantime are ignored.
+
+    Args:
+        keys (Iterable[str]): Keys of the cells.
+    """
+    from todo_app.todo.models import WeatherCell
+
+    keys = set(keys)
+    missing = keys - set(WeatherCell.objects.filter(key__in=list(keys)).scalar("key"))
+    if not missing:
+        return
+
+    documents = []
+    for key in sorted(missing):
+        lat, lon = get_cell_location(key)
+        documents.append({"_id": key, "lat": lat, "lon": lon})
+
+    try:
+        WeatherCell._get_collection().insert_many(documents, ordered=False)
+    except BulkWriteError as ex:
+        if any(
+            error["code"] != DUPLICATE_KEY_ERROR for error in ex.details["writeErrors"]
+        ):
+            raise
+
+
+def write_weather(updates: Iterable[tuple], *, notify: bool = True) -> dict[str, int]:
+    """Store the weather of the geo cells in the document store.
+
+    The weather is written only for the cells whose stored weather has a different
+    condition or a temperature that differs by more than the configured tolerance.
+    For the other cells only the time of the fetch and the schedule of the next
+    refresh are updated. The cells have to exist already.
+
+    The updates are sent in unordered bulk writes, each of them containing at most the
+    configured number of operations. If any weather is written, the version of the
+    task list is changed and the weather of all the cells is published to the lists,
+    unless the lists are not to be notified.
+
+    Args:
+        updates (Iterable[tuple[str, todo_app.todo.models.Weather]]): Keys of the
+            cells and the weather to store for them.
+        notify (bool): Whether the task lists are notified of the written weather.
+
+    Returns:
+        dict[str, int]: Numbers of cells with the weather written and skipped, which
+            are always 0 if the writes are not acknowledged, and the number of bulk
+            writes sent.
+    """
+    from todo_app.todo.models import WeatherCell
+
+    updates = list(updates)
+    tolerance = settings.WEATHER_WRITE_TOLERANCE
+    written, skipped = [], []
+
+    for key, weather in updates:
+        unchanged = {
+            "weather.main": weather.main,
+            "weather.temperature": {
+                "$gte": weather.temperature - tolerance,
+                "$lte": weather.temperature + tolerance,
+            },
+        }
+        written.append(
+            UpdateOne(
+                {"_id": key, "$nor": [unchanged]},
+                {"$set": {"weather": weather.to_mongo()}},
+            )
+        )
+        skipped.append(
+            UpdateOne(
+                {"_id": key, **unchanged},
+                {
+                    "$set": {
+                        "weather.fetched_at": weather.fetched_at,
+                        "weather.refresh_interval": weather.refresh_interval,
+                        "weather.next_refresh_at": weather.next_refresh_at,
+                    }
+                },
+            )
+        )
+
+    collection = WeatherCell._get_collection().with_options(
+        write_concern=WriteConcern(w=settings.WEATHER_WRITE_CONCERN)
+    )
+
+    # The unchanged weather is handled first. Otherwise, the cells with the weather
+    # written in this call would be counted as skipped too.
+    skipped_count, skipped_writes = _bulk_write(collection, skipped)
+    written_count, written_writes = _bulk_write(collection, written)
+    if notify and (written_count or not collection.write_concern.acknowledged):
+        # The weather is displayed on the task list.
+        TaskListVersion().bump()
+        publish_weather_change(updates)
+
+    return {
+        "written_cells": written_count,
+        "skipped_cells": skipped_count,
+        "bulk_writes": skipped_writes + written_writes,
+    }
+
+
+def write_forecasts(forecasts: Iterable[tuple]) -> None:
+    """Store the forecasts of the geo cells in the document store.
+
+    The forecasts are sent in unordered bulk writes, each of them containing at most
+    the configured number of operations. The cells have to exist already.
+
+    Args:
+        forecasts (Iterable[tuple[str, todo_app.todo.models.Forecast]]): Keys of the
+            cells and the forecasts to store for them.
+    """
+    from todo_app.todo.models import WeatherCell
+
+    operations = [
+        UpdateOne({"_id": key}, {"$set": {"forecast": forecast.to_mongo()}})
+        for key, forecast in forecasts
+    ]
+    collection = WeatherCell._get_collection().with_options(
+        write_concern=WriteConcern(w=settings.WEATHER_WRITE_CONCERN)
+    )
+    _bulk_write(collection, operations)
+
+
+def _bulk_write(collection, operations: list) -> tuple[int, int]:
+    """Send the operations in batches.
+
+    Returns:
+        tuple[int, int]: Number of matched documents and number of bulk writes sent.
+    """
+    size = settings.WEATHER_WRITE_BATCH_SIZE
+    matched_count, writes = 0, 0
+
+    for index in range(0, len(operations), size):
+        response = collection.bulk_write(
+            operations[index : index + size], ordered=False
+        )
+        writes += 1
+        if response.acknowledged:
+            matched_count += response.matched_count
+
+    return matched_count, writes
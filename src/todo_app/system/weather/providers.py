@@ -0,0 +1,262 @@
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger("celeryapp")
+
+# Number of seconds between the slots of the forecasts, like in the Weather API.
+FORECAST_INTERVAL = 3 * 60 * 60
+
+
+class WeatherFetchSkippedError(Exception):
+    """The weather has not been fetched because no request has been sent.
+
+    It's raised, for example, while the Weather API is failing or when the rate limit
+    is reached, so the fetch is not counted as a failed attempt.
+    """
+
+
+def get_forecast_size() -> int:
+    """Return the number of forecast slots that cover the maximum age of a forecast."""
+    return math.ceil(settings.WEATHER_FORECAST_MAX_AGE / FORECAST_INTERVAL) + 1
+
+
+class WeatherProvider(ABC):
+    """Backend that provides the current weather and the forecast."""
+
+    name = ""
+
+    @abstractmethod
+    def fetch(self, lat: float, lon: float):
+        """Fetch the current weather for the given coordinates.
+
+        Args:
+            lat (float): Latitude.
+            lon (float): Longitude.
+
+        Returns:
+            todo_app.todo.models.Weather | None: Current weather or None if it was not
+                possible to fetch it.
+
+        Raises:
+            WeatherFetchSkippedError: If no request has been sent.
+        """
+
+    @abstractmethod
+    def fetch_forecast(self, lat: float, lon: float):
+        """Fetch the forecast for the given coordinates.
+
+        The forecast covers at least the configured maximum age of a forecast.
+
+        Args:
+            lat (float): Latitude.
+            lon (float): Longitude.
+
+        Returns:
+            todo_app.todo.models.Forecast | None: Forecast or None if it was not
+                possible to fetch it.
+
+        Raises:
+            WeatherFetchSkippedError: If no request has been sent.
+        """
+
+
+class FakeWeatherProvider(WeatherProvider):
+    """Local backend that returns the weather without calling any API.
+
+    The temperature depends only on the latitude, so the results are predictable. It's
+    meant to be used in tests and for running the app without the API key.
+
+    Args:
+        latency (float): Number of seconds each call takes.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def fetch(self, lat: float, lon: float):  # noqa: D102
+        from todo_app.todo.models import Weather
+
+        time.sleep(self.latency)
+        return Weather(
+            main="Clear",
+            temperature=round(30 - abs(lat) / 2, 2),
+            fetched_at=timezone.now(),
+        )
+
+    def fetch_forecast(self, lat: float, lon: float):  # noqa: D102
+        from todo_app.todo.models import Forecast
+
+        time.sleep(self.latency)
+        size = get_forecast_size()
+        now = int(timezone.now().timestamp())
+        return Forecast(
+            fetched_at=now,
+            starts_at=now,
+            interval=FORECAST_INTERVAL,
+            conditions=["Clear"] * size,
+            temperatures=[round(30 - abs(lat) / 2, 2)] * size,
+        )
+
+
+class LatencyTracker:
+    """Recent latencies of a backend, used to compute their percentiles.
+
+    Args:
+        size (int): Number of the most recent latencies that are kept.
+    """
+
+    def __init__(self, size: int):
+        self._latencies = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+    def add(self, latency: float) -> None:
+        """Add the latency of a call."""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def get_percentile(self, percentile: float) -> float | None:
+        """Return the given percentile of the latencies, or None if there are none."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+
+        if not latencies:
+            return None
+
+        index = math.ceil(percentile / 100 * len(latencies)) - 1
+        return latencies[max(0, index)]
+
+
+class HedgedWeatherProvider(WeatherProvider):
+    """Backend that sends hedged requests to the primary and secondary backends.
+
+    If the primary backend has not answered within its 95th percentile latency, the
+    secondary backend is called as well and the first weather or forecast returned is
+    used. Until enough latencies of the primary backend are known, the configured delay
+    is used. The secondary backend is called right away if the primary one skips the
+    request, and the request is skipped only if both backends skip it.
+
+    Args:
+        primary (WeatherProvider): Backend called first.
+        secondary (WeatherProvider): Backend called when the primary one is slow.
+        delay (float): Number of seconds to wait for the primary backend before its
+            latencies are known.
+    """
+
+    percentile = 95
+    window = 100
+    min_samples = 20
+
+    def __init__(
+        self, primary: WeatherProvider, secondary: WeatherProvider, delay: float
+    ):
+        self.primary = primary
+        self.secondary = secondary
+        self.delay = delay
+        self.latencies = LatencyTracker(self.window)
+        # Two threads per request: one for each backend.
+        self._executor = ThreadPoolExecutor(
+            max_workers=2 * settings.WEATHER_FETCH_CONCURRENCY,
+            thread_name_prefix="weather-hedge",
+        )
+
+    @property
+    def name(self) -> str:  # noqa: D102
+        return f"{self.primary.name}+{self.secondary.name}"
+
+    def get_threshold(self) -> float:
+        """Return the number of seconds after which the secondary backend is called."""
+        if len(self.latencies) < self.min_samples:
+            return self.delay
+        return self.latencies.get_percentile(self.percentile)
+
+    def fetch(self, lat: float, lon: float):  # noqa: D102
+        return self._fetch_hedged("fetch", lat, lon)
+
+    def fetch_forecast(self, lat: float, lon: float):  # noqa: D102
+        return self._fetch_hedged("fetch_forecast", lat, lon)
+
+    def _fetch_hedged(self, method: str, lat: float, lon: float):
+        start_time = time.perf_counter()
+        primary = self._executor.submit(getattr(self.primary, method), lat, lon)
+        primary.add_done_callback(
+            lambda _: self.latencies.add(time.perf_counter() - start_time)
+        )
+
+        done, _ = wait([primary], timeout=self.get_threshold())
+        if done and _get_result(primary) is not None:
+            return primary.result()
+
+        logger.debug(
+            "Weather for location (%s, %s) is also fetched from the %s backend.",
+            str(lat),
+            str(lon),
+            self.secondary.name,
+        )
+        futures = {
+            primary,
+            self._executor.submit(getattr(self.secondary, method), lat, lon),
+        }
+        pending = futures - done
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if _get_result(future) is not None:
+                    return future.result()
+
+        if all(
+            isinstance(future.exception(), WeatherFetchSkippedError)
+            for future in futures
+        ):
+            raise WeatherFetchSkippedError()
+        return None
+
+
+def _get_result(future):
+    """Return the result of the finished call, or None if the request was skipped."""
+    if isinstance(future.exception(), WeatherFetchSkippedError):
+        return None
+    return future.result()
+
+
+def _create_provider(name: str) -> WeatherProvider:
+    from todo_app.system.weather.api import OpenWeatherProvider
+
+    providers = {
+        OpenWeatherProvider.name: OpenWeatherProvider,
+        FakeWeatherProvider.name: FakeWeatherProvider,
+    }
+    return providers[name]()
+
+
+@lru_cache(maxsize=None)
+def _get_provider(primary: str, secondary: str | None) -> WeatherProvider:
+    result = _create_provider(primary)
+    if secondary is not None:
+        result = HedgedWeatherProvider(
+            result, _create_provider(secondary), settings.WEATHER_HEDGE_DELAY
+        )
+    return result
+
+
+def get_weather_provider() -> WeatherProvider:
+    """Return the configured weather backend.
+
+    The backend is created once for each process, so the latencies used for hedged
+    requests are collected across all the calls.
+    """
+    return _get_provider(settings.WEATHER_PROVIDER, settings.WEATHER_SECONDARY_PROVIDER)
@@ -0,0 +1,110 @@
+import logging
+import math
+import time
+
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from todo_app.system.cache import CacheConnection
+
+logger = logging.getLogger("celeryapp")
+
+
+class RateLimiter:
+    """Token bucket that limits the number of requests to the Weather API.
+
+    The state of the bucket is stored in the cache, so the limit is shared by all the
+    workers. The bucket is refilled at the configured rate and can hold at most the
+    configured number of tokens, which allows short bursts of requests.
+    """
+
+    key = "weather:rate_limiter"
+    throttled_key = "weather:rate_limiter:throttled"
+
+    def __init__(self):
+        self.client = CacheConnection().client
+        self.rate = settings.WEATHER_RATE_LIMIT
+        self.capacity = settings.WEATHER_RATE_LIMIT_BURST
+        self.max_wait = settings.WEATHER_RATE_LIMIT_MAX_WAIT
+
+    def acquire(self) -> bool:
+        """Take a token from the bucket, waiting for it if necessary.
+
+        If the cache is not available, the request is allowed.
+
+        Returns:
+            bool: True if the token has been taken, False if it was not available
+                within the configured maximum waiting time.
+        """
+        deadline = time.monotonic() + self.max_wait
+
+        try:
+            while True:
+                wait = self.client.transaction(
+                    self._take_token, self.key, value_from_callable=True
+                )
+                if not wait:
+                    return True
+
+                if time.monotonic() + wait > deadline:
+                    self.client.incr(self.throttled_key)
+                    return False
+
+                time.sleep(wait)
+        except RedisError as ex:
+            logger.warning("Weather rate limiter is not available: %s", ex)
+            return True
+
+    def get_stats(self) -> dict | None:
+        """Return the number of tokens in the bucket and the number of throttled calls.
+
+        The number of tokens is the value stored during the last call, without the
+        tokens added since then.
+
+        Returns:
+            dict | None: The stats or None if the cache is not available.
+        """
+        try:
+            tokens = self.client.hget(self.key, "tokens")
+            throttled = self.client.get(self.throttled_key)
+        except RedisError as ex:
+            logger.warning("Weather rate limiter is not available: %s", ex)
+            return None
+
+        return {
+            "tokens": self.capacity if tokens is None else float(tokens),
+            "throttled": int(throttled or 0),
+        }
+
+    def _take_token(self, pipe) -> float:
+        """Refill the bucket and take a token from it.
+
+        It's executed in a transaction, so it's repeated if another worker changes the
+        bucket in the meantime.
+
+        Returns:
+            float: 0 if the token has been taken, otherwise the number of seconds until
+                the next token is available.
+        """
+        tokens, updated_at = pipe.hmget(self.key, "tokens", "updated_at")
+        seconds, microseconds = pipe.time()
+        now = seconds + microseconds / 1_000_000
+
+        if tokens is None:
+            tokens = self.capacity
+        else:
+            elapsed = max(0.0, now - float(updated_at))
+            tokens = min(self.capacity, float(tokens) + elapsed * self.rate)
+
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+
+        pipe.multi()
+        pipe.hset(self.key, mapping={"tokens": tokens, "updated_at": now})
+        # The bucket is full again after that time, so there is no need to keep it.
+        pipe.expire(self.key, math.ceil(self.capacity / self.rate) + 1)
+
+        return wait
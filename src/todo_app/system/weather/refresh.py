@@ -0,0 +1,314 @@
+import logging
+from datetime import datetime, timedelta
+from functools import partial
+from itertools import islice
+from typing import Callable, Iterable
+
+from django.conf import settings
+from django.utils import timezone
+from mongoengine.queryset.visitor import Q
+
+from todo_app.system.weather.api import fetch_weather
+from todo_app.system.weather.cache import WeatherCache
+from todo_app.system.weather.cells import (
+    LAST_WEATHER_FIELDS,
+    GeoCell,
+    get_cell_location,
+)
+from todo_app.system.weather.fetcher import fetch_weather_for_cells
+from todo_app.system.weather.forecast import get_weather_from_forecasts
+from todo_app.system.weather.persistence import create_weather_cells, write_weather
+from todo_app.system.weather.retries import RetryQueue
+from todo_app.system.weather.scheduler import RefreshScheduler
+
+logger = logging.getLogger("celeryapp")
+
+
+def update_weather_for_task(task) -> None:
+    """Update the weather of the geo cell of the specified task.
+
+    The weather is not fetched if the next refresh of the cell is not due yet, unless
+    the weather is older than the maximum refresh interval, which happens when the
+    refresh of a cell without active tasks has been put off. The weather is written
+    only if it has changed.
+
+    Args:
+        task (todo_app.todo.models.Task): Task to update the weather for.
+    """
+    from todo_app.todo.models import WeatherCell
+
+    create_weather_cells([task.cell_key])
+    now = timezone.now()
+    if WeatherCell.objects.filter(
+        key=task.cell_key,
+        weather__next_refresh_at__gt=now,
+        weather__fetched_at__gt=now - timedelta(seconds=_get_max_interval()),
+    ).count():
+        logger.debug("Weather for task %s is up to date.", str(task.id))
+        return
+
+    lat, lon = get_cell_location(task.cell_key)
+    summary = update_weather_for_cells(
+        [GeoCell(key=task.cell_key, lat=lat, lon=lon, tasks=1)]
+    )
+    if not summary["updated_cells"]:
+        logger.error("Weather for task %s has not been updated.", str(task.id))
+
+
+def get_stale_cells() -> dict[str, GeoCell]:
+    """Return the geo cells with active tasks that have stale weather.
+
+    The weather is stale if its next refresh is due or if it has never been fetched.
+    The cells waiting for the retry of a failed fetch are skipped. The cells with the
+    most overdue refresh come first and the cells are added until the configured
+    maximum number of tasks per refresh is reached.
+
+    The stale cells are read with the index of their next refresh, in batches of the
+    configured size and at most as many as the maximum number of tasks, and the active
+    tasks are counted by the document store only for the cells of each batch. The
+    cells are created when their tasks are saved, so the cost of a refresh does not
+    depend on the number of all the active tasks. The stale cells without active
+    tasks are put off, see `_put_off_idle_cells`.
+
+    Returns:
+        dict[str, GeoCell]: Geo cells with the number of their active tasks, indexed by
+            the cell key.
+    """
+    from todo_app.todo.models import Task
+
+    max_tasks = settings.WEATHER_REFRESH_MAX_TASKS
+    pending = RetryQueue().get_pending()
+    now = timezone.now()
+    query = Q(key__nin=list(pending)) & (
+        Q(weather__next_refresh_at=None) | Q(weather__next_refresh_at__lte=now)
+    )
+    # The cursor is read once, in batches; a query set would be read from the start
+    # again by each batch.
+    cells = (cell for cell in _get_cells(query).limit(max_tasks))
+
+    result = {}
+    tasks = 0
+    while tasks < max_tasks and (
+        batch := list(islice(cells, settings.WEATHER_REFRESH_BATCH_SIZE))
+    ):
+        task_counts = _count_tasks(
+            Task.objects.filter(
+                marked_as_done_at="", cell_key__in=[cell["_id"] for cell in batch]
+            )
+        )
+        _put_off_idle_cells(
+            [cell for cell in batch if cell["_id"] not in task_counts], now
+        )
+        for cell in batch:
+            if tasks >= max_tasks:
+                break
+            if cell["_id"] in task_counts:
+                result[cell["_id"]] = _create_geo_cell(cell, task_counts[cell["_id"]])
+                tasks += task_counts[cell["_id"]]
+
+    return result
+
+
+def get_cells(
+    *,
+    task_ids: list[str] | None = None,
+    cell_keys: list[str] | None = None,
+    since: datetime | None = None,
+    limit: int | None = None,
+) -> dict[str, GeoCell]:
+    """Return the geo cells of the tasks matching the given filters.
+
+    Unlike the periodic refresh, the cells are returned regardless of the schedule of
+    their next refresh. The cells with the most overdue refresh come first.
+
+    Args:
+        task_ids (list[str] | None): IDs of the tasks; only the active tasks are taken
+            into account if they are not given.
+        cell_keys (list[str] | None): Keys of the cells to return.
+        since (datetime | None): Only the cells whose weather has not been fetched
+            since this time are returned.
+        limit (int | None): Maximum number of cells.
+
+    Returns:
+        dict[str, GeoCell]: Geo cells with the number of their matching tasks, indexed
+            by the cell key.
+    """
+    from todo_app.todo.models import Task
+
+    tasks = Task.objects.filter(marked_as_done_at="")
+    if task_ids is not None:
+        tasks = Task.objects.filter(id__in=task_ids)
+    if cell_keys is not None:
+        tasks = tasks.filter(cell_key__in=cell_keys)
+    task_counts = _count_tasks(tasks)
+
+    query = Q(key__in=list(task_counts))
+    if since is not None:
+        query &= Q(weather__fetched_at=None) | Q(weather__fetched_at__lt=since)
+    cells = _get_cells(query)
+    if limit is not None:
+        cells = cells.limit(limit)
+
+    return {
+        cell["_id"]: _create_geo_cell(cell, task_counts[cell["_id"]]) for cell in cells
+    }
+
+
+def _count_tasks(tasks) -> dict[str, int]:
+    """Count the given tasks for each cell."""
+    return {
+        row["_id"]: row["tasks"]
+        for row in tasks.filter(cell_key__ne=None).aggregate(
+            [{"$group": {"_id": "$cell_key", "tasks": {"$sum": 1}}}]
+        )
+    }
+
+
+def _put_off_idle_cells(cells: list[dict], now: datetime) -> None:
+    """Put off the refresh of the given stale cells, which have no active tasks.
+
+    The cells with weather keep it for their finished tasks and their next refresh is
+    put off by the maximum refresh interval. The cells without weather are removed,
+    and the ones that have got an active task in the meantime are created again.
+    """
+    from todo_app.todo.models import Task, WeatherCell
+
+    with_weather = [cell["_id"] for cell in cells if cell.get("weather")]
+    if with_weather:
+        WeatherCell.objects.filter(key__in=with_weather).update(
+            set__weather__next_refresh_at=now + timedelta(seconds=_get_max_interval())
+        )
+
+    without_weather = [cell["_id"] for cell in cells if not cell.get("weather")]
+    if without_weather:
+        WeatherCell.objects.filter(key__in=without_weather, weather=None).delete()
+        create_weather_cells(
+            Task.objects.filter(
+                marked_as_done_at="", cell_key__in=without_weather
+            ).distinct("cell_key")
+        )
+
+
+def _get_max_interval() -> int:
+    """Return the maximum number of seconds between the refreshes of a cell."""
+    return max(settings.WEATHER_MAX_AGE, settings.WEATHER_MAX_REFRESH_INTERVAL)
+
+
+def _get_cells(query):
+    """Return the raw cells matching the query, the most overdue first."""
+    from todo_app.todo.models import WeatherCell
+
+    return (
+        WeatherCell.objects.filter(query)
+        .order_by("weather.next_refresh_at")
+        .only("key", "lat", "lon", *(f"weather.{name}" for name in LAST_WEATHER_FIELDS))
+        .no_cache()
+        .batch_size(settings.WEATHER_REFRESH_BATCH_SIZE)
+        .as_pymongo()
+    )
+
+
+def _create_geo_cell(cell: dict, tasks: int) -> GeoCell:
+    weather = cell.get("weather")
+    return GeoCell(
+        key=cell["_id"],
+        lat=cell["lat"],
+        lon=cell["lon"],
+        tasks=tasks,
+        last_weather=(
+            {name: weather.get(name) for name in LAST_WEATHER_FIELDS}
+            if weather
+            else None
+        ),
+    )
+
+
+def update_weather_for_cells(
+    cells: Iterable[GeoCell],
+    *,
+    cache: WeatherCache | None = None,
+    fetch: Callable | None = None,
+    retry: bool = True,
+    notify: bool = True,
+) -> dict[str, int]:
+    """Update the weather data of the given geo cells.
+
+    The weather is fetched concurrently, once for each cell, then the next refresh of
+    each cell is scheduled and the results are stored for all cells in bulk writes.
+    The weather of the cells is written only if it has changed. The cells whose
+    weather has not been fetched are queued for a retry. The cells whose fetch has been
+    skipped, for example while the Weather API is failing, are not counted as failed:
+    the ones waiting for a retry are queued again without a new attempt and the other
+    ones are left to the next refresh.
+
+    In the forecast mode, the weather is taken from the forecasts of the cells, which
+    are fetched only when they are missing or too old.
+
+    Args:
+        cells (Iterable[GeoCell]): Cells to update the weather for.
+        cache (WeatherCache | None): Cache of the fetched weather; the shared one is
+            used if it's not given.
+        fetch (Callable | None): Function fetching the weather of a location; the
+            configured backend is used if it's not given.
+        retry (bool): Whether the failed cells are queued for a retry.
+        notify (bool): Whether the task lists are notified of the written weather.
+
+    Returns:
+        dict[str, int]: Summary of the update.
+    """
+    cells = {cell.key: cell for cell in cells}
+    cache = cache or WeatherCache()
+    if settings.WEATHER_FORECAST_MODE:
+        results = get_weather_from_forecasts(cells)
+    else:
+        results = fetch_weather_for_cells(
+            cells.values(), partial(cache.get_or_fetch, fetch=fetch or fetch_weather)
+        )
+
+    scheduler = RefreshScheduler()
+    viewed = scheduler.get_viewed(cells)
+    deferred = [cell for key, cell in cells.items() if key not in results]
+    updates, failed = [], []
+    for key, weather in results.items():
+        if weather is None:
+            failed.append(cells[key])
+            continue
+        scheduler.schedule(weather, cells[key].last_weather, key in viewed)
+        updates.append((key, weather))
+
+    if retry:
+        retry_queue = RetryQueue()
+        retry_queue.add(failed)
+        retry_queue.postpone(deferred)
+        retry_queue.remove(key for key, _ in updates)
+
+    return {
+        "cells": len(cells),
+        "tasks": sum(cell.tasks for cell in cells.values()),
+        "updated_cells": len(updates),
+        "failed_cells": len(failed),
+        "deferred_cells": len(deferred),
+        **write_weather(updates, notify=notify),
+    }
+
+
+def summarize_weather_refresh(summaries: Iterable[dict[str, int]]) -> dict[str, int]:
+    """Combine the summaries of the updates of the weather into one and log it.
+
+    Args:
+        summaries (Iterable[dict[str, int]]): Summaries to combine.
+
+    Returns:
+        dict[str, int]: Combined summary.
+    """
+    result = {}
+    for summary in summaries:
+        for key, value in summary.items():
+            result[key] = result.get(key, 0) + value
+
+    logger.info(
+        "Weather refresh finished: %s.",
+        ", ".join(f"{key}={value}" for key, value in result.items()),
+    )
+
+    return result
@@ -0,0 +1,176 @@
+import json
+import logging
+import time
+from dataclasses import asdict
+from typing import Iterable
+
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from todo_app.system.cache import CacheConnection
+from todo_app.system.weather.cells import GeoCell
+
+logger = logging.getLogger("celeryapp")
+
+
+class RetryQueue:
+    """Queue of the geo cells whose weather has not been fetched.
+
+    Each failed cell is retried after the configured backoff, which is doubled after
+    every failed attempt. Once the maximum number of attempts is reached, the cell is
+    moved to the dead-letter list, which keeps the most recent failures for
+    inspection, and it's left to the periodic refresh again.
+
+    The queue is stored in the cache: the due times of the retries in a sorted set and
+    the cells with their numbers of failed attempts in a hash. If the cache is not
+    available, the failed cells are not retried and they're refreshed by the next
+    periodic refresh.
+    """
+
+    queue_key = "weather:retry:queue"
+    entries_key = "weather:retry:entries"
+    dead_letter_key = "weather:retry:dead"
+
+    def __init__(self):
+        self.client = CacheConnection().client
+        self.max_attempts = settings.WEATHER_RETRY_MAX_ATTEMPTS
+        self.backoff = settings.WEATHER_RETRY_BACKOFF
+        self.dead_letter_size = settings.WEATHER_RETRY_DEAD_LETTER_SIZE
+
+    def get_backoff(self, attempts: int) -> int:
+        """Return the number of seconds before the retry after the given failures."""
+        return self.backoff * 2 ** (attempts - 1)
+
+    def add(self, cells: Iterable[GeoCell]) -> None:
+        """Schedule the retries of the given cells whose weather has not been fetched.
+
+        Args:
+            cells (Iterable[GeoCell]): Cells with failed weather fetches.
+        """
+        cells = list(cells)
+        if not cells:
+            return
+
+        try:
+            entries = self.client.hmget(self.entries_key, [cell.key for cell in cells])
+            now = time.time()
+            pipe = self.client.pipeline(transaction=False)
+            for cell, entry in zip(cells, entries):
+                attempts = json.loads(entry)["attempts"] + 1 if entry else 1
+                if attempts > self.max_attempts:
+                    self._add_dead_letter(pipe, cell, attempts, now)
+                    continue
+
+                pipe.hset(
+                    self.entries_key,
+                    cell.key,
+                    json.dumps({"cell": asdict(cell), "attempts": attempts}),
+                )
+                pipe.zadd(self.queue_key, {cell.key: now + self.get_backoff(attempts)})
+            pipe.ltrim(self.dead_letter_key, 0, self.dead_letter_size - 1)
+            pipe.execute()
+        except RedisError as ex:
+            logger.warning("Failed weather fetches have not been queued: %s", ex)
+
+    def postpone(self, cells: Iterable[GeoCell]) -> None:
+        """Postpone the retries of the given cells whose weather fetch was skipped.
+
+        No request has been sent for the cells, so their numbers of failed attempts
+        don't change. Only the cells waiting for a retry are queued again, the other
+        ones are left to the periodic refresh.
+
+        Args:
+            cells (Iterable[GeoCell]): Cells with skipped weather fetches.
+        """
+        keys = [cell.key for cell in cells]
+        if not keys:
+            return
+
+        try:
+            entries = self.client.hmget(self.entries_key, keys)
+            now = time.time()
+            pipe = self.client.pipeline(transaction=False)
+            for key, entry in zip(keys, entries):
+                if entry:
+                    attempts = json.loads(entry)["attempts"]
+                    pipe.zadd(self.queue_key, {key: now + self.get_backoff(attempts)})
+            pipe.execute()
+        except RedisError as ex:
+            logger.warning("Skipped weather fetches have not been queued: %s", ex)
+
+    def remove(self, keys: Iterable[str]) -> None:
+        """Remove the given cells, whose weather has been fetched, from the queue."""
+        keys = list(keys)
+        if not keys:
+            return
+
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.zrem(self.queue_key, *keys)
+            pipe.hdel(self.entries_key, *keys)
+            pipe.execute()
+        except RedisError as ex:
+            logger.warning("Weather retries have not been removed: %s", ex)
+
+    def pop_due(self, count: int) -> list[GeoCell]:
+        """Take the cells whose retry is due from the queue.
+
+        A cell is taken by one worker only. The number of its failed attempts is kept
+        until its weather is fetched.
+
+        Args:
+            count (int): Maximum number of cells to take.
+
+        Returns:
+            list[GeoCell]: Cells to fetch the weather for again.
+        """
+        try:
+            keys = self.client.zrangebyscore(
+                self.queue_key, "-inf", time.time(), start=0, num=count
+            )
+            if not keys:
+                return []
+
+            pipe = self.client.pipeline(transaction=False)
+            for key in keys:
+                pipe.zrem(self.queue_key, key)
+            taken = [key for key, removed in zip(keys, pipe.execute()) if removed]
+            entries = self.client.hmget(self.entries_key, taken) if taken else []
+        except RedisError as ex:
+            logger.warning("Weather retries are not available: %s", ex)
+            return []
+
+        return [GeoCell(**json.loads(entry)["cell"]) for entry in entries if entry]
+
+    def get_pending(self) -> set[str]:
+        """Return the keys of the cells waiting for their retry."""
+        try:
+            return set(self.client.zrange(self.queue_key, 0, -1))
+        except RedisError as ex:
+            logger.warning("Weather retries are not available: %s", ex)
+            return set()
+
+    def get_dead_letters(self) -> list[dict]:
+        """Return the most recent cells whose retries have been exhausted.
+
+        Returns:
+            list[dict]: Cells with the number of their failed attempts and the time of
+                the last failure, the most recent first.
+        """
+        return [
+            json.loads(entry)
+            for entry in self.client.lrange(self.dead_letter_key, 0, -1)
+        ]
+
+    def _add_dead_letter(self, pipe, cell: GeoCell, attempts: int, now: float) -> None:
+        logger.error(
+            "Weather for geo cell %s has not been fetched in %d attempts.",
+            cell.key,
+            attempts,
+        )
+        pipe.lpush(
+            self.dead_letter_key,
+            json.dumps({"cell": asdict(cell), "attempts": attempts, "failed_at": now}),
+        )
+        pipe.zrem(self.queue_key, cell.key)
+        pipe.hdel(self.entries_key, cell.key)
@@ -0,0 +1,136 @@
+import logging
+from datetime import timedelta
+from typing import Iterable
+
+from django.conf import settings
+from django.utils import timezone
+from redis.exceptions import RedisError
+
+from todo_app.system.cache import CacheConnection
+
+logger = logging.getLogger("celeryapp")
+
+
+class RefreshScheduler:
+    """Scheduler of the weather refresh of each geo cell.
+
+    The weather of a cell is refreshed again after the minimum interval (the maximum
+    age of the weather) if it has changed since the last refresh and the tasks in the
+    cell have been viewed recently. Otherwise, the interval is doubled, up to the
+    configured maximum interval.
+
+    The cells with recently viewed tasks are stored in the cache. If the cache is not
+    available, all the cells are considered viewed.
+    """
+
+    viewed_key_prefix = "weather:viewed"
+
+    def __init__(self):
+        self.client = CacheConnection().client
+        self.min_interval = settings.WEATHER_MAX_AGE
+        self.max_interval = max(
+            self.min_interval, settings.WEATHER_MAX_REFRESH_INTERVAL
+        )
+        self.change_threshold = settings.WEATHER_CHANGE_THRESHOLD
+        self.view_timeout = settings.WEATHER_VIEW_TIMEOUT
+
+    def get_viewed_key(self, cell_key: str) -> str:
+        """Return the cache key that marks the given cell as viewed."""
+        return f"{self.viewed_key_prefix}:{cell_key}"
+
+    def record_views(self, cell_keys: Iterable[str]) -> set[str]:
+        """Mark the given cells as viewed.
+
+        Args:
+            cell_keys (Iterable[str]): Keys of the cells with viewed tasks.
+
+        Returns:
+            set[str]: Keys of the cells that have not been viewed recently before.
+        """
+        cell_keys = list(cell_keys)
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for cell_key in cell_keys:
+                pipe.set(
+                    self.get_viewed_key(cell_key), 1, ex=self.view_timeout, get=True
+                )
+            results = pipe.execute()
+        except RedisError as ex:
+            logger.warning("Weather views have not been recorded: %s", ex)
+            return set()
+
+        return {key for key, value in zip(cell_keys, results) if value is None}
+
+    def get_viewed(self, cell_keys: Iterable[str]) -> set[str]:
+        """Return the keys of the given cells that have been viewed recently."""
+        cell_keys = list(cell_keys)
+        if not cell_keys:
+            return set()
+
+        try:
+            values = self.client.mget(
+                [self.get_viewed_key(cell_key) for cell_key in cell_keys]
+            )
+        except RedisError as ex:
+            logger.warning("Weather views are not available: %s", ex)
+            return set(cell_keys)
+
+        return {key for key, value in zip(cell_keys, values) if value is not None}
+
+    def schedule(self, weather, last_weather: dict | None, viewed: bool) -> None:
+        """Set the refresh interval and the time of the next refresh of the weather.
+
+        Args:
+            weather (todo_app.todo.models.Weather): Weather that has just been fetched.
+            last_weather (dict | None): Weather stored for the cell before, with the
+                `main`, `temperature` and `refresh_interval` fields.
+            viewed (bool): Whether the tasks in the cell have been viewed recently.
+        """
+        interval = self.min_interval
+        last_interval = (last_weather or {}).get("refresh_interval")
+
+        if last_interval is not None and (
+            not viewed or not self._has_changed(last_weather, weather)
+        ):
+            interval = min(self.max_interval, max(self.min_interval, 2 * last_interval))
+
+        weather.refresh_interval = interval
+        weather.next_refresh_at = weather.fetched_at + timedelta(seconds=interval)
+
+    def _has_changed(self, last_weather: dict, weather) -> bool:
+        return (
+            last_weather.get("main") != weather.main
+            or last_weather.get("temperature") is None
+            or abs(last_weather["temperature"] - weather.temperature)
+            >= self.change_threshold
+        )
+
+
+def record_task_views(tasks: Iterable) -> None:
+    """Mark the cells of the given tasks as viewed.
+
+    Args:
+        tasks (Iterable[todo_app.todo.models.Task]): Viewed tasks.
+    """
+    record_cell_views(task.cell_key for task in tasks if task.cell_key)
+
+
+def record_cell_views(cell_keys: Iterable[str]) -> None:
+    """Mark the given cells as viewed.
+
+    The cells that have not been viewed recently may have their refresh backed off,
+    so their next refresh is brought forward to now.
+
+    Args:
+        cell_keys (Iterable[str]): Keys of the cells with viewed tasks.
+    """
+    from todo_app.todo.models import WeatherCell
+
+    new_cells = RefreshScheduler().record_views(dict.fromkeys(cell_keys))
+    if not new_cells:
+        return
+
+    now = timezone.now()
+    WeatherCell.objects.filter(
+        key__in=list(new_cells), weather__next_refresh_at__gt=now
+    ).update(set__weather__next_refresh_at=now)
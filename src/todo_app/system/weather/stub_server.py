@@ -0,0 +1,137 @@
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+WEATHER_PATH = "/data/2.5/weather"
+FORECAST_PATH = "/data/2.5/forecast"
+# Number of seconds between the slots of the forecast.
+FORECAST_INTERVAL = 3 * 60 * 60
+
+
+class StubWeatherHandler(BaseHTTPRequestHandler):
+    """Request handler that mimics the weather endpoints of the Weather API."""
+
+    protocol_version = "HTTP/1.1"
+    # The responses are small, so they would be delayed by Nagle's algorithm.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # noqa: N802
+        """Return the current weather or the forecast for the requested coordinates."""
+        url = urlparse(self.path)
+        if url.path not in (WEATHER_PATH, FORECAST_PATH):
+            self._send(404, {"cod": "404", "message": "Internal error"})
+            return
+
+        time.sleep(self.server.latency)
+
+        status_code = self.server.draw_status_code()
+        if status_code == 429:
+            self._send(429, {"cod": 429, "message": "Too many requests."})
+        elif status_code == 500:
+            self._send(500, {"cod": 500, "message": "Internal error"})
+        else:
+            query = parse_qs(url.query)
+            lat = float(query.get("lat", ["0"])[0])
+            lon = float(query.get("lon", ["0"])[0])
+            weather = {
+                "weather": [{"main": "Clear"}],
+                # The temperature depends on the latitude, like in the real world.
+                "main": {"temp": round(30 - abs(lat) / 2, 2)},
+            }
+            if url.path == WEATHER_PATH:
+                self._send(200, {"coord": {"lat": lat, "lon": lon}, **weather})
+            else:
+                # The slots start at the next full interval, like in the Weather API.
+                starts_at = (
+                    int(time.time()) // FORECAST_INTERVAL + 1
+                ) * FORECAST_INTERVAL
+                count = int(query.get("cnt", ["40"])[0])
+                self._send(
+                    200,
+                    {
+                        "cnt": count,
+                        "list": [
+                            {"dt": starts_at + index * FORECAST_INTERVAL, **weather}
+                            for index in range(count)
+                        ],
+                    },
+                )
+
+    def log_message(self, *args):
+        """Do not log the requests."""
+
+    def _send(self, status_code: int, data: dict):
+        body = json.dumps(data).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.record(status_code)
+
+
+class StubWeatherServer(ThreadingHTTPServer):
+    """Local stand-in for the Weather API, used to measure the weather refresh.
+
+    Each request is answered after the configured latency. The given fractions of the
+    requests fail with status 500 or are rejected with status 429. The number of
+    requests is counted by the status code of the response.
+
+    Args:
+        address (tuple[str, int]): Host and port to listen on; port 0 picks a free one.
+        latency (float): Number of seconds each request takes.
+        error_rate (float): Fraction of the requests that fail with status 500.
+        too_many_requests_rate (float): Fraction of the requests that are rejected with
+            status 429.
+        seed (int | None): Seed of the generator that draws the failed requests.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        too_many_requests_rate: float = 0.0,
+        seed: int | None = None,
+    ):
+        super().__init__(address, StubWeatherHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.too_many_requests_rate = too_many_requests_rate
+        self.requests = Counter()
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server, to be used as the Weather API URL."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> threading.Thread:
+        """Serve the requests in a background thread and return the thread."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def draw_status_code(self) -> int:
+        """Draw the status code of the next response."""
+        with self._lock:
+            value = self._random.random()
+
+        if value < self.too_many_requests_rate:
+            return 429
+        if value < self.too_many_requests_rate + self.error_rate:
+            return 500
+        return 200
+
+    def record(self, status_code: int):
+        """Count the request with the given status code of the response."""
+        with self._lock:
+            self.requests[status_code] += 1
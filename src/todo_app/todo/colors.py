@@ -7,11 +7,23 @@ def get_task_css_classes(task) -> str:
     Returns:
         (str): CSS classes for the given task.
     """
-    if task.weather is None:
+    return get_weather_css_classes(task.weather)
+
+
+def get_weather_css_classes(weather) -> str:
+    """Return correct CSS classes for the tasks with the given weather.
+
+    Arguments:
+        weather (todo_app.todo.models.Weather | None): Weather of the tasks.
+
+    Returns:
+        (str): CSS classes for the tasks.
+    """
+    if weather is None:
         return "border"
 
-    temperature = task.weather.temperature
-    main = task.weather.main
+    temperature = weather.temperature
+    main = weather.main
 
     if temperature < 0 or main == "Rain":
         return "border-indigo bg-indigo-100"
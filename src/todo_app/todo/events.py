@@ -0,0 +1,150 @@
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Iterable
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from todo_app.system.cache import CacheConnection
+from todo_app.system.document_store import SingletonMeta
+from todo_app.todo.colors import get_weather_css_classes
+
+logger = logging.getLogger("celeryapp")
+
+CHANNEL = "task:list:events"
+
+# Marks the end of the changes in the queue of a stream.
+_CLOSED = object()
+
+
+def publish_task_change(task) -> None:
+    """Publish the card of the given task, which has been created or changed.
+
+    Nothing is published if the changes are not pushed to the task lists.
+
+    Args:
+        task (todo_app.todo.models.Task): Created or changed task.
+    """
+    from todo_app.todo.models import WeatherCell
+
+    if not settings.TASK_EVENTS:
+        return
+
+    cell = WeatherCell.objects.filter(key=task.cell_key).only("weather").first()
+    task.weather = cell.weather if cell else None
+    _publish(
+        {
+            "type": "task",
+            "id": str(task.id),
+            "finished": task.marked_as_done_at is not None,
+            "html": render_to_string(
+                "task/_partials/task_list_item.html", {"task": task}
+            ),
+        }
+    )
+
+
+def publish_weather_change(updates: Iterable[tuple]) -> None:
+    """Publish the weather of the given geo cells, which may have changed.
+
+    Nothing is published if the changes are not pushed to the task lists.
+
+    Args:
+        updates (Iterable[tuple[str, todo_app.todo.models.Weather]]): Keys of the
+            cells and their weather.
+    """
+    if not settings.TASK_EVENTS:
+        return
+
+    cells = {
+        key: {
+            "text": f"{weather.temperature}\N{DEGREE SIGN}C, {weather.main}",
+            "classes": get_weather_css_classes(weather),
+        }
+        for key, weather in updates
+    }
+    if cells:
+        _publish({"type": "weather", "cells": cells})
+
+
+def _publish(event: dict) -> None:
+    try:
+        CacheConnection().client.publish(CHANNEL, json.dumps(event))
+    except RedisError as ex:
+        logger.warning("Change of the task list has not been published: %s", ex)
+
+
+class EventBroadcaster(metaclass=SingletonMeta):
+    """Broadcaster of the changes of the task list to the streams of a process.
+
+    All the streams share a single subscription to the channel of the changes, so a
+    process can hold many idle streams with a single connection to the cache. The
+    subscription is started with the first stream and it's closed with the last one.
+
+    If a stream does not keep up with the changes, the oldest changes are dropped for
+    it. If the cache is not available, the streams are closed and the browsers connect
+    again later.
+    """
+
+    queue_size = 100
+
+    def __init__(self):
+        self.queues: set[asyncio.Queue] = set()
+        self.listener: asyncio.Task | None = None
+
+    async def listen(self, timeout: float) -> AsyncIterator[str | None]:
+        """Yield the changes published from now on, as JSON.
+
+        None is yielded whenever there has been no change for the given time, so the
+        idle streams can be kept alive. It ends if the subscription fails.
+
+        Args:
+            timeout (float): Number of seconds to wait for a change.
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.queues.add(queue)
+        if self.listener is None:
+            self.listener = asyncio.create_task(self._subscribe())
+
+        try:
+            while True:
+                try:
+                    data = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    data = None
+                if data is _CLOSED:
+                    return
+                yield data
+        finally:
+            self.queues.discard(queue)
+            if not self.queues and self.listener is not None:
+                self.listener.cancel()
+                self.listener = None
+
+    async def _subscribe(self) -> None:
+        client = aioredis.Redis.from_url(settings.CACHE_URL, decode_responses=True)
+        try:
+            async with client.pubsub() as pubsub:
+                await pubsub.subscribe(CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        for queue in self.queues:
+                            self._put(queue, message["data"])
+        except RedisError as ex:
+            logger.warning("Changes of the task list are not available: %s", ex)
+        finally:
+            await client.aclose()
+
+        # It's not reached if the subscription is cancelled after the last stream.
+        if self.listener is asyncio.current_task():
+            self.listener = None
+        for queue in self.queues:
+            self._put(queue, _CLOSED)
+
+    def _put(self, queue: asyncio.Queue, data) -> None:
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(data)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.utils import timezone
 from mongoengine import (
     DateTimeField,
@@ -5,14 +6,23 @@ from mongoengine import (
     EmbeddedDocument,
     EmbeddedDocumentField,
     FloatField,
+    IntField,
+    ListField,
     StringField,
 )
 
 from todo_app.system.document_store import DocumentStoreConnection
+from todo_app.system.weather.cells import get_cell_key
+from todo_app.system.weather.persistence import create_weather_cells
 from todo_app.todo.colors import get_task_css_classes
+from todo_app.todo.version import TaskListVersion
 
 DocumentStoreConnection()
 
+# The indexes are built in the background by the `ensure_indexes` command when the app
+# is deployed, rather than by each process on its first query.
+INDEX_OPTIONS = {"auto_create_index": False, "index_background": True}
+
 
 class Location(EmbeddedDocument):
     """Location data document.
@@ -28,30 +38,104 @@ class Location(EmbeddedDocument):
 class Weather(EmbeddedDocument):
     """Weather information document.
 
-    It's supposed to be used as an embedded document in the Task document.
+    It's supposed to be used as an embedded document in the WeatherCell document.
     """
 
     main = StringField(required=True)
     temperature = FloatField(required=True)
+    fetched_at = DateTimeField()
+    refresh_interval = IntField()
+    next_refresh_at = DateTimeField()
+
+
+class Forecast(EmbeddedDocument):
+    """Weather forecast document.
+
+    It's supposed to be used as an embedded document in the WeatherCell document. The
+    slots of the forecast are evenly spaced, so only the time of the first slot and
+    the interval between the slots are stored, as Unix timestamps and seconds.
+    """
+
+    fetched_at = IntField(required=True)
+    starts_at = IntField(required=True)
+    interval = IntField(required=True)
+    conditions = ListField(StringField())
+    temperatures = ListField(FloatField())
+
+
+class WeatherCell(Document):
+    """Weather of a geo cell, shared by all the tasks in the cell.
+
+    The coordinates of the cell are the rounded coordinates of its tasks.
+    """
+
+    key = StringField(primary_key=True)
+    lat = FloatField(required=True)
+    lon = FloatField(required=True)
+    weather = EmbeddedDocumentField(Weather)
+    forecast = EmbeddedDocumentField(Forecast)
+
+    meta = {
+        **INDEX_OPTIONS,
+        "indexes": [
+            # Used by the weather refresh to find the cells with stale weather.
+            {"fields": ["weather.next_refresh_at"]},
+        ],
+    }
 
 
 class Task(Document):
-    """Todo item document model."""
+    """Todo item document model.
+
+    The weather is stored once for each geo cell and the task references its cell
+    with the cell key. The weather of the cell is not loaded with the task, it's set
+    by the task list view, which reads it together with the tasks.
+    """
 
     content = StringField(required=True)
     location = EmbeddedDocumentField(Location, required=True)
-    weather = EmbeddedDocumentField(Weather)
+    cell_key = StringField()
     created_at = DateTimeField()
     marked_as_done_at = DateTimeField()
 
+    weather = None
+
+    meta = {
+        **INDEX_OPTIONS,
+        "indexes": [
+            # Used by the weather refresh to find the cells with active tasks.
+            {"fields": ["marked_as_done_at", "cell_key"]},
+            # Used by the pages of the active and finished tasks on the list.
+            {"fields": ["marked_as_done_at", "-created_at", "-id"]},
+            {"fields": ["-marked_as_done_at", "-id"]},
+        ],
+        # The documents created before the weather was moved to the geo cells may
+        # still have the weather embedded.
+        "strict": False,
+    }
+
     @property
     def css_classes(self) -> str:
         """CSS classes for the task."""
         return get_task_css_classes(self)
 
     def save(self, *args, **kwargs):
-        """Update the created_at datetime if it's not yet set."""
+        """Update the created_at datetime if it's not yet set and the cell key.
+
+        The geo cell of an active task is created if it doesn't exist yet, so the
+        weather refresh finds the cells to update without reading all the active
+        tasks. The version of the task list is changed once the task is saved.
+        """
         if not self.created_at:
             self.created_at = timezone.now()
 
-        return super().save(*args, **kwargs)
+        if self.location is not None:
+            self.cell_key = get_cell_key(
+                self.location.lat, self.location.lon, settings.WEATHER_CELL_PRECISION
+            )
+
+        result = super().save(*args, **kwargs)
+        if self.cell_key and self.marked_as_done_at is None:
+            create_weather_cells([self.cell_key])
+        TaskListVersion().bump()
+        return result
@@ -0,0 +1,158 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from bson import ObjectId
+from django.core import signing
+from mongoengine.queryset.visitor import Q
+
+NEXT = "next"
+PREV = "prev"
+
+
+@dataclass
+class Page:
+    """Page of the documents with the cursors of the neighbouring pages.
+
+    The cursors are None if there is no such page.
+    """
+
+    items: list
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+class KeysetPaginator:
+    """Paginator that pages through the documents sorted by a field, newest first.
+
+    The pages are found by the value of the field and the ID of the last document seen,
+    instead of skipping the previous documents, so every page is read from the index
+    as fast as the first one. The ID breaks the ties between the documents with the
+    same value.
+
+    The cursors are signed, so they are opaque to the users and can't be tampered with.
+    An invalid cursor leads to the first page.
+
+    Args:
+        queryset (mongoengine.queryset.QuerySet): Documents to page through.
+        field (str): Name of the datetime field the documents are sorted by.
+        page_size (int): Number of documents on a single page.
+    """
+
+    def __init__(self, queryset, field: str, page_size: int):
+        self.queryset = queryset
+        self.field = field
+        self.page_size = page_size
+        self.salt = f"todo.pagination.{field}"
+
+    def get_page(self, cursor: str | None = None) -> Page:
+        """Return the page the given cursor points to, or the first page.
+
+        Args:
+            cursor (str | None): Cursor of the page.
+
+        Returns:
+            Page: Documents on the page and the cursors of the neighbouring pages.
+        """
+        position = self._decode(cursor)
+        return self._get_page(position, list(self._get_queryset(position)))
+
+    def get_stages(self, cursor: str | None = None) -> list[dict]:
+        """Return the aggregation stages that read the page the cursor points to.
+
+        The stages let the page be read together with other data in a single
+        aggregation. The documents they read are turned into the page by
+        `get_page_from`.
+
+        Args:
+            cursor (str | None): Cursor of the page.
+
+        Returns:
+            list[dict]: Stages matching, sorting and limiting the documents.
+        """
+        queryset = self._get_queryset(self._decode(cursor))
+        return [
+            {"$match": queryset._query},
+            {"$sort": dict(queryset._ordering)},
+            {"$limit": self.page_size + 1},
+        ]
+
+    def get_page_from(self, cursor: str | None, documents: list) -> Page:
+        """Return the page made of the documents read for the given cursor.
+
+        If the cursor points past the last document, the first page is read instead.
+
+        Args:
+            cursor (str | None): Cursor of the page.
+            documents (list): Documents read by the stages from `get_stages`.
+
+        Returns:
+            Page: Documents on the page and the cursors of the neighbouring pages.
+        """
+        return self._get_page(self._decode(cursor), documents)
+
+    def _get_page(self, position: tuple | None, documents: list) -> Page:
+        """Return the page at the given position made of the documents read for it."""
+        direction = NEXT if position is None else position[0]
+        has_more = len(documents) > self.page_size
+        items = documents[: self.page_size]
+        if direction == PREV:
+            items.reverse()
+
+        if position is None:
+            return Page(items, next_cursor=self._get_cursor(items, NEXT, has_more))
+
+        if not items:
+            return self.get_page()
+
+        if direction == NEXT:
+            return Page(
+                items,
+                next_cursor=self._get_cursor(items, NEXT, has_more),
+                prev_cursor=self._get_cursor(items, PREV, True),
+            )
+        return Page(
+            items,
+            next_cursor=self._get_cursor(items, NEXT, True),
+            prev_cursor=self._get_cursor(items, PREV, has_more),
+        )
+
+    def _get_queryset(self, position: tuple | None):
+        """Return the query of the page after or before the position, in read order."""
+        if position is None:
+            direction, value, item_id = NEXT, None, None
+        else:
+            direction, value, item_id = position
+        operator, order = ("lt", "-") if direction == NEXT else ("gt", "+")
+
+        queryset = self.queryset
+        if value is not None:
+            queryset = queryset.filter(
+                Q(**{f"{self.field}__{operator}": value})
+                | Q(**{self.field: value, f"id__{operator}": item_id})
+            )
+
+        return queryset.order_by(f"{order}{self.field}", f"{order}id").limit(
+            self.page_size + 1
+        )
+
+    def _get_cursor(self, items: list, direction: str, exists: bool) -> str | None:
+        """Return the cursor of the page next to or before the given items."""
+        if not exists:
+            return None
+
+        item = items[-1] if direction == NEXT else items[0]
+        return signing.dumps(
+            [direction, getattr(item, self.field).isoformat(), str(item.id)],
+            salt=self.salt,
+        )
+
+    def _decode(self, cursor: str | None) -> tuple | None:
+        """Return the direction and the position stored in the cursor."""
+        if not cursor:
+            return None
+
+        try:
+            direction, value, item_id = signing.loads(cursor, salt=self.salt)
+            return direction, datetime.fromisoformat(value), ObjectId(item_id)
+        except (signing.BadSignature, TypeError, ValueError):
+            return None
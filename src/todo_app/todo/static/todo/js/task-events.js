@@ -0,0 +1,36 @@
+/**
+ * Patch the task list with the changes pushed by the server.
+ *
+ * The cards of the changed tasks and the weather of the geo cells are replaced
+ * in place. If a task has been created or moved to the other list, the whole list
+ * is loaded again, as the pages of the list have changed too.
+ *
+ * @param {string} url The URL of the stream with the changes of the task list.
+ */
+function listenToTaskEvents(url) {
+  const source = new EventSource(url);
+
+  source.onmessage = message => {
+    const event = JSON.parse(message.data);
+
+    if (event.type === 'weather') {
+      for (const [cellKey, weather] of Object.entries(event.cells)) {
+        document.querySelectorAll(`[data-cell-key="${cellKey}"]`).forEach(item => {
+          item.querySelector('[data-task-card]').className = `${weather.classes} p-3 mb-4`;
+          const weatherText = item.querySelector('[data-task-weather]');
+          weatherText.textContent = weather.text;
+          weatherText.hidden = false;
+        });
+      }
+      return;
+    }
+
+    const item = document.getElementById(`task#${event.id}`);
+    const list = event.finished ? '#finished-tasks' : '#active-tasks';
+    if (item && item.closest(list)) {
+      item.outerHTML = event.html;
+    } else if (item || !event.finished) {
+      window.location.reload();
+    }
+  };
+}
@@ -6,11 +6,13 @@ from todo_app.todo.views import (
     TaskListView,
     mark_as_active_view,
     mark_as_finished_view,
+    task_events_view,
 )
 
 urlpatterns = [
     re_path(r"^$", TaskListView.as_view(), name="task-list"),
     re_path(r"^create/$", TaskCreateView.as_view(), name="task-create"),
+    re_path(r"^events/$", task_events_view, name="task-events"),
     re_path(
         r"^edit/(?P<task_id>[a-f0-9]{24})$", TaskEditView.as_view(), name="task-edit"
     ),
@@ -0,0 +1,65 @@
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from todo_app.system.cache import CacheConnection
+
+logger = logging.getLogger("celeryapp")
+
+
+class TaskListVersion:
+    """Version of the task list, changed whenever the tasks or their weather change.
+
+    It lets the open task lists, which are reloaded every minute, be answered with
+    "304 Not Modified" without reading the tasks. The version is stored in the cache as
+    a random token, so a version lost with the cache is never issued again, together
+    with the time of the change.
+
+    The version expires after the configured timeout, which limits how long the lists
+    may stay outdated if a change has not been recorded. If the cache is not
+    available, the list is always rendered.
+    """
+
+    key = "task:list:version"
+
+    def __init__(self):
+        self.client = CacheConnection().client
+        self.timeout = settings.TASK_LIST_VERSION_TIMEOUT
+
+    def get(self) -> tuple[str, datetime] | None:
+        """Return the current version and the time of the last change.
+
+        A new version is created if there is none.
+
+        Returns:
+            tuple[str, datetime] | None: Version and the time of the last change, or
+                None if the cache is not available.
+        """
+        try:
+            token, changed_at = self.client.hmget(self.key, ["token", "changed_at"])
+            if token is None or changed_at is None:
+                token, changed_at = self._set()
+        except RedisError as ex:
+            logger.warning("Version of the task list is not available: %s", ex)
+            return None
+
+        return token, datetime.fromtimestamp(float(changed_at), tz=timezone.utc)
+
+    def bump(self) -> None:
+        """Change the version after the tasks or their weather have changed."""
+        try:
+            self._set()
+        except RedisError as ex:
+            logger.warning("Version of the task list has not been changed: %s", ex)
+
+    def _set(self) -> tuple[str, str]:
+        token, changed_at = uuid.uuid4().hex, str(time.time())
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(self.key, mapping={"token": token, "changed_at": changed_at})
+        pipe.expire(self.key, self.timeout)
+        pipe.execute()
+        return token, changed_at
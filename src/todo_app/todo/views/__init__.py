@@ -1,5 +1,6 @@
 from todo_app.todo.views.create import TaskCreateView
 from todo_app.todo.views.edit import TaskEditView
+from todo_app.todo.views.events import task_events_view
 from todo_app.todo.views.list import TaskListView
 from todo_app.todo.views.mark_as_active import mark_as_active_view
 from todo_app.todo.views.mark_as_finished import mark_as_finished_view
@@ -7,6 +8,7 @@ from todo_app.todo.views.mark_as_finished import mark_as_finished_view
 __all__ = [
     "mark_as_finished_view",
     "mark_as_active_view",
+    "task_events_view",
     "TaskCreateView",
     "TaskEditView",
     "TaskListView",
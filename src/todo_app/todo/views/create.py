@@ -6,6 +6,8 @@ from django.http import HttpResponseRedirect
 from django.urls import reverse
 from django.views.generic import FormView
 
+from todo_app.system.celery.tasks import dispatch_weather_prefetch
+from todo_app.todo.events import publish_task_change
 from todo_app.todo.forms import TaskCreateForm
 from todo_app.todo.models import Task
 from todo_app.todo.utils import get_location_from_string
@@ -24,8 +26,12 @@ class TaskCreateView(FormView):
         return result
 
     def form_valid(self, form: BaseModelForm) -> HttpResponseRedirect:
-        """Add a new task and redirect the user to the list of tasks."""
+        """Add a new task, queue the prefetch of its weather and redirect the user to
+        the list of tasks.
+        """
         location = get_location_from_string(form["location"].value())
-        Task.objects.create(content=form["content"].value(), location=location)
+        task = Task.objects.create(content=form["content"].value(), location=location)
+        dispatch_weather_prefetch(str(task.id))
+        publish_task_change(task)
 
         return HttpResponseRedirect(reverse("todo:task-list"))
@@ -7,6 +7,8 @@ from django.urls import reverse
 from django.views.generic import FormView
 from mongoengine.errors import ValidationError
 
+from todo_app.system.celery.tasks import dispatch_weather_prefetch
+from todo_app.todo.events import publish_task_change
 from todo_app.todo.forms import TaskEditForm
 from todo_app.todo.models import Task
 from todo_app.todo.utils import get_location_from_string
@@ -37,10 +39,19 @@ class TaskEditView(FormView):
         return result
 
     def form_valid(self, form: BaseModelForm) -> HttpResponseRedirect:
-        """Update the task and redirect the user to the list of tasks."""
+        """Update the task and redirect the user to the list of tasks.
+
+        If the task has been moved to another geo cell, the prefetch of the weather is
+        queued.
+        """
         task = Task.objects.get(id=form["task_id"].value())
+        cell_key = task.cell_key
         task.content = form["content"].value()
         task.location = get_location_from_string(form["location"].value())
         task.save()
 
+        if task.cell_key != cell_key:
+            dispatch_weather_prefetch(str(task.id))
+        publish_task_change(task)
+
         return HttpResponseRedirect(reverse("todo:task-list"))
@@ -0,0 +1,87 @@
+import asyncio
+from contextlib import aclosing
+from typing import AsyncIterator
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, HttpRequest, StreamingHttpResponse
+
+from todo_app.core.middleware import get_disconnected
+from todo_app.system.weather.cells import get_cell_key, get_cell_location
+from todo_app.system.weather.scheduler import record_cell_views
+from todo_app.todo.events import EventBroadcaster
+
+# Number of seconds after which a comment is sent to keep an idle stream open.
+KEEPALIVE_INTERVAL = 15
+
+
+async def task_events_view(request: HttpRequest) -> StreamingHttpResponse:
+    """View streaming the changes of the task list as Server-Sent Events.
+
+    The changes are the cards of the created and changed tasks and the weather of the
+    geo cells. The view is available only if the changes are pushed to the task lists,
+    and it has to be served by an ASGI server, which holds the idle streams without
+    blocking a thread for each of them. The stream ends once the client disconnects.
+
+    The list is not reloaded while it's streamed, so the stream marks the geo cells
+    given in the `cell` query parameters as viewed, before the marks set when the list
+    was rendered expire.
+
+    Args:
+        request (HttpRequest): The request to process.
+
+    Raises:
+        Http404: If the changes are not pushed to the task lists or the request is not
+            served by an ASGI server.
+
+    Returns:
+        StreamingHttpResponse: Stream of the changes, until the client disconnects.
+    """
+    if not settings.TASK_EVENTS:
+        raise Http404("Changes of the task list are not pushed.")
+
+    disconnected = get_disconnected(request)
+    if disconnected is None:
+        raise Http404("Changes of the task list are streamed only by an ASGI server.")
+
+    cell_keys = _get_cell_keys(request.GET.getlist("cell"))
+    response = StreamingHttpResponse(
+        _stream(disconnected, cell_keys), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # The nginx proxy would buffer the stream otherwise.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _get_cell_keys(values: list[str]) -> list[str]:
+    """Return the valid keys of the geo cells, at most one for each task on a page."""
+    cell_keys = []
+    for value in values[: settings.TASK_PAGE_SIZE]:
+        try:
+            location = get_cell_location(value)
+        except ValueError:
+            continue
+        if get_cell_key(*location, settings.WEATHER_CELL_PRECISION) == value:
+            cell_keys.append(value)
+    return cell_keys
+
+
+async def _stream(
+    disconnected: asyncio.Event, cell_keys: list[str]
+) -> AsyncIterator[str]:
+    loop = asyncio.get_running_loop()
+    # The marks are renewed in the middle of their timeout.
+    views_interval = settings.WEATHER_VIEW_TIMEOUT / 2
+    views_at = loop.time() + views_interval
+
+    # The browser connects again 5 seconds after the stream is closed.
+    yield "retry: 5000\n\n"
+    async with aclosing(EventBroadcaster().listen(KEEPALIVE_INTERVAL)) as changes:
+        async for data in changes:
+            if disconnected.is_set():
+                return
+            if cell_keys and loop.time() >= views_at:
+                await sync_to_async(record_cell_views)(cell_keys)
+                views_at = loop.time() + views_interval
+            yield ": keepalive\n\n" if data is None else f"data: {data}\n\n"
@@ -1,35 +1,195 @@
+from datetime import datetime
 from typing import Any
 
-from django.db.models.query import QuerySet
-from django.views.generic import ListView
+from django.conf import settings
+from django.http import HttpRequest
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.utils.http import urlencode
+from django.views.decorators.http import condition
+from django.views.generic import TemplateView
 
-from todo_app.todo.models import Task
+from todo_app.core.middleware import get_disconnected
+from todo_app.system.weather.scheduler import record_task_views
+from todo_app.todo.models import Task, Weather, WeatherCell
+from todo_app.todo.pagination import KeysetPaginator
+from todo_app.todo.version import TaskListVersion
 
 
-class TaskListView(ListView):
-    """Return a view with a list of Task entries."""
+def get_task_list_paginators() -> dict[str, KeysetPaginator]:
+    """Return the paginators of the active and finished tasks on the list."""
+    return {
+        "active": KeysetPaginator(
+            Task.objects.filter(marked_as_done_at=""),
+            "created_at",
+            settings.TASK_PAGE_SIZE,
+        ),
+        "finished": KeysetPaginator(
+            Task.objects.filter(marked_as_done_at__ne=""),
+            "marked_as_done_at",
+            settings.TASK_PAGE_SIZE,
+        ),
+    }
 
-    template_name = "task/list.html"
 
-    def get_queryset(self) -> QuerySet[Any]:
-        """Return the list of Task objects"""
-        return Task.objects.all()
+def get_task_list_pipeline(
+    paginators: dict[str, KeysetPaginator], cursors: dict[str, str | None]
+) -> list[dict]:
+    """Return the aggregation that reads the pages of the task list with the weather.
+
+    The page of the first list is read by the pipeline itself and the pages of the
+    other lists are added with `$unionWith`, so the reads of all the pages start with
+    `$match`, `$sort` and `$limit` and use the indexes of the lists. Each task is then
+    read with its geo cell, in the `cells` field, and the name of its list is set in
+    the `list` field.
+
+    Args:
+        paginators (dict[str, KeysetPaginator]): Paginators of the lists.
+        cursors (dict[str, str | None]): Cursors of the pages of the lists.
+
+    Returns:
+        list[dict]: Stages of the aggregation.
+    """
+    pages = [
+        [*paginator.get_stages(cursors[name]), {"$addFields": {"list": name}}]
+        for name, paginator in paginators.items()
+    ]
+    first, *others = pages
+    return [
+        *first,
+        *(
+            {"$unionWith": {"coll": Task._get_collection_name(), "pipeline": page}}
+            for page in others
+        ),
+        {
+            "$lookup": {
+                "from": WeatherCell._get_collection_name(),
+                "localField": "cell_key",
+                "foreignField": "_id",
+                "as": "cells",
+            }
+        },
+    ]
+
+
+def _get_version(request: HttpRequest) -> tuple[str, datetime] | None:
+    """Return the version of the task list, read once for the request."""
+    if not hasattr(request, "task_list_version"):
+        request.task_list_version = TaskListVersion().get()
+    return request.task_list_version
+
+
+def _get_etag(request: HttpRequest, *args, **kwargs) -> str | None:
+    version = _get_version(request)
+    return None if version is None else version[0]
+
+
+def _get_last_modified(request: HttpRequest, *args, **kwargs) -> datetime | None:
+    version = _get_version(request)
+    return None if version is None else version[1]
+
+
+@method_decorator(
+    condition(etag_func=_get_etag, last_modified_func=_get_last_modified),
+    name="get",
+)
+class TaskListView(TemplateView):
+    """Return a view with a list of Task entries.
+
+    The list is reloaded by the browser every minute, so its requests are answered
+    with "304 Not Modified", without reading the tasks, if the version of the list has
+    not changed since the last one. The version is the same for all the pages of the
+    list. The views of the active tasks are recorded when the list is rendered, so
+    the version expires before the tasks stop being considered recently viewed.
+    If the changes are pushed to the list and the list is served by an ASGI server,
+    it's not reloaded, and the URL of the stream with the changes, which records the
+    views of the geo cells of the active tasks instead, is added to the context.
+    """
+
+    template_name = "task/list.html"
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         """Add additional context to the view.
 
         We want to be able to distinguish between active and finished tasks. Both those
         collections will be available as separate variables in the view so it's easier
-        to display them.
+        to display them. Each of them is paginated separately, with the cursors of
+        their pages in the `active` and `finished` query parameters.
+
+        Both pages and the weather of the geo cells of their tasks are read with a
+        single aggregation.
         """
         result = super().get_context_data(**kwargs)
 
-        all_tasks = self.get_queryset()
-        result["active_tasks"] = all_tasks.filter(marked_as_done_at="").order_by(
-            "-created_at"
-        )
-        result["finished_tasks"] = all_tasks.filter(marked_as_done_at__ne="").order_by(
-            "-marked_as_done_at"
-        )
+        paginators = get_task_list_paginators()
+        cursors = {name: self.request.GET.get(name) for name in paginators}
+        data = self._read(paginators, cursors)
+        stale = [name for name in paginators if cursors[name] and not data[name]]
+        if stale:
+            # The tasks after the cursor have been deleted or finished in the meantime,
+            # so the first page is read instead.
+            cursors.update(dict.fromkeys(stale))
+            data = self._read(paginators, cursors)
+
+        for name, paginator in paginators.items():
+            page = self._get_page(name, paginator, cursors[name], data[name])
+            result[f"{name}_tasks"] = page["items"]
+            result[f"{name}_page"] = page
+        record_task_views(result["active_tasks"])
+        if settings.TASK_EVENTS and get_disconnected(self.request) is not None:
+            cell_keys = dict.fromkeys(
+                task.cell_key for task in result["active_tasks"] if task.cell_key
+            )
+            query = urlencode({"cell": list(cell_keys)}, doseq=True)
+            result["task_events_url"] = f"{reverse('todo:task-events')}?{query}"
+
+        return result
 
+    def _read(
+        self, paginators: dict[str, KeysetPaginator], cursors: dict[str, str | None]
+    ) -> dict[str, list[dict]]:
+        """Read the pages of the lists and the weather in one aggregation.
+
+        Returns:
+            dict[str, list[dict]]: Tasks on the page of each list, with their geo cells.
+        """
+        result = {name: [] for name in paginators}
+        for document in Task.objects.aggregate(
+            get_task_list_pipeline(paginators, cursors)
+        ):
+            result[document.pop("list")].append(document)
         return result
+
+    def _get_page(
+        self,
+        parameter: str,
+        paginator: KeysetPaginator,
+        cursor: str | None,
+        documents: list[dict],
+    ) -> dict[str, Any]:
+        """Return the tasks on the requested page and the URLs of the other pages."""
+        page = paginator.get_page_from(
+            cursor, [self._get_task(document) for document in documents]
+        )
+        return {
+            "items": page.items,
+            "next_url": self._get_page_url(parameter, page.next_cursor),
+            "prev_url": self._get_page_url(parameter, page.prev_cursor),
+        }
+
+    def _get_task(self, document: dict) -> Task:
+        """Return the task read with the geo cell of the task, with its weather set."""
+        cells = document.pop("cells")
+        task = Task._from_son(document)
+        if cells and cells[0].get("weather"):
+            task.weather = Weather._from_son(cells[0]["weather"])
+        return task
+
+    def _get_page_url(self, parameter: str, cursor: str | None) -> str | None:
+        """Return the URL of the list with the given cursor and the other ones kept."""
+        if cursor is None:
+            return None
+
+        query = self.request.GET.copy()
+        query[parameter] = cursor
+        return f"?{query.urlencode()}"
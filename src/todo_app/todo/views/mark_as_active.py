@@ -3,6 +3,7 @@ from django.urls import reverse
 from django.views.decorators.http import require_http_methods
 from mongoengine.errors import ValidationError
 
+from todo_app.todo.events import publish_task_change
 from todo_app.todo.models import Task
 
 
@@ -29,5 +30,6 @@ def mark_as_active_view(request: HttpRequest, task_id: str) -> HttpResponseRedir
 
     task.marked_as_done_at = None
     task.save()
+    publish_task_change(task)
 
     return response
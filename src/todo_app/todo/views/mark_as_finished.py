@@ -4,6 +4,7 @@ from django.utils import timezone
 from django.views.decorators.http import require_http_methods
 from mongoengine.errors import ValidationError
 
+from todo_app.todo.events import publish_task_change
 from todo_app.todo.models import Task
 
 
@@ -30,5 +31,6 @@ def mark_as_finished_view(request: HttpRequest, task_id: str) -> HttpResponseRed
 
     task.marked_as_done_at = timezone.now()
     task.save()
+    publish_task_change(task)
 
     return response
@@ -28,6 +28,7 @@ def _get_values(
     static_files_dir: Optional[str] = "/tmp",
     time_zone: Optional[str] = "Europe/London",
     weather_api_key: Optional[str] = "sample_api_key",
+    weather_cell_precision: Optional[str] = "2",
     excluded_fields: Optional[List[str]] = None,
 ) -> Dict[str, str]:
     """
@@ -53,6 +54,7 @@ def _get_values(
         "STATIC_FILES_DIR": static_files_dir,
         "TIME_ZONE": time_zone,
         "WEATHER_API_KEY": weather_api_key,
+        "WEATHER_CELL_PRECISION": weather_cell_precision,
     }
 
     if excluded_fields:
@@ -88,6 +90,7 @@ def test_settings_are_correct():
         "static_files_dir": Path("/tmp"),
         "time_zone": "Europe/London",
         "weather_api_key": "sample_api_key",
+        "weather_cell_precision": 2,
     }
 
     with patch.dict(os.environ, _get_values()):
@@ -117,6 +120,7 @@ def test_settings_are_correct():
         assert config.static_files_dir == expected["static_files_dir"]
         assert config.time_zone == expected["time_zone"]
         assert config.weather_api_key == expected["weather_api_key"]
+        assert config.weather_cell_precision == expected["weather_cell_precision"]
 
 
 def test_static_files_dir(tmp_path):
@@ -221,6 +225,88 @@ def test_time_zone():
     assert config.time_zone == "Europe/Warsaw"
 
 
+@pytest.mark.parametrize("value, is_valid", (("50", True), ("0", False)))
+def test_task_page_size(value, is_valid):
+    """
+    Given an environment variable for TASK_PAGE_SIZE set
+    When we create a new object of AppConfig class
+    Then the value for task_page_size is set if it's positive
+    And otherwise a ValidationError is raised.
+    """
+    with patch.dict(os.environ, {"TODO_TASK_PAGE_SIZE": value, **_get_values()}):
+        if is_valid:
+            assert AppConfig().task_page_size == 50
+        else:
+            with pytest.raises(ValidationError):
+                AppConfig()
+
+
+@pytest.mark.parametrize("value, is_valid", (("60", True), ("0", False)))
+def test_task_list_version_timeout(value, is_valid):
+    """
+    Given an environment variable for TASK_LIST_VERSION_TIMEOUT set
+    When we create a new object of AppConfig class
+    Then the value for task_list_version_timeout is set if it's positive
+    And otherwise a ValidationError is raised.
+    """
+    with patch.dict(
+        os.environ, {"TODO_TASK_LIST_VERSION_TIMEOUT": value, **_get_values()}
+    ):
+        if is_valid:
+            assert AppConfig().task_list_version_timeout == 60
+        else:
+            with pytest.raises(ValidationError):
+                AppConfig()
+
+
+@pytest.mark.parametrize(
+    "version_timeout, view_timeout, is_valid",
+    (("300", "600", True), ("540", "600", False), ("600", "600", False)),
+)
+def test_task_list_version_timeout_with_view_timeout(
+    version_timeout, view_timeout, is_valid
+):
+    """
+    Given environment variables for TASK_LIST_VERSION_TIMEOUT and WEATHER_VIEW_TIMEOUT
+        set
+    When we create a new object of AppConfig class
+    Then the values are set if the version of the task list expires, and the list is
+        reloaded, before the views of the tasks expire
+    And otherwise a ValidationError is raised.
+    """
+    with patch.dict(
+        os.environ,
+        {
+            "TODO_TASK_LIST_VERSION_TIMEOUT": version_timeout,
+            "TODO_WEATHER_VIEW_TIMEOUT": view_timeout,
+            **_get_values(),
+        },
+    ):
+        if is_valid:
+            assert AppConfig().task_list_version_timeout == int(version_timeout)
+        else:
+            with pytest.raises(ValidationError, match="The version of the task list"):
+                AppConfig()
+
+
+@pytest.mark.parametrize(
+    "value, is_valid", (("true", True), ("incorrect-value", False))
+)
+def test_task_events(value, is_valid):
+    """
+    Given an environment variable for TASK_EVENTS set
+    When we create a new object of AppConfig class
+    Then the value for task_events is set if it's a boolean
+    And otherwise a ValidationError is raised.
+    """
+    with patch.dict(os.environ, {"TODO_TASK_EVENTS": value, **_get_values()}):
+        if is_valid:
+            assert AppConfig().task_events is True
+        else:
+            with pytest.raises(ValidationError):
+                AppConfig()
+
+
 def test_time_zone_incorrect_value():
     """
     Given an environment variable for TIME_ZONE set to an incorrect value
@@ -285,6 +371,185 @@ def test_weather_api_key():
     assert config.weather_api_key == "sample-key"
 
 
+def test_weather_cell_precision():
+    """
+    Given an environment variable for WEATHER_CELL_PRECISION set
+    When we create a new object of AppConfig class
+    Then the value for weather_cell_precision is set to a correct value.
+    """
+    with patch.dict(os.environ, _get_values(weather_cell_precision="3")):
+        config = AppConfig()
+
+    assert config.weather_cell_precision == 3
+
+
+@pytest.mark.parametrize("value", ("-1", "7", "1.5", "incorrect-value"))
+def test_weather_cell_precision_incorrect_value(value):
+    """
+    Given an environment variable for WEATHER_CELL_PRECISION set to an incorrect value
+    When we create a new object of AppConfig class
+    Then a ValidationError is raised.
+    """
+    with patch.dict(
+        os.environ, _get_values(weather_cell_precision=value)
+    ), pytest.raises(ValidationError):
+        AppConfig()
+
+
+@pytest.mark.parametrize(
+    "field_name, value, expected_result",
+    (
+        ("weather_provider", "fake", "fake"),
+        ("weather_secondary_provider", "openweather", "openweather"),
+        ("weather_secondary_provider", "", None),
+        ("weather_hedge_delay", "0.25", 0.25),
+        ("weather_forecast_mode", "true", True),
+        ("weather_forecast_max_age", "3600", 3600),
+        ("weather_cache_ttl", "30", 30),
+        ("weather_cache_lock_timeout", "33", 33),
+        ("weather_fetch_concurrency", "50", 50),
+        ("weather_fetch_timeout", "40.5", 40.5),
+        ("weather_http_connect_timeout", "1.5", 1.5),
+        ("weather_http_read_timeout", "2.5", 2.5),
+        ("weather_http_retries", "0", 0),
+        ("weather_http_backoff_factor", "1", 1.0),
+        ("weather_rate_limit", "0.5", 0.5),
+        ("weather_rate_limit_burst", "60", 60),
+        ("weather_rate_limit_max_wait", "0", 0.0),
+        ("weather_circuit_breaker_failure_threshold", "10", 10),
+        ("weather_circuit_breaker_reset_timeout", "60", 60),
+        ("weather_circuit_breaker_trial_requests", "1", 1),
+        ("weather_max_age", "300", 300),
+        ("weather_max_refresh_interval", "3600", 3600),
+        ("weather_change_threshold", "0.5", 0.5),
+        ("weather_view_timeout", "900", 900),
+        ("weather_refresh_chunk_size", "10", 10),
+        ("weather_refresh_max_tasks", "100", 100),
+        ("weather_refresh_batch_size", "50", 50),
+        ("weather_refresh_lock_timeout", "300", 300),
+        ("weather_prefetch_timeout", "30", 30),
+        ("weather_retry_max_attempts", "0", 0),
+        ("weather_retry_backoff", "30", 30),
+        ("weather_retry_dead_letter_size", "10", 10),
+        ("weather_write_batch_size", "100", 100),
+        ("weather_write_tolerance", "0.5", 0.5),
+        ("weather_write_concern", "0", 0),
+        ("weather_write_concern", "majority", "majority"),
+        ("weather_api_url", "http://localhost:8081", "http://localhost:8081"),
+        ("weather_api_url", "http://localhost:8081/", "http://localhost:8081"),
+    ),
+)
+def test_weather_optional_settings(field_name, value, expected_result):
+    """
+    Given an environment variable for an optional weather setting set
+    When we create a new object of AppConfig class
+    Then the value for that setting is set to a correct value.
+    """
+    with patch.dict(os.environ, {f"TODO_{field_name.upper()}": value, **_get_values()}):
+        config = AppConfig()
+
+    assert getattr(config, field_name) == expected_result
+
+
+@pytest.mark.parametrize(
+    "field_name, value",
+    (
+        ("weather_provider", "incorrect-value"),
+        ("weather_secondary_provider", "incorrect-value"),
+        ("weather_hedge_delay", "0"),
+        ("weather_forecast_mode", "incorrect-value"),
+        ("weather_forecast_max_age", "0"),
+        ("weather_cache_ttl", "0"),
+        ("weather_cache_lock_timeout", "incorrect-value"),
+        ("weather_fetch_concurrency", "0"),
+        ("weather_fetch_timeout", "0"),
+        ("weather_http_connect_timeout", "0"),
+        ("weather_http_read_timeout", "-1"),
+        ("weather_http_retries", "-1"),
+        ("weather_http_backoff_factor", "-0.5"),
+        ("weather_rate_limit", "0"),
+        ("weather_rate_limit_burst", "0"),
+        ("weather_rate_limit_max_wait", "-1"),
+        ("weather_circuit_breaker_failure_threshold", "0"),
+        ("weather_circuit_breaker_reset_timeout", "0"),
+        ("weather_circuit_breaker_trial_requests", "0"),
+        ("weather_max_age", "-1"),
+        ("weather_max_refresh_interval", "-1"),
+        ("weather_change_threshold", "-1"),
+        ("weather_view_timeout", "0"),
+        ("weather_refresh_chunk_size", "0"),
+        ("weather_refresh_max_tasks", "0"),
+        ("weather_refresh_batch_size", "0"),
+        ("weather_refresh_lock_timeout", "0"),
+        ("weather_prefetch_timeout", "0"),
+        ("weather_retry_max_attempts", "-1"),
+        ("weather_retry_backoff", "0"),
+        ("weather_retry_dead_letter_size", "0"),
+        ("weather_write_batch_size", "0"),
+        ("weather_write_tolerance", "-0.1"),
+        ("weather_write_concern", "-1"),
+        ("weather_write_concern", "incorrect-value"),
+    ),
+)
+def test_weather_optional_settings_incorrect_value(field_name, value):
+    """
+    Given an environment variable for an optional weather setting set to an incorrect
+        value
+    When we create a new object of AppConfig class
+    Then a ValidationError is raised.
+    """
+    with patch.dict(
+        os.environ, {f"TODO_{field_name.upper()}": value, **_get_values()}
+    ), pytest.raises(ValidationError):
+        AppConfig()
+
+
+@pytest.mark.parametrize(
+    "values",
+    (
+        {"weather_fetch_timeout": "30"},
+        {"weather_fetch_timeout": "31", "weather_secondary_provider": "fake"},
+        {"weather_http_retries": "3"},
+        {"weather_http_backoff_factor": "2.5"},
+        {"weather_rate_limit_max_wait": "10"},
+        {"weather_cache_lock_timeout": "40"},
+    ),
+)
+def test_weather_fetch_timeout_shorter_than_waits(values):
+    """
+    Given environment variables for the weather settings set
+    And the waits of a weather fetch don't fit within the fetch timeout
+    When we create a new object of AppConfig class
+    Then a ValidationError is raised.
+    """
+    environ = {f"TODO_{name.upper()}": value for name, value in values.items()}
+    with patch.dict(os.environ, {**environ, **_get_values()}), pytest.raises(
+        ValidationError, match="The weather fetch timeout is shorter"
+    ):
+        AppConfig()
+
+
+@pytest.mark.parametrize(
+    "values",
+    (
+        {"weather_cache_lock_timeout": "30"},
+        {"weather_http_read_timeout": "6"},
+    ),
+)
+def test_weather_cache_lock_timeout_shorter_than_waits(values):
+    """
+    Given environment variables for the weather settings set
+    And the waits of a weather fetch are longer than the lock of the cache entry
+    When we create a new object of AppConfig class
+    Then a ValidationError is raised.
+    """
+    environ = {f"TODO_{name.upper()}": value for name, value in values.items()}
+    with patch.dict(os.environ, {**environ, **_get_values()}), pytest.raises(
+        ValidationError, match="The weather cache lock timeout is shorter"
+    ):
+        AppConfig()
+
+
 def test_database_host():
     """
     Given an environment variable for DATABASE_HOST set
@@ -455,7 +720,7 @@ def test_cache_port():
 
 @pytest.mark.parametrize(
     "field_name",
-    ("DEBUG", "LOGGING_LEVEL", "TIME_ZONE"),
+    ("DEBUG", "LOGGING_LEVEL", "TIME_ZONE", "WEATHER_CELL_PRECISION"),
 )
 def test_missing_optional_fields(field_name):
     """
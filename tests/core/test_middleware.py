@@ -0,0 +1,133 @@
+import asyncio
+
+from django.test import RequestFactory
+from todo_app.core.middleware import (
+    DISCONNECTED_KEY,
+    DisconnectMiddleware,
+    get_disconnected,
+)
+
+
+def _get_receive(messages):
+    """Return a receive callable returning the given messages and then waiting."""
+    queue = asyncio.Queue()
+    for message in messages:
+        queue.put_nowait(message)
+    return queue.get
+
+
+async def _send(message):
+    pass
+
+
+def test_disconnect_after_body():
+    """
+    Given a request served through DisconnectMiddleware
+    When the client disconnects after the body of the request has been read
+    Then the event in the scope is set
+    And the app receives the disconnect after the body.
+    """
+    received = []
+
+    async def app(scope, receive, send):
+        received.append(await receive())
+        received.append(await receive())
+        await scope[DISCONNECTED_KEY].wait()
+        received.append(await receive())
+
+    asyncio.run(
+        DisconnectMiddleware(app)(
+            {"type": "http"},
+            _get_receive(
+                [
+                    {"type": "http.request", "body": b"a", "more_body": True},
+                    {"type": "http.request", "body": b"b"},
+                    {"type": "http.request", "body": b""},
+                    {"type": "http.disconnect"},
+                ]
+            ),
+            _send,
+        )
+    )
+
+    assert received == [
+        {"type": "http.request", "body": b"a", "more_body": True},
+        {"type": "http.request", "body": b"b"},
+        {"type": "http.disconnect"},
+    ]
+
+
+def test_disconnect_before_body():
+    """
+    Given a request served through DisconnectMiddleware
+    When the client disconnects before the body of the request has been read
+    Then the event in the scope is set.
+    """
+    disconnected = []
+
+    async def app(scope, receive, send):
+        await receive()
+        disconnected.append(scope[DISCONNECTED_KEY].is_set())
+
+    asyncio.run(
+        DisconnectMiddleware(app)(
+            {"type": "http"}, _get_receive([{"type": "http.disconnect"}]), _send
+        )
+    )
+
+    assert disconnected == [True]
+
+
+def test_without_disconnect():
+    """
+    Given a request served through DisconnectMiddleware
+    When the response is sent while the client is connected
+    Then the messages of the request are no longer read.
+    """
+    tasks = []
+
+    async def app(scope, receive, send):
+        await receive()
+        tasks.append(asyncio.all_tasks())
+
+    async def run():
+        await DisconnectMiddleware(app)(
+            {"type": "http"}, _get_receive([{"type": "http.request"}]), _send
+        )
+        await asyncio.sleep(0)
+        return asyncio.all_tasks()
+
+    remaining = asyncio.run(run())
+
+    assert len(tasks[0]) == 2
+    assert len(remaining) == 1
+
+
+def test_other_scope():
+    """
+    Given a scope other than an HTTP request
+    When it's served through DisconnectMiddleware
+    Then it's passed to the app unchanged.
+    """
+    scopes = []
+
+    async def app(scope, receive, send):
+        scopes.append(scope)
+
+    asyncio.run(DisconnectMiddleware(app)({"type": "lifespan"}, None, _send))
+
+    assert scopes == [{"type": "lifespan"}]
+
+
+def test_get_disconnected():
+    """
+    Given requests served with and without DisconnectMiddleware
+    When we call get_disconnected
+    Then the event is returned only for the request served through the middleware.
+    """
+    event = asyncio.Event()
+    request = RequestFactory().get("/")
+
+    assert get_disconnected(request) is None
+    request.scope = {DISCONNECTED_KEY: event}
+    assert get_disconnected(request) is event
@@ -1,141 +1,301 @@
-from unittest.mock import Mock, patch
+from unittest.mock import patch
 
 import pytest
-from django.conf import settings
+from kombu.exceptions import OperationalError
+from redis.exceptions import ConnectionError
 from todo_app.system.celery.tasks import (
-    update_weather_for_active_tasks,
-    update_weather_for_task,
+    WEATHER_PREFETCH_PRIORITY,
+    WEATHER_REFRESH_SKIPPED_KEY,
+    dispatch_weather_prefetch,
+    dispatch_weather_refresh,
+    prefetch_weather_for_task_task,
+    retry_weather_for_cells_task,
+    summarize_weather_refresh_task,
+    update_weather_for_active_tasks_task,
+    update_weather_for_cells_task,
 )
+from todo_app.system.lock import DistributedLock
+from todo_app.system.weather.cells import GeoCell
+from todo_app.system.weather.retries import RetryQueue
 from todo_app.todo.models import Task
 
 MODULE_PATH = "todo_app.system.celery.tasks"
 
 
-def _mock_response(status_code: int, data: dict) -> Mock:
-    """Return a mock HTTP response."""
-    result = Mock(status_code=status_code)
-    result.json.return_value = data
-    return result
-
-
-@patch(f"{MODULE_PATH}.requests.get")
-def test_update_weather_for_task(mock_get, task):
+@patch(f"{MODULE_PATH}.update_weather_for_cells")
+def test_update_weather_for_cells_task(mock_update):
     """
-    Given an active task
-    When we call update_weather_for_task for that task
-    And we get a correct response
-    Then the weather is updated for the task.
+    Given a chunk of geo cells
+    When we run update_weather_for_cells_task
+    Then the weather is updated for the cells in the chunk.
     """
-    task.weather = None
-    task.marked_as_done_at = None
-    task.save()
-
-    mock_get.return_value = _mock_response(
-        200,
-        {
-            "weather": [{"main": "Snow"}],
-            "main": {"temp": 10.0},
-        },
+    result = update_weather_for_cells_task(
+        [{"key": "1.00:2.00", "lat": 1.0, "lon": 2.0, "tasks": 3}]
     )
 
-    update_weather_for_task(task)
+    assert result == mock_update.return_value
+    (cells,), _ = mock_update.call_args
+    assert [(cell.key, cell.lat, cell.lon, cell.tasks) for cell in cells] == [
+        ("1.00:2.00", 1.0, 2.0, 3)
+    ]
 
-    mock_get.assert_called_once_with(
-        "https://api.openweathermap.org/data/2.5/weather",
-        params={
-            "lat": str(task.location.lat),
-            "lon": str(task.location.lon),
-            "appid": settings.WEATHER_API_KEY,
-            "units": "metric",
-        },
-    )
 
-    updated_task = Task.objects.get(id=task.id)
-    assert updated_task.weather.main == "Snow"
-    assert updated_task.weather.temperature == 10.0
+@patch.object(DistributedLock, "renewed")
+@patch(f"{MODULE_PATH}.update_weather_for_cells")
+def test_update_weather_for_cells_task_renews_lock(mock_update, mock_renewed):
+    """
+    Given a chunk of geo cells and the token of the weather refresh lock
+    When we run update_weather_for_cells_task
+    Then the lock is renewed while the weather is updated.
+    """
+    update_weather_for_cells_task([], "token")
+
+    mock_renewed.assert_called_once_with("token")
+    mock_renewed.return_value.__enter__.assert_called_once_with()
+    mock_update.assert_called_once()
 
 
-@patch(f"{MODULE_PATH}.requests.get")
-def test_update_weather_for_task_with_incorrect_response(mock_get, task):
+@patch.object(DistributedLock, "release")
+def test_summarize_weather_refresh_task(mock_release):
     """
-    Given an active task
-    When we call update_weather_for_task for that task
-    And we get a wrong response
-    Then the weather is not updated for the task.
+    Given summaries of all chunks of the weather refresh
+    When we run summarize_weather_refresh_task
+    Then the summaries are combined.
     """
-    task.weather = None
-    task.marked_as_done_at = None
-    task.save()
+    result = summarize_weather_refresh_task([{"cells": 1}, {"cells": 2}])
 
-    mock_get.return_value = _mock_response(400, {})
+    assert result == {"cells": 3}
+    mock_release.assert_not_called()
 
-    update_weather_for_task(task)
 
-    mock_get.assert_called_once_with(
-        "https://api.openweathermap.org/data/2.5/weather",
-        params={
-            "lat": str(task.location.lat),
-            "lon": str(task.location.lon),
-            "appid": settings.WEATHER_API_KEY,
-            "units": "metric",
-        },
-    )
+@patch.object(DistributedLock, "release")
+def test_summarize_weather_refresh_task_releases_lock(mock_release):
+    """
+    Given summaries of all chunks of the weather refresh and the token of its lock
+    When we run summarize_weather_refresh_task
+    Then the lock is released.
+    """
+    summarize_weather_refresh_task([{"cells": 1}], lock_token="token")
 
-    not_updated_task = Task.objects.get(id=task.id)
-    assert not_updated_task.weather is None
+    mock_release.assert_called_once_with("token")
 
 
 @pytest.mark.usefixtures("create_active_tasks")
 @pytest.mark.usefixtures("create_finished_tasks")
-@patch(f"{MODULE_PATH}.requests.get")
-def test_update_weather_for_active_tasks(mock_get):
+@patch.object(DistributedLock, "release")
+@patch.object(DistributedLock, "acquire", return_value="token")
+@patch(f"{MODULE_PATH}.chord")
+def test_dispatch_weather_refresh(mock_chord, mock_acquire, mock_release, settings):
     """
     Given active and finished tasks
-    When we call update_weather_for_active_tasks
-    And we get a correct response
-    Then the weather is updated for active tasks only.
-    """
-    for task in Task.objects.all():
-        task.weather = None
-        task.save()
-
-    mock_get.return_value = _mock_response(
-        200,
-        {
-            "weather": [{"main": "Snow"}],
-            "main": {"temp": 10.0},
-        },
-    )
+    When we call dispatch_weather_refresh
+    Then the geo cells with active tasks are split into chunks
+    And each chunk is updated by a separate task
+    And the summaries are combined once all chunks are finished.
+    """
+    settings.WEATHER_REFRESH_CHUNK_SIZE = 2
 
-    update_weather_for_active_tasks()
+    dispatch_weather_refresh()
 
-    # Check if all active tasks have the weather updated
-    assert all(
-        task.weather is not None for task in Task.objects.filter(marked_as_done_at="")
+    (header,), _ = mock_chord.call_args
+    chunks = [signature.args[0] for signature in header]
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert sorted(cell["key"] for chunk in chunks for cell in chunk) == sorted(
+        task.cell_key for task in Task.objects.filter(marked_as_done_at="")
     )
-
-    # Check if all finished tasks have the weather not updated
+    assert sum(cell["tasks"] for chunk in chunks for cell in chunk) == 5
     assert all(
-        task.weather is None for task in Task.objects.filter(marked_as_done_at__ne="")
+        signature.task == update_weather_for_cells_task.name
+        and signature.args[1] == mock_acquire.return_value
+        for signature in header
     )
 
+    (body,), _ = mock_chord.return_value.call_args
+    assert body.task == summarize_weather_refresh_task.name
+    assert body.kwargs == {"lock_token": mock_acquire.return_value}
+    mock_release.assert_not_called()
+
+
+@patch.object(DistributedLock, "release")
+@patch.object(DistributedLock, "acquire", return_value="token")
+@patch(f"{MODULE_PATH}.chord")
+def test_dispatch_weather_refresh_without_active_tasks(
+    mock_chord, mock_acquire, mock_release
+):
+    """
+    Given no active tasks
+    When we call dispatch_weather_refresh
+    Then no tasks are dispatched
+    And the lock of the weather refresh is released.
+    """
+    dispatch_weather_refresh()
+
+    mock_chord.assert_not_called()
+    mock_release.assert_called_once_with("token")
+
+
+@patch.object(DistributedLock, "release")
+@patch.object(DistributedLock, "acquire", return_value="token")
+@patch(f"{MODULE_PATH}.get_stale_cells", side_effect=RuntimeError)
+def test_dispatch_weather_refresh_with_error(mock_get, mock_acquire, mock_release):
+    """
+    Given the stale cells cannot be read
+    When we call dispatch_weather_refresh
+    Then the error is raised
+    And the lock of the weather refresh is released.
+    """
+    with pytest.raises(RuntimeError):
+        dispatch_weather_refresh()
+
+    mock_release.assert_called_once_with("token")
+
 
 @pytest.mark.usefixtures("create_active_tasks")
-@pytest.mark.usefixtures("create_finished_tasks")
-@patch(f"{MODULE_PATH}.requests.get")
-def test_update_weather_for_active_tasks_with_incorrect_response(mock_get):
+@pytest.mark.parametrize("cache_error", (None, ConnectionError))
+@patch.object(DistributedLock, "acquire", return_value=None)
+@patch(f"{MODULE_PATH}.chord")
+def test_dispatch_weather_refresh_in_progress(
+    mock_chord, mock_acquire, cache_client, cache_error, caplog
+):
     """
-    Given active and finished tasks
-    When we call update_weather_for_active_tasks
-    And we get a wrong response
-    Then the weather is not updated for any task.
+    Given active tasks
+    When we call dispatch_weather_refresh
+    And the previous weather refresh is still in progress
+    Then no tasks are dispatched
+    And the skipped refresh is logged and counted.
     """
-    for task in Task.objects.all():
-        task.weather = None
-        task.save()
+    cache_client.incr.side_effect = cache_error
 
-    mock_get.return_value = _mock_response(400, {})
+    dispatch_weather_refresh()
 
-    update_weather_for_active_tasks()
+    mock_chord.assert_not_called()
+    cache_client.incr.assert_called_once_with(WEATHER_REFRESH_SKIPPED_KEY)
+    assert "Weather refresh skipped" in caplog.text
+
+
+@patch(f"{MODULE_PATH}.dispatch_weather_refresh")
+def test_update_weather_for_active_tasks_task(mock_dispatch):
+    """
+    Given the periodic weather refresh task
+    When we run it
+    Then the weather refresh is dispatched.
+    """
+    update_weather_for_active_tasks_task()
+
+    mock_dispatch.assert_called_once_with()
+
+
+@patch.object(DistributedLock, "release")
+@patch(f"{MODULE_PATH}.update_weather_for_task")
+def test_prefetch_weather_for_task_task(mock_update, mock_release, task):
+    """
+    Given an existing task and the token of its prefetch lock
+    When we run prefetch_weather_for_task_task
+    Then the lock is released
+    And the weather is updated for the task.
+    """
+    prefetch_weather_for_task_task(str(task.id), "token")
+
+    mock_release.assert_called_once_with("token")
+    (updated_task,), _ = mock_update.call_args
+    assert updated_task.id == task.id
+
+
+@patch.object(DistributedLock, "release")
+@patch(f"{MODULE_PATH}.update_weather_for_task")
+def test_prefetch_weather_for_removed_task(mock_update, mock_release):
+    """
+    Given a task that has been removed
+    When we run prefetch_weather_for_task_task
+    Then the lock is released
+    And the weather is not updated.
+    """
+    prefetch_weather_for_task_task("64d0f1b1a1b2c3d4e5f60718", "token")
+
+    mock_release.assert_called_once_with("token")
+    mock_update.assert_not_called()
+
+
+@patch.object(DistributedLock, "acquire", return_value="token")
+@patch.object(prefetch_weather_for_task_task, "apply_async")
+def test_dispatch_weather_prefetch(mock_apply_async, mock_acquire):
+    """
+    Given a task without a queued weather prefetch
+    When we call dispatch_weather_prefetch
+    Then the prefetch is queued with the high priority.
+    """
+    dispatch_weather_prefetch("task-id")
+
+    mock_apply_async.assert_called_once_with(
+        ("task-id", "token"), priority=WEATHER_PREFETCH_PRIORITY
+    )
+
+
+@patch.object(DistributedLock, "acquire", return_value=None)
+@patch.object(prefetch_weather_for_task_task, "apply_async")
+def test_dispatch_weather_prefetch_already_queued(mock_apply_async, mock_acquire):
+    """
+    Given a task with a queued weather prefetch
+    When we call dispatch_weather_prefetch
+    Then the prefetch is not queued again.
+    """
+    dispatch_weather_prefetch("task-id")
+
+    mock_apply_async.assert_not_called()
+
+
+@patch.object(DistributedLock, "release")
+@patch.object(DistributedLock, "acquire", return_value="token")
+@patch.object(
+    prefetch_weather_for_task_task, "apply_async", side_effect=OperationalError
+)
+def test_dispatch_weather_prefetch_with_broker_not_available(
+    mock_apply_async, mock_acquire, mock_release, caplog
+):
+    """
+    Given the broker is not available
+    When we call dispatch_weather_prefetch
+    Then the lock of the prefetch is released
+    And a warning is logged.
+    """
+    dispatch_weather_prefetch("task-id")
+
+    mock_release.assert_called_once_with("token")
+    assert "has not been queued" in caplog.text
+
+
+@patch(f"{MODULE_PATH}.update_weather_for_cells")
+@patch.object(RetryQueue, "pop_due")
+def test_retry_weather_for_cells_task(mock_pop_due, mock_update, settings):
+    """
+    Given geo cells whose retry is due
+    When we run retry_weather_for_cells_task
+    Then the weather is updated for the cells in chunks until no retry is due
+    And the summaries of the chunks are combined.
+    """
+    settings.WEATHER_REFRESH_CHUNK_SIZE = 1
+    cells = [GeoCell(key=f"{index}.00:0.00", lat=index, lon=0.0) for index in range(2)]
+    mock_pop_due.side_effect = [[cells[0]], [cells[1]], []]
+    mock_update.return_value = {"cells": 1, "updated_cells": 1}
+
+    result = retry_weather_for_cells_task()
+
+    assert result == {"cells": 2, "updated_cells": 2}
+    assert [call.args for call in mock_pop_due.call_args_list] == [(1,), (1,), (1,)]
+    assert [call.args for call in mock_update.call_args_list] == [
+        ([cells[0]],),
+        ([cells[1]],),
+    ]
+
+
+@patch(f"{MODULE_PATH}.update_weather_for_cells")
+@patch.object(RetryQueue, "pop_due", return_value=[])
+def test_retry_weather_for_cells_task_without_due_retries(mock_pop_due, mock_update):
+    """
+    Given no geo cells whose retry is due
+    When we run retry_weather_for_cells_task
+    Then nothing is updated.
+    """
+    assert retry_weather_for_cells_task() == {}
 
-    assert all(task.weather is None for task in Task.objects.all())
+    mock_update.assert_not_called()
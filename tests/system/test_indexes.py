@@ -0,0 +1,96 @@
+from unittest.mock import patch
+
+import pytest
+from mongoengine.queryset import QuerySet
+from mongomock.database import Database
+from todo_app.system.indexes import (
+    find_collection_scans,
+    get_hot_queries,
+    get_indexed_documents,
+)
+from todo_app.todo.models import Task, WeatherCell
+
+INDEX_SCAN = {
+    "stage": "LIMIT",
+    "inputStage": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}},
+}
+COLLECTION_SCAN = {
+    "stage": "SUBPLAN",
+    "inputStage": {
+        "stage": "OR",
+        "inputStages": [{"stage": "IXSCAN"}, {"stage": "COLLSCAN"}],
+    },
+}
+
+
+def _get_plan(plan: dict) -> dict:
+    return {"queryPlanner": {"winningPlan": plan}}
+
+
+def test_get_indexed_documents():
+    """
+    Given the documents of the app
+    When we get the documents with the declared indexes
+    Then the tasks and the geo cells are returned.
+    """
+    assert get_indexed_documents() == [Task, WeatherCell]
+
+
+def test_get_hot_queries(settings):
+    """
+    Given the configured size of the task list pages
+    When we get the hot queries
+    Then the aggregation of the task list reads one more task than the page size of
+        each list.
+    """
+    settings.TASK_PAGE_SIZE = 5
+
+    result = get_hot_queries()
+
+    assert list(result) == [
+        "task list",
+        "active tasks of geo cells",
+        "geo cells with stale weather",
+    ]
+    document, pipeline = result["task list"]
+    assert document is Task
+    assert pipeline[2] == {"$limit": 6}
+    assert pipeline[4]["$unionWith"]["pipeline"][2] == {"$limit": 6}
+
+
+@pytest.mark.parametrize(
+    "aggregation_plan, plans, expected_result",
+    (
+        ({"stages": [{"$cursor": _get_plan(INDEX_SCAN)}]}, [INDEX_SCAN] * 2, []),
+        (
+            {"stages": [{"$unionWith": {"pipeline": [_get_plan(COLLECTION_SCAN)]}}]},
+            [INDEX_SCAN, {"stage": "COLLSCAN"}],
+            ["task list", "geo cells with stale weather"],
+        ),
+        (
+            {
+                "queryPlanner": {
+                    "winningPlan": INDEX_SCAN,
+                    "rejectedPlans": [{"stage": "COLLSCAN"}],
+                }
+            },
+            [COLLECTION_SCAN, INDEX_SCAN],
+            ["active tasks of geo cells"],
+        ),
+    ),
+)
+def test_find_collection_scans(aggregation_plan, plans, expected_result):
+    """
+    Given the plans of the hot queries
+    When we find the queries scanning the whole collection
+    Then the queries with a collection scan in any stage of the winning plan are
+        returned.
+    """
+    with patch.object(
+        QuerySet, "explain", side_effect=[_get_plan(plan) for plan in plans]
+    ), patch.object(Database, "command", return_value=aggregation_plan) as mock_command:
+        assert find_collection_scans() == expected_result
+
+    assert mock_command.call_args.args[0] == "explain"
+    assert mock_command.call_args.args[1]["aggregate"] == "task"
+    assert mock_command.call_args.kwargs == {"verbosity": "queryPlanner"}
@@ -0,0 +1,140 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from redis.exceptions import ConnectionError
+from todo_app.system.lock import DistributedLock
+
+KEY = "lock:sample"
+
+
+def _mock_pipe(token: str | None) -> MagicMock:
+    """Return a mock cache pipeline with the lock held with the given token."""
+    pipe = MagicMock()
+    pipe.get.return_value = token
+    return pipe
+
+
+def test_acquire(cache_client):
+    """
+    Given the lock is not held
+    When we call DistributedLock.acquire
+    Then the lock is stored in the cache with the lease
+    And the token of the holder is returned.
+    """
+    token = DistributedLock("sample", 1.5).acquire()
+
+    assert token
+    cache_client.set.assert_called_once_with(KEY, token, nx=True, px=1500)
+
+
+def test_acquire_held_lock(cache_client):
+    """
+    Given the lock is already held
+    When we call DistributedLock.acquire
+    Then None is returned.
+    """
+    cache_client.set.return_value = None
+
+    assert DistributedLock("sample", 10).acquire() is None
+
+
+def test_acquire_with_cache_not_available(cache_client):
+    """
+    Given the cache is not available
+    When we call DistributedLock.acquire
+    Then the lock is acquired.
+    """
+    cache_client.set.side_effect = ConnectionError
+
+    assert DistributedLock("sample", 10).acquire()
+
+
+@pytest.mark.parametrize("held_token, expected_result", (("a", True), ("b", False)))
+def test_extend(held_token, expected_result):
+    """
+    Given the lock held with a token
+    When we renew the lease with a token
+    Then the lease is renewed only if the tokens match.
+    """
+    pipe = _mock_pipe(held_token)
+
+    assert DistributedLock("sample", 10)._extend(pipe, token="a") is expected_result
+
+    assert pipe.pexpire.called is expected_result
+    if expected_result:
+        pipe.pexpire.assert_called_once_with(KEY, 10000)
+
+
+@pytest.mark.parametrize("held_token, expected_result", (("a", True), (None, False)))
+def test_release(held_token, expected_result):
+    """
+    Given the lock held with a token or not held
+    When we release the lock with a token
+    Then the lock is released only if the tokens match.
+    """
+    pipe = _mock_pipe(held_token)
+
+    assert DistributedLock("sample", 10)._release(pipe, token="a") is expected_result
+
+    assert pipe.delete.called is expected_result
+
+
+def test_extend_and_release_in_transactions(cache_client):
+    """
+    Given the lock held with a token
+    When we call DistributedLock.extend and DistributedLock.release
+    Then the lock is changed in transactions
+    And the results of the transactions are returned.
+    """
+    cache_client.transaction.side_effect = [True, False]
+    lock = DistributedLock("sample", 10)
+
+    assert lock.extend("a") is True
+    assert lock.release("a") is False
+
+    assert [call.args[1] for call in cache_client.transaction.call_args_list] == [
+        KEY,
+        KEY,
+    ]
+
+
+def test_extend_with_cache_not_available(cache_client):
+    """
+    Given the cache is not available
+    When we call DistributedLock.extend
+    Then False is returned.
+    """
+    cache_client.transaction.side_effect = ConnectionError
+
+    assert DistributedLock("sample", 10).extend("a") is False
+
+
+@patch.object(DistributedLock, "extend", return_value=True)
+def test_renewed(mock_extend):
+    """
+    Given the lock held with a token
+    When a block is executed with the lock renewed
+    Then the lease is renewed when the block starts and periodically after that.
+    """
+    with DistributedLock("sample", 0.03).renewed("a"):
+        while mock_extend.call_count < 3:
+            time.sleep(0.01)
+
+    mock_extend.assert_called_with("a")
+
+
+@patch.object(DistributedLock, "extend", side_effect=[True, False])
+def test_renewed_with_lost_lock(mock_extend, caplog):
+    """
+    Given the lock held with a token
+    When a block is executed with the lock renewed
+    And the lock is lost
+    Then the lease is not renewed anymore
+    And a warning is logged.
+    """
+    with DistributedLock("sample", 0.03).renewed("a"):
+        while "has been lost" not in caplog.text:
+            time.sleep(0.01)
+
+    assert mock_extend.call_count == 2
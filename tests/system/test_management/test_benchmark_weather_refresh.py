@@ -0,0 +1,110 @@
+from unittest.mock import patch
+
+import pytest
+from django.core.management import CommandError, call_command
+from todo_app.system.weather.cells import get_cell_key
+from todo_app.todo.models import Location, Task, Weather, WeatherCell
+from todo_app.todo.version import TaskListVersion
+
+
+def test_benchmark_weather_refresh(cache_client, capsys, settings):
+    """
+    Given the number of tasks and locations
+    And an existing task with the weather of its geo cell
+    When we run the benchmark of the weather refresh
+    Then the weather is refreshed against the stub of the Weather API
+    And the results are printed
+    And only the geo cells of the created tasks are refreshed
+    And the failed cells are not queued and the task lists are not notified
+    And the created tasks, geo cells and cache entries are deleted
+    And the shared circuit breaker, rate limiter and counter of requests are not used.
+    """
+    settings.WEATHER_API_URL = "https://api.openweathermap.org"
+    settings.WEATHER_WRITE_BATCH_SIZE = 2
+    task = Task.objects.create(
+        content="Existing task", location=Location(lat=1.0, lon=2.0, label="Home")
+    )
+    WeatherCell(
+        key=task.cell_key, lat=1.0, lon=2.0, weather=Weather(main="Snow", temperature=0)
+    ).save()
+
+    with patch(
+        "todo_app.system.weather.refresh.RetryQueue"
+    ) as mock_retry_queue, patch.object(TaskListVersion, "bump") as mock_bump:
+        call_command(
+            "benchmark_weather_refresh",
+            "--tasks",
+            "10",
+            "--locations",
+            "3",
+            "--seed",
+            "1",
+        )
+
+    stdout, _ = capsys.readouterr()
+
+    assert "Tasks: 10 in 3 cells" in stdout
+    assert "Wall time:" in stdout
+    assert "API calls: 3 (200: 3)" in stdout
+    assert (
+        "Mongo writes: 4 bulk writes for 3 cells, weather of 3 cells written and 0"
+        " skipped" in stdout
+    )
+    mock_retry_queue.assert_not_called()
+    mock_bump.assert_not_called()
+    assert list(Task.objects.scalar("content")) == ["Existing task"]
+    assert list(WeatherCell.objects.scalar("key")) == [task.cell_key]
+    assert WeatherCell.objects.get(key=task.cell_key).weather.main == "Snow"
+    # The cache entries of the locations, the statistics and the state of the circuit
+    # breaker and the rate limiter are deleted before and after the refresh, and the
+    # shared ones are not used.
+    first_keys = cache_client.delete.call_args_list[0].args
+    assert len(first_keys) == 9
+    assert all(key.startswith("weather:benchmark:") for key in first_keys)
+    assert cache_client.delete.call_args_list[-1].args == first_keys
+    assert not any(
+        call.args[0].startswith("weather:cache:")
+        for call in cache_client.get.mock_calls
+    )
+    cache_client.incr.assert_any_call("weather:benchmark:api:requests")
+    assert {
+        call.args[1] for call in cache_client.transaction.mock_calls if call.args
+    } >= {"weather:benchmark:circuit_breaker", "weather:benchmark:rate_limiter"}
+    assert not any(
+        call.args[1] in ("weather:circuit_breaker", "weather:rate_limiter")
+        for call in cache_client.transaction.mock_calls
+        if call.args
+    )
+
+
+def test_benchmark_weather_refresh_with_existing_cells(cache_client, capsys, settings):
+    """
+    Given geo cells that exist already
+    When we run the benchmark of the weather refresh
+    And the generated locations are in those cells
+    Then other locations are generated instead.
+    """
+    settings.WEATHER_API_URL = "https://api.openweathermap.org"
+    with patch(
+        "todo_app.system.management.commands.benchmark_weather_refresh.random.Random"
+    ) as mock_random:
+        mock_random.return_value.uniform.side_effect = [1.0, 2.0, 3.0, 4.0]
+        WeatherCell(key=get_cell_key(1.0, 2.0, 2), lat=1.0, lon=2.0).save()
+
+        call_command("benchmark_weather_refresh", "--tasks", "1")
+
+    stdout, _ = capsys.readouterr()
+
+    assert "Tasks: 1 in 1 cells" in stdout
+    assert list(WeatherCell.objects.scalar("key")) == [get_cell_key(1.0, 2.0, 2)]
+
+
+@pytest.mark.parametrize("option", ("--tasks", "--locations"))
+def test_benchmark_weather_refresh_with_incorrect_value(option):
+    """
+    Given a number of tasks or locations that is not positive
+    When we run the benchmark of the weather refresh
+    Then the command fails.
+    """
+    with pytest.raises(CommandError):
+        call_command("benchmark_weather_refresh", option, "0")
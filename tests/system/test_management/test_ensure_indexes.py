@@ -0,0 +1,106 @@
+from unittest.mock import patch
+
+import pytest
+from django.core.management import CommandError, call_command
+from todo_app.todo.models import Task, WeatherCell
+
+
+def _get_index_keys(document) -> set:
+    return {
+        tuple(index["key"].items())
+        for index in document._get_collection().list_indexes()
+    }
+
+
+def test_ensure_indexes(capsys):
+    """
+    Given the document store without the declared indexes
+    And an index that is not declared
+    When we run the command that ensures the indexes
+    Then the drift is reported
+    And the declared indexes are built
+    And the undeclared index is kept.
+    """
+    Task._get_collection().create_index("title")
+
+    call_command("ensure_indexes")
+
+    stdout, _ = capsys.readouterr()
+    assert stdout.splitlines() == [
+        "task: missing index (marked_as_done_at, cell_key)",
+        "task: missing index (marked_as_done_at, -created_at, -_id)",
+        "task: missing index (-marked_as_done_at, -_id)",
+        "task: index (title) is not declared",
+        "task: declared indexes are built.",
+        "weather_cell: missing index (weather.next_refresh_at)",
+        "weather_cell: declared indexes are built.",
+    ]
+    assert (("marked_as_done_at", 1), ("cell_key", 1)) in _get_index_keys(Task)
+    assert (("title", 1),) in _get_index_keys(Task)
+    assert (("weather.next_refresh_at", 1),) in _get_index_keys(WeatherCell)
+
+
+def test_ensure_indexes_without_drift(capsys):
+    """
+    Given the document store with the declared indexes
+    When we run the command that checks the indexes
+    Then no drift is reported.
+    """
+    Task.ensure_indexes()
+    WeatherCell.ensure_indexes()
+
+    call_command("ensure_indexes", "--check")
+
+    stdout, _ = capsys.readouterr()
+    assert stdout == ""
+
+
+def test_ensure_indexes_check_with_drift(capsys):
+    """
+    Given the document store without the declared indexes
+    When we run the command that checks the indexes
+    Then the drift is reported
+    And an error is raised
+    And the indexes are not built.
+    """
+    with pytest.raises(CommandError, match="The indexes differ from the declared"):
+        call_command("ensure_indexes", "--check")
+
+    stdout, _ = capsys.readouterr()
+    assert "task: missing index (marked_as_done_at, cell_key)" in stdout
+    assert (("marked_as_done_at", 1), ("cell_key", 1)) not in _get_index_keys(Task)
+
+
+@patch("todo_app.system.management.commands.ensure_indexes.find_collection_scans")
+def test_ensure_indexes_explain(mock_find_collection_scans, capsys):
+    """
+    Given the hot queries that use indexes
+    When we run the command that ensures the indexes and explains the hot queries
+    Then it's reported that the hot queries use indexes.
+    """
+    mock_find_collection_scans.return_value = []
+
+    call_command("ensure_indexes", "--explain")
+
+    stdout, _ = capsys.readouterr()
+    assert stdout.splitlines()[-1] == "All the hot queries use indexes."
+
+
+@patch("todo_app.system.management.commands.ensure_indexes.find_collection_scans")
+def test_ensure_indexes_explain_with_collection_scans(mock_find_collection_scans):
+    """
+    Given hot queries that scan the whole collection
+    When we run the command that ensures the indexes and explains the hot queries
+    Then an error with the names of the queries is raised.
+    """
+    mock_find_collection_scans.return_value = [
+        "task list",
+        "active tasks of geo cells",
+    ]
+
+    with pytest.raises(
+        CommandError,
+        match="Queries scanning the whole collection: task list, active tasks of geo"
+        " cells.",
+    ):
+        call_command("ensure_indexes", "--explain")
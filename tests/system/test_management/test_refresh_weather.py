@@ -0,0 +1,167 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from django.core.management import CommandError, call_command
+from redis.exceptions import ConnectionError
+from todo_app.system.management.commands import refresh_weather
+from todo_app.system.weather.cache import WeatherCache
+from todo_app.system.weather.rate_limiter import RateLimiter
+from todo_app.todo.models import WeatherCell
+
+MODULE_PATH = "todo_app.system.management.commands.refresh_weather"
+
+
+@pytest.mark.usefixtures("create_active_tasks")
+@patch(f"{MODULE_PATH}.get_api_requests", side_effect=[3, 5])
+@patch.object(WeatherCache, "get_stats")
+@patch.object(RateLimiter, "get_stats")
+def test_refresh_weather(
+    mock_get_limiter_stats, mock_get_stats, mock_get_api_requests, capsys, settings
+):
+    """
+    Given active tasks in geo cells with weather that is not due for a refresh
+    When we run the command that refreshes the weather with parallel workers
+    Then the weather of all the cells is refreshed in chunks
+    And the throughput, the API calls, the cache hits, the throttled calls and the
+        writes are reported.
+    """
+    settings.WEATHER_PROVIDER = "fake"
+    settings.WEATHER_REFRESH_CHUNK_SIZE = 2
+    mock_get_stats.side_effect = [
+        {"hits": 1, "misses": 2},
+        {"hits": 4, "misses": 6},
+    ]
+    mock_get_limiter_stats.side_effect = [
+        {"tokens": 10.0, "throttled": 1},
+        {"tokens": 2.5, "throttled": 3},
+    ]
+
+    call_command("refresh_weather", "--workers", "2")
+
+    stdout, _ = capsys.readouterr()
+    lines = stdout.splitlines()
+    assert lines[0] == "Tasks: 5 in 5 cells"
+    assert lines[1].startswith("Wall time: ")
+    assert lines[2:] == [
+        "API calls: 2",
+        "Cache: 3 hits, 4 misses",
+        "Rate limiter: 2 calls throttled, 2.5 tokens left",
+        "Mongo writes: weather of 5 cells written and 0 skipped, 0 cells failed and 0"
+        " deferred",
+    ]
+    assert {cell.weather.main for cell in WeatherCell.objects.all()} == {"Clear"}
+
+
+@pytest.mark.usefixtures("create_active_tasks")
+def test_refresh_weather_dry_run(capsys):
+    """
+    Given active tasks in geo cells
+    When we run the command that refreshes the weather with the filters and a dry run
+    Then the matching cells are listed
+    And their weather is not refreshed.
+    """
+    call_command(
+        "refresh_weather",
+        "--cell",
+        "1.00:1.00",
+        "2.00:2.00",
+        "3.00:3.00",
+        "--since",
+        "2024-01-01T12:00:00",
+        "--limit",
+        "2",
+        "--dry-run",
+    )
+
+    stdout, _ = capsys.readouterr()
+    assert stdout.splitlines() == [
+        "1.00:1.00: 1 tasks",
+        "2.00:2.00: 1 tasks",
+        "Weather of 2 geo cells with 2 tasks would be refreshed.",
+    ]
+    assert {cell.weather.main for cell in WeatherCell.objects.all()} == {"Snow"}
+
+
+def test_refresh_weather_without_cells(capsys):
+    """
+    Given no active tasks
+    When we run the command that refreshes the weather
+    Then nothing is refreshed.
+    """
+    call_command("refresh_weather")
+
+    stdout, _ = capsys.readouterr()
+    assert stdout == "There are no geo cells to refresh.\n"
+
+
+@pytest.mark.usefixtures("create_active_tasks")
+@patch.object(WeatherCache, "get_stats", side_effect=ConnectionError)
+def test_refresh_weather_with_cache_not_available(
+    mock_get_stats, cache_client, capsys, settings
+):
+    """
+    Given active tasks
+    And the cache that is not available
+    When we run the command that refreshes the weather
+    Then the API calls, the cache hits and the throttled calls are not reported.
+    """
+    settings.WEATHER_PROVIDER = "fake"
+    cache_client.hget.side_effect = ConnectionError
+
+    call_command("refresh_weather")
+
+    stdout, _ = capsys.readouterr()
+    assert "API calls and cache hits: not available" in stdout.splitlines()
+    assert "Rate limiter: not available" in stdout.splitlines()
+
+
+@pytest.mark.usefixtures("create_active_tasks")
+@patch(f"{MODULE_PATH}.ProcessPoolExecutor")
+def test_refresh_weather_with_process_pool(mock_pool, settings):
+    """
+    Given active tasks
+    When we run the command that refreshes the weather in a pool of processes
+    Then the chunks are updated by the processes started from scratch.
+    """
+    settings.WEATHER_PROVIDER = "fake"
+    mock_pool.return_value = ThreadPoolExecutor(max_workers=1)
+
+    call_command("refresh_weather", "--workers", "3", "--pool", "process")
+
+    _, kwargs = mock_pool.call_args
+    assert kwargs["max_workers"] == 3
+    assert kwargs["mp_context"].get_start_method() == "spawn"
+    assert kwargs["initializer"] is refresh_weather._setup_worker
+    assert {cell.weather.main for cell in WeatherCell.objects.all()} == {"Clear"}
+
+
+@patch("django.setup")
+def test_setup_worker(mock_setup):
+    """
+    Given a worker process
+    When it's initialized
+    Then Django is set up.
+    """
+    refresh_weather._setup_worker()
+
+    mock_setup.assert_called_once_with()
+
+
+@pytest.mark.parametrize(
+    "args, message",
+    (
+        (["--workers", "0"], "The number of workers must be positive."),
+        (["--limit", "0"], "The limit must be positive."),
+        (["--ids", "incorrect-id"], "Invalid task IDs: incorrect-id."),
+        (["--since", "yesterday"], "invalid time: 'yesterday'"),
+    ),
+)
+def test_refresh_weather_with_incorrect_arguments(args, message):
+    """
+    Given incorrect arguments
+    When we run the command that refreshes the weather
+    Then an error is raised.
+    """
+    with pytest.raises(CommandError, match=message):
+        call_command("refresh_weather", *args)
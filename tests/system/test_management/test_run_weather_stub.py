@@ -0,0 +1,21 @@
+from unittest.mock import patch
+
+from django.core.management import call_command
+
+
+@patch("todo_app.system.weather.stub_server.StubWeatherServer.serve_forever")
+def test_run_weather_stub(mock_serve_forever, capsys):
+    """
+    Given the address and the behaviour of the stub
+    When we run the stub of the Weather API
+    Then the requests are served until the command is interrupted
+    And the URL of the stub is printed.
+    """
+    mock_serve_forever.side_effect = KeyboardInterrupt
+
+    call_command("run_weather_stub", "--port", "0", "--latency", "0")
+
+    stdout, _ = capsys.readouterr()
+
+    mock_serve_forever.assert_called_once_with()
+    assert "Weather API stub is listening on http://127.0.0.1:" in stdout
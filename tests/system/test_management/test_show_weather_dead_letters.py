@@ -0,0 +1,28 @@
+import json
+
+from django.core.management import call_command
+
+
+def test_show_weather_dead_letters(cache_client, capsys):
+    """
+    Given geo cells with exhausted retries
+    When we run the command that shows the dead letters
+    Then the cells are listed with their attempts and tasks.
+    """
+    cache_client.lrange.return_value = [
+        json.dumps(
+            {
+                "cell": {"key": "51.51:-0.13", "lat": 51.51, "lon": -0.13, "tasks": 3},
+                "attempts": 6,
+                "failed_at": 1704110400.5,
+            }
+        )
+    ]
+
+    call_command("show_weather_dead_letters")
+
+    stdout, _ = capsys.readouterr()
+    assert stdout.splitlines() == [
+        "2024-01-01T12:00:00+00:00 51.51:-0.13: 6 attempts, 3 tasks",
+        "Geo cells with exhausted retries: 1.",
+    ]
@@ -0,0 +1,105 @@
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.utils import timezone
+from todo_app.todo.models import Location, Task, WeatherCell
+from todo_app.todo.version import TaskListVersion
+
+
+def test_update_task_cells(capsys, settings):
+    """
+    Given tasks without the cell keys and with the weather embedded
+    When we run the command that updates the cells of the tasks
+    Then the cell keys are set for all the tasks in batches
+    And the embedded weather is removed
+    And the version of the task list is changed.
+    """
+    settings.WEATHER_WRITE_BATCH_SIZE = 2
+    for index in range(3):
+        Task.objects.create(
+            content=f"Sample task {index}",
+            location=Location(lat=51.5085, lon=index + 0.001, label="Location"),
+        )
+    Task._get_collection().update_many(
+        {},
+        {
+            "$set": {"weather": {"main": "Snow", "temperature": 0.0}},
+            "$unset": {"cell_key": ""},
+        },
+    )
+
+    with patch.object(TaskListVersion, "bump") as mock_bump:
+        call_command("update_task_cells")
+
+    mock_bump.assert_called_once_with()
+    stdout, _ = capsys.readouterr()
+    assert "Cell keys of 3 tasks have been updated." in stdout
+    documents = list(Task._get_collection().find().sort("location.lon"))
+    assert [document["cell_key"] for document in documents] == [
+        "51.51:0.00",
+        "51.51:1.00",
+        "51.51:2.00",
+    ]
+    assert all("weather" not in document for document in documents)
+
+
+def test_update_task_cells_with_updated_tasks(capsys):
+    """
+    Given tasks with the cell keys set, one of them with the weather embedded
+    When we run the command that updates the cells of the tasks
+    Then only the task with the weather embedded is updated.
+    """
+    for index in range(2):
+        Task.objects.create(
+            content=f"Sample task {index}",
+            location=Location(lat=51.5085, lon=index + 0.001, label="Location"),
+        )
+    Task._get_collection().update_one(
+        {"location.lon": 1.001},
+        {"$set": {"weather": {"main": "Snow", "temperature": 0.0}}},
+    )
+
+    call_command("update_task_cells")
+
+    stdout, _ = capsys.readouterr()
+    assert "Cell keys of 1 tasks have been updated." in stdout
+    assert all("weather" not in document for document in Task._get_collection().find())
+
+
+def test_update_task_cells_without_tasks(capsys):
+    """
+    Given no tasks
+    When we run the command that updates the cells of the tasks
+    Then no tasks are updated
+    And the version of the task list is not changed.
+    """
+    with patch.object(TaskListVersion, "bump") as mock_bump:
+        call_command("update_task_cells")
+
+    mock_bump.assert_not_called()
+    stdout, _ = capsys.readouterr()
+    assert "Cell keys of 0 tasks have been updated." in stdout
+
+
+def test_update_task_cells_creates_cells_of_active_tasks(settings):
+    """
+    Given active and finished tasks in geo cells that don't exist
+    When we run the command that updates the cells of the tasks
+    Then the cells of the active tasks are created in batches.
+    """
+    settings.WEATHER_WRITE_BATCH_SIZE = 2
+    for index in range(4):
+        Task.objects.create(
+            content=f"Sample task {index}",
+            location=Location(lat=index, lon=index, label="Location"),
+            marked_as_done_at=timezone.now() if index == 3 else None,
+        )
+    WeatherCell.objects.delete()
+
+    call_command("update_task_cells")
+
+    assert sorted(WeatherCell.objects.scalar("key")) == [
+        "0.00:0.00",
+        "1.00:1.00",
+        "2.00:2.00",
+    ]
@@ -0,0 +1,254 @@
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+from django.conf import settings
+from redis.exceptions import ConnectionError
+from todo_app.system.weather.api import (
+    API_REQUESTS_KEY,
+    fetch_forecast,
+    fetch_weather,
+    get_api_requests,
+)
+from todo_app.system.weather.circuit_breaker import CircuitBreaker
+from todo_app.system.weather.providers import WeatherFetchSkippedError
+from todo_app.system.weather.rate_limiter import RateLimiter
+
+
+def _mock_response(status_code: int, data: dict) -> Mock:
+    """Return a mock HTTP response."""
+    result = Mock(status_code=status_code)
+    result.json.return_value = data
+    return result
+
+
+@patch("requests.Session.get")
+def test_fetch_weather(mock_get):
+    """
+    Given coordinates
+    When we call fetch_weather
+    And we get a correct response
+    Then the weather for the coordinates is returned.
+    """
+    mock_get.return_value = _mock_response(
+        200,
+        {
+            "weather": [{"main": "Snow"}, {"main": "Mist"}],
+            "main": {"temp": 10.0},
+        },
+    )
+
+    result = fetch_weather(10.0, 20.0)
+
+    mock_get.assert_called_once_with(
+        "https://api.openweathermap.org/data/2.5/weather",
+        params={
+            "lat": "10.0",
+            "lon": "20.0",
+            "appid": settings.WEATHER_API_KEY,
+            "units": "metric",
+        },
+        timeout=(
+            settings.WEATHER_HTTP_CONNECT_TIMEOUT,
+            settings.WEATHER_HTTP_READ_TIMEOUT,
+        ),
+    )
+    assert result.main == "Snow"
+    assert result.temperature == 10.0
+    assert result.fetched_at is not None
+
+
+@patch("requests.Session.get")
+def test_fetch_forecast(mock_get, settings):
+    """
+    Given coordinates
+    When we call fetch_forecast
+    And we get a correct response
+    Then the forecast for the coordinates is returned with its slots stored compactly.
+    """
+    settings.WEATHER_FORECAST_MAX_AGE = 10800
+    mock_get.return_value = _mock_response(
+        200,
+        {
+            "list": [
+                {"dt": 1704110400, "weather": [{"main": "Snow"}], "main": {"temp": 1}},
+                {"dt": 1704121200, "weather": [{"main": "Rain"}], "main": {"temp": 3}},
+            ]
+        },
+    )
+
+    result = fetch_forecast(10.0, 20.0)
+
+    assert mock_get.call_args.args == (
+        "https://api.openweathermap.org/data/2.5/forecast",
+    )
+    assert mock_get.call_args.kwargs["params"]["cnt"] == "2"
+    assert result.fetched_at
+    assert result.starts_at == 1704110400
+    assert result.interval == 10800
+    assert result.conditions == ["Snow", "Rain"]
+    assert result.temperatures == [1.0, 3.0]
+
+
+@patch("requests.Session.get")
+def test_fetch_forecast_with_incorrect_response(mock_get):
+    """
+    Given coordinates
+    When we call fetch_forecast
+    And we get a wrong response
+    Then None is returned.
+    """
+    mock_get.return_value = _mock_response(500, {})
+
+    assert fetch_forecast(10.0, 20.0) is None
+
+
+@patch("requests.Session.get")
+def test_fetch_weather_with_incorrect_response(mock_get):
+    """
+    Given coordinates
+    When we call fetch_weather
+    And we get a wrong response
+    Then None is returned.
+    """
+    mock_get.return_value = _mock_response(400, {})
+
+    assert fetch_weather(10.0, 20.0) is None
+
+
+@patch("requests.Session.get")
+def test_fetch_weather_with_connection_error(mock_get):
+    """
+    Given coordinates
+    When we call fetch_weather
+    And the request fails
+    Then None is returned.
+    """
+    mock_get.side_effect = requests.Timeout
+
+    assert fetch_weather(10.0, 20.0) is None
+
+
+@pytest.mark.parametrize(
+    "status_code, is_failure",
+    ((200, False), (400, False), (401, False), (429, True), (500, True), (503, True)),
+)
+@patch.object(CircuitBreaker, "record_failure")
+@patch.object(CircuitBreaker, "record_success")
+@patch("requests.Session.get")
+def test_fetch_weather_records_result(
+    mock_get, mock_record_success, mock_record_failure, status_code, is_failure
+):
+    """
+    Given coordinates
+    When we call fetch_weather
+    Then the result of the request is recorded by the circuit breaker
+    And only server errors and exceeded limits are recorded as failures.
+    """
+    mock_get.return_value = _mock_response(
+        status_code, {"weather": [{"main": "Snow"}], "main": {"temp": 10.0}}
+    )
+
+    fetch_weather(10.0, 20.0)
+
+    assert mock_record_success.called is (status_code == 200)
+    assert mock_record_failure.called is is_failure
+
+
+@patch.object(CircuitBreaker, "record_failure")
+@patch("requests.Session.get")
+def test_fetch_weather_records_connection_error(mock_get, mock_record_failure):
+    """
+    Given coordinates
+    When we call fetch_weather
+    And the request fails
+    Then the failure is recorded by the circuit breaker.
+    """
+    mock_get.side_effect = requests.ConnectionError
+
+    fetch_weather(10.0, 20.0)
+
+    mock_record_failure.assert_called_once_with()
+
+
+@patch.object(RateLimiter, "acquire")
+@patch.object(CircuitBreaker, "allow_request", return_value=False)
+@patch("requests.Session.get")
+def test_fetch_weather_with_circuit_open(mock_get, mock_allow_request, mock_acquire):
+    """
+    Given coordinates
+    When we call fetch_weather
+    And the Weather API is failing
+    Then the weather is not fetched
+    And no rate limit token is taken
+    And the fetch is reported as skipped.
+    """
+    with pytest.raises(WeatherFetchSkippedError):
+        fetch_weather(10.0, 20.0)
+
+    mock_get.assert_not_called()
+    mock_acquire.assert_not_called()
+
+
+@patch.object(RateLimiter, "acquire", return_value=False)
+@patch("requests.Session.get")
+def test_fetch_weather_with_rate_limit_reached(mock_get, mock_acquire):
+    """
+    Given coordinates
+    When we call fetch_weather
+    And the rate limit is reached
+    Then the weather is not fetched
+    And the fetch is reported as skipped.
+    """
+    with pytest.raises(WeatherFetchSkippedError):
+        fetch_weather(10.0, 20.0)
+
+    mock_get.assert_not_called()
+
+
+@patch("requests.Session.get")
+def test_fetch_weather_from_configured_backend(mock_get, settings):
+    """
+    Given the fake weather backend configured
+    When we call fetch_weather
+    Then the weather is fetched from that backend
+    And the Weather API is not called.
+    """
+    settings.WEATHER_PROVIDER = "fake"
+
+    result = fetch_weather(10.0, 20.0)
+
+    assert result.main == "Clear"
+    assert result.temperature == 25.0
+    mock_get.assert_not_called()
+
+
+@pytest.mark.parametrize("incr_error", (None, ConnectionError))
+@patch("requests.Session.get")
+def test_fetch_weather_counts_requests(mock_get, cache_client, incr_error):
+    """
+    Given coordinates
+    When we call fetch_weather
+    Then the request to the Weather API is counted
+    And the weather is fetched even if the cache is not available.
+    """
+    mock_get.return_value = _mock_response(
+        200, {"weather": [{"main": "Snow"}], "main": {"temp": 10.0}}
+    )
+    cache_client.incr.side_effect = incr_error
+
+    assert fetch_weather(10.0, 20.0).main == "Snow"
+
+    cache_client.incr.assert_any_call(API_REQUESTS_KEY)
+
+
+@pytest.mark.parametrize("value, expected_result", ((None, 0), ("12", 12)))
+def test_get_api_requests(cache_client, value, expected_result):
+    """
+    Given the number of requests to the Weather API stored in the cache
+    When we call get_api_requests
+    Then the number is returned.
+    """
+    cache_client.get.return_value = value
+
+    assert get_api_requests() == expected_result
@@ -0,0 +1,240 @@
+from unittest.mock import ANY, Mock, call, patch
+
+import pytest
+from redis.exceptions import ConnectionError
+from todo_app.system.weather.cache import WeatherCache
+from todo_app.system.weather.providers import WeatherFetchSkippedError
+from todo_app.todo.models import Weather
+
+KEY = "weather:cache:10.00:20.00"
+LOCK_KEY = f"lock:{KEY}"
+VALUE = Weather(main="Rain", temperature=5.0).to_json()
+
+
+def test_get_with_cached_weather(cache_client):
+    """
+    Given the weather stored in the cache
+    When we call WeatherCache.get
+    Then the cached weather is returned
+    And the cache hit is counted.
+    """
+    cache_client.get.return_value = VALUE
+
+    result = WeatherCache().get(10.001, 20.002)
+
+    cache_client.get.assert_called_once_with(KEY)
+    cache_client.incr.assert_called_once_with("weather:cache:hits")
+    assert result == Weather(main="Rain", temperature=5.0)
+
+
+def test_get_without_cached_weather(cache_client):
+    """
+    Given no weather stored in the cache
+    When we call WeatherCache.get
+    Then None is returned
+    And the cache miss is counted.
+    """
+    assert WeatherCache().get(10.0, 20.0) is None
+
+    cache_client.incr.assert_called_once_with("weather:cache:misses")
+
+
+def test_set(cache_client, settings):
+    """
+    Given the weather
+    When we call WeatherCache.set
+    Then the weather is stored in the cache with the configured TTL.
+    """
+    settings.WEATHER_CACHE_TTL = 30
+
+    WeatherCache().set(10.0, 20.0, Weather(main="Rain", temperature=5.0))
+
+    cache_client.set.assert_called_once_with(KEY, VALUE, ex=30)
+
+
+def test_get_or_fetch_with_cached_weather(cache_client):
+    """
+    Given the weather stored in the cache
+    When we call WeatherCache.get_or_fetch
+    Then the cached weather is returned
+    And the weather is not fetched.
+    """
+    cache_client.get.return_value = VALUE
+    fetch = Mock()
+
+    result = WeatherCache().get_or_fetch(10.0, 20.0, fetch)
+
+    assert result == Weather(main="Rain", temperature=5.0)
+    fetch.assert_not_called()
+
+
+def test_get_or_fetch_without_cached_weather(cache_client, settings):
+    """
+    Given no weather stored in the cache
+    When we call WeatherCache.get_or_fetch
+    Then the lock for the entry is acquired
+    And the weather is fetched and stored in the cache
+    And the lock is released.
+    """
+    settings.WEATHER_CACHE_TTL = 30
+    settings.WEATHER_CACHE_LOCK_TIMEOUT = 5
+    fetch = Mock(return_value=Weather(main="Rain", temperature=5.0))
+
+    result = WeatherCache().get_or_fetch(10.0, 20.0, fetch)
+
+    assert result == Weather(main="Rain", temperature=5.0)
+    fetch.assert_called_once_with(10.0, 20.0)
+    assert cache_client.set.call_args_list == [
+        call(LOCK_KEY, ANY, nx=True, px=5000),
+        call(KEY, VALUE, ex=30),
+    ]
+    cache_client.transaction.assert_called_once_with(
+        ANY, LOCK_KEY, value_from_callable=True
+    )
+
+
+def test_get_or_fetch_with_failed_fetch(cache_client, settings):
+    """
+    Given no weather stored in the cache
+    When we call WeatherCache.get_or_fetch
+    And it's not possible to fetch the weather
+    Then None is returned
+    And nothing is stored in the cache
+    And the lock is released.
+    """
+    settings.WEATHER_CACHE_LOCK_TIMEOUT = 5
+    fetch = Mock(return_value=None)
+
+    assert WeatherCache().get_or_fetch(10.0, 20.0, fetch) is None
+
+    cache_client.set.assert_called_once_with(LOCK_KEY, ANY, nx=True, px=5000)
+    cache_client.transaction.assert_called_once_with(
+        ANY, LOCK_KEY, value_from_callable=True
+    )
+
+
+def test_get_or_fetch_with_skipped_fetch(cache_client, settings):
+    """
+    Given no weather stored in the cache
+    When we call WeatherCache.get_or_fetch
+    And the fetch is skipped
+    Then the fetch is reported as skipped
+    And the lock is released.
+    """
+    settings.WEATHER_CACHE_LOCK_TIMEOUT = 5
+    fetch = Mock(side_effect=WeatherFetchSkippedError)
+
+    with pytest.raises(WeatherFetchSkippedError):
+        WeatherCache().get_or_fetch(10.0, 20.0, fetch)
+
+    cache_client.set.assert_called_once_with(LOCK_KEY, ANY, nx=True, px=5000)
+    cache_client.transaction.assert_called_once_with(
+        ANY, LOCK_KEY, value_from_callable=True
+    )
+
+
+@patch("time.sleep")
+def test_get_or_fetch_with_entry_refreshed_by_another_worker(_, cache_client):
+    """
+    Given no weather stored in the cache
+    And the entry is being refreshed by another worker
+    When we call WeatherCache.get_or_fetch
+    Then the weather stored by the other worker is returned
+    And the weather is not fetched.
+    """
+    cache_client.get.side_effect = [None, None, VALUE]
+    cache_client.set.return_value = None
+    cache_client.exists.return_value = 1
+    fetch = Mock()
+
+    result = WeatherCache().get_or_fetch(10.0, 20.0, fetch)
+
+    assert result == Weather(main="Rain", temperature=5.0)
+    fetch.assert_not_called()
+    cache_client.transaction.assert_not_called()
+
+
+def test_get_or_fetch_with_entry_not_refreshed_by_another_worker(
+    cache_client, settings
+):
+    """
+    Given no weather stored in the cache
+    And the entry is being refreshed by another worker
+    When we call WeatherCache.get_or_fetch
+    And the other worker does not store the weather before the lock expires
+    Then None is returned
+    And the weather is not fetched.
+    """
+    settings.WEATHER_CACHE_LOCK_TIMEOUT = 0
+    cache_client.set.return_value = None
+    fetch = Mock()
+
+    assert WeatherCache().get_or_fetch(10.0, 20.0, fetch) is None
+
+    fetch.assert_not_called()
+
+
+@patch("time.sleep")
+def test_get_or_fetch_with_entry_failed_by_another_worker(mock_sleep, cache_client):
+    """
+    Given no weather stored in the cache
+    And the entry is being refreshed by another worker
+    When we call WeatherCache.get_or_fetch
+    And the other worker releases the lock without storing the weather
+    Then None is returned as soon as the lock is released
+    And the weather is not fetched.
+    """
+    cache_client.set.return_value = None
+    cache_client.exists.side_effect = [1, 0]
+    fetch = Mock()
+
+    assert WeatherCache().get_or_fetch(10.0, 20.0, fetch) is None
+
+    fetch.assert_not_called()
+    assert mock_sleep.call_count == 2
+    assert cache_client.exists.call_args_list == [call(LOCK_KEY)] * 2
+
+
+def test_get_or_fetch_with_cache_not_available(cache_client):
+    """
+    Given the cache is not available
+    When we call WeatherCache.get_or_fetch
+    Then the weather is fetched directly.
+    """
+    cache_client.get.side_effect = ConnectionError
+    fetch = Mock(return_value=Weather(main="Rain", temperature=5.0))
+
+    result = WeatherCache().get_or_fetch(10.0, 20.0, fetch)
+
+    assert result == Weather(main="Rain", temperature=5.0)
+    fetch.assert_called_once_with(10.0, 20.0)
+
+
+def test_get_or_fetch_with_cache_not_available_after_fetch(cache_client):
+    """
+    Given no weather stored in the cache
+    When we call WeatherCache.get_or_fetch
+    And the cache becomes unavailable after the weather is fetched
+    Then the fetched weather is returned.
+    """
+    cache_client.set.side_effect = [True, ConnectionError]
+    fetch = Mock(return_value=Weather(main="Rain", temperature=5.0))
+
+    result = WeatherCache().get_or_fetch(10.0, 20.0, fetch)
+
+    assert result == Weather(main="Rain", temperature=5.0)
+
+
+def test_get_stats(cache_client):
+    """
+    Given cache hits and misses counted
+    When we call WeatherCache.get_stats
+    Then the number of hits and misses is returned.
+    """
+    cache_client.mget.return_value = ["3", None]
+
+    assert WeatherCache().get_stats() == {"hits": 3, "misses": 0}
+
+    cache_client.mget.assert_called_once_with(
+        "weather:cache:hits", "weather:cache:misses"
+    )
@@ -0,0 +1,37 @@
+import pytest
+from todo_app.system.weather.cells import get_cell_key, get_cell_location
+
+
+@pytest.mark.parametrize(
+    "lat, lon, precision, expected_result",
+    (
+        (51.50853, -0.12574, 2, "51.51:-0.13"),
+        (51.50853, -0.12574, 0, "52:0"),
+        (10, 20, 1, "10.0:20.0"),
+        (-33.86785, 151.20732, 3, "-33.868:151.207"),
+    ),
+)
+def test_get_cell_key(lat, lon, precision, expected_result):
+    """
+    Given coordinates and a precision
+    When we call get_cell_key
+    Then a correct cell key is returned.
+    """
+    assert get_cell_key(lat, lon, precision) == expected_result
+
+
+@pytest.mark.parametrize(
+    "key, expected_result",
+    (
+        ("51.51:-0.13", (51.51, -0.13)),
+        ("52:0", (52.0, 0.0)),
+        ("-33.868:151.207", (-33.868, 151.207)),
+    ),
+)
+def test_get_cell_location(key, expected_result):
+    """
+    Given a cell key
+    When we call get_cell_location
+    Then the rounded coordinates of the cell are returned.
+    """
+    assert get_cell_location(key) == expected_result
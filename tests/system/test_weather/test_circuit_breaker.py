@@ -0,0 +1,222 @@
+from unittest.mock import MagicMock
+
+import pytest
+from redis.exceptions import ConnectionError
+from todo_app.system.weather.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+)
+
+KEY = "weather:circuit_breaker"
+NOW = 100.0
+
+
+def _mock_pipe(**state) -> MagicMock:
+    """Return a mock cache pipeline with the given state of the circuit."""
+    pipe = MagicMock()
+    pipe.hmget.side_effect = lambda key, *fields: [state.get(name) for name in fields]
+    pipe.time.return_value = (int(NOW), 0)
+    return pipe
+
+
+@pytest.fixture(autouse=True)
+def circuit_breaker_settings(settings):
+    """Configure the circuit breaker used in the tests."""
+    settings.WEATHER_CIRCUIT_BREAKER_FAILURE_THRESHOLD = 3
+    settings.WEATHER_CIRCUIT_BREAKER_RESET_TIMEOUT = 30
+    settings.WEATHER_CIRCUIT_BREAKER_TRIAL_REQUESTS = 2
+
+
+@pytest.mark.parametrize(
+    "state, expected_result",
+    (
+        ({}, True),
+        ({"failures": "2"}, True),
+        ({"state": OPEN, "opened_at": "80"}, False),
+        ({"state": HALF_OPEN, "opened_at": "80", "trials": "1"}, True),
+        ({"state": HALF_OPEN, "opened_at": "80", "trials": "2"}, False),
+    ),
+)
+def test_allow_request(state, expected_result):
+    """
+    Given the state of the circuit
+    When we check whether a request can be sent
+    Then it's allowed if the circuit is closed
+    And it's allowed in the half-open circuit until all trial requests are sent.
+    """
+    assert CircuitBreaker()._allow_request(_mock_pipe(**state)) is expected_result
+
+
+def test_allow_request_reserves_trial_request():
+    """
+    Given a half-open circuit
+    When a request is allowed
+    Then the trial request is reserved.
+    """
+    pipe = _mock_pipe(state=HALF_OPEN, opened_at="80", trials="1")
+
+    CircuitBreaker()._allow_request(pipe)
+
+    pipe.multi.assert_called_once_with()
+    pipe.hincrby.assert_called_once_with(KEY, "trials", 1)
+
+
+@pytest.mark.parametrize("state, trials", ((OPEN, None), (HALF_OPEN, "2")))
+def test_allow_request_after_reset_timeout(state, trials):
+    """
+    Given an open circuit or a half-open circuit with all trial requests sent
+    When we check whether a request can be sent after the reset timeout
+    Then the circuit becomes half-open
+    And the request is allowed as the first trial request.
+    """
+    pipe = _mock_pipe(state=state, opened_at="70", trials=trials)
+
+    assert CircuitBreaker()._allow_request(pipe) is True
+
+    pipe.delete.assert_called_once_with(KEY)
+    pipe.hset.assert_called_once_with(
+        KEY, mapping={"state": HALF_OPEN, "opened_at": NOW, "trials": 1}
+    )
+
+
+@pytest.mark.parametrize(
+    "state, expected_call",
+    (
+        ({"failures": "2"}, "delete"),
+        ({"state": HALF_OPEN, "trials": "2"}, "hincrby"),
+        ({"state": HALF_OPEN, "trials": "2", "successes": "1"}, "delete"),
+    ),
+)
+def test_record_success(state, expected_call):
+    """
+    Given the state of the circuit
+    When a successful request is recorded
+    Then the failures of the closed circuit are reset
+    And the half-open circuit is closed once all trial requests succeed.
+    """
+    pipe = _mock_pipe(**state)
+
+    CircuitBreaker()._record_success(pipe)
+
+    pipe.multi.assert_called_once_with()
+    getattr(pipe, expected_call).assert_called_once()
+
+
+@pytest.mark.parametrize("state", ({}, {"state": OPEN, "opened_at": "80"}))
+def test_record_success_without_changes(state):
+    """
+    Given a closed circuit without failures or an open circuit
+    When a successful request is recorded
+    Then the state of the circuit is not changed.
+    """
+    pipe = _mock_pipe(**state)
+
+    CircuitBreaker()._record_success(pipe)
+
+    pipe.multi.assert_not_called()
+
+
+def test_record_failure():
+    """
+    Given a closed circuit
+    When a failed request is recorded
+    And the number of failures is below the threshold
+    Then the failure is counted.
+    """
+    pipe = _mock_pipe(failures="1")
+
+    assert CircuitBreaker()._record_failure(pipe) is False
+
+    pipe.hset.assert_called_once_with(KEY, "failures", 2)
+
+
+@pytest.mark.parametrize(
+    "state", ({"failures": "2"}, {"state": HALF_OPEN, "opened_at": "80"})
+)
+def test_record_failure_opens_circuit(state):
+    """
+    Given a closed circuit with failures or a half-open circuit
+    When a failed request is recorded
+    And the number of failures reaches the threshold or a trial request failed
+    Then the circuit is opened.
+    """
+    pipe = _mock_pipe(**state)
+
+    assert CircuitBreaker()._record_failure(pipe) is True
+
+    pipe.delete.assert_called_once_with(KEY)
+    pipe.hset.assert_called_once_with(KEY, mapping={"state": OPEN, "opened_at": NOW})
+
+
+def test_record_failure_with_open_circuit():
+    """
+    Given an open circuit
+    When a failed request is recorded
+    Then the state of the circuit is not changed.
+    """
+    pipe = _mock_pipe(state=OPEN, opened_at="80")
+
+    assert CircuitBreaker()._record_failure(pipe) is False
+
+    pipe.multi.assert_not_called()
+
+
+def test_public_methods(cache_client):
+    """
+    Given the circuit breaker
+    When we call its public methods
+    Then the state of the circuit is changed in transactions.
+    """
+    circuit_breaker = CircuitBreaker()
+
+    assert circuit_breaker.allow_request() is True
+    circuit_breaker.record_success()
+    circuit_breaker.record_failure()
+
+    assert [call.args[1] for call in cache_client.transaction.call_args_list] == [
+        KEY,
+        KEY,
+        KEY,
+    ]
+
+
+def test_record_failure_logs_opened_circuit(cache_client, caplog):
+    """
+    Given a closed circuit
+    When a failed request opens the circuit
+    Then a warning is logged.
+    """
+    cache_client.transaction.side_effect = [True]
+
+    CircuitBreaker().record_failure()
+
+    assert "Weather API is failing" in caplog.text
+
+
+def test_with_cache_not_available(cache_client):
+    """
+    Given the cache is not available
+    When we use the circuit breaker
+    Then the requests are allowed.
+    """
+    cache_client.transaction.side_effect = ConnectionError
+
+    circuit_breaker = CircuitBreaker()
+    circuit_breaker.record_failure()
+
+    assert circuit_breaker.allow_request() is True
+
+
+@pytest.mark.parametrize("state, expected_result", ((None, CLOSED), (OPEN, OPEN)))
+def test_get_state(cache_client, state, expected_result):
+    """
+    Given the state of the circuit stored in the cache
+    When we call CircuitBreaker.get_state
+    Then the state is returned.
+    """
+    cache_client.hget.return_value = state
+
+    assert CircuitBreaker().get_state() == expected_result
+    cache_client.hget.assert_called_once_with(KEY, "state")
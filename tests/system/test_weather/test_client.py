@@ -0,0 +1,62 @@
+from unittest.mock import patch
+
+from django.conf import settings
+from todo_app.system.weather.client import WeatherClient
+
+
+def test_weather_client_is_shared():
+    """
+    Given a weather client
+    When we create another weather client
+    Then the same client is returned.
+    """
+    assert WeatherClient() is WeatherClient()
+
+
+def test_weather_client_configuration():
+    """
+    Given a weather client
+    When we check its configuration
+    Then the connections are pooled
+    And the failed requests are retried with backoff and jitter.
+    """
+    client = WeatherClient()
+
+    for prefix in ("http://", "https://"):
+        adapter = client.session.get_adapter(prefix)
+
+        assert adapter._pool_maxsize == settings.WEATHER_FETCH_CONCURRENCY
+        assert adapter.max_retries.total == settings.WEATHER_HTTP_RETRIES
+        assert adapter.max_retries.backoff_factor == (
+            settings.WEATHER_HTTP_BACKOFF_FACTOR
+        )
+        assert adapter.max_retries.backoff_jitter == (
+            settings.WEATHER_HTTP_BACKOFF_FACTOR
+        )
+        assert adapter.max_retries.status_forcelist == (500, 502, 503, 504)
+        assert not adapter.max_retries.respect_retry_after_header
+
+    assert client.timeout == (
+        settings.WEATHER_HTTP_CONNECT_TIMEOUT,
+        settings.WEATHER_HTTP_READ_TIMEOUT,
+    )
+
+
+@patch("requests.Session.get")
+def test_get(mock_get):
+    """
+    Given a weather client
+    When we perform a GET request
+    Then the request is sent to the Weather API with the API key and the timeouts.
+    """
+    result = WeatherClient().get("/data/2.5/weather", params={"lat": "1.0"})
+
+    assert result == mock_get.return_value
+    mock_get.assert_called_once_with(
+        f"{settings.WEATHER_API_URL}/data/2.5/weather",
+        params={"lat": "1.0", "appid": settings.WEATHER_API_KEY},
+        timeout=(
+            settings.WEATHER_HTTP_CONNECT_TIMEOUT,
+            settings.WEATHER_HTTP_READ_TIMEOUT,
+        ),
+    )
@@ -0,0 +1,177 @@
+import asyncio
+import threading
+import time
+
+from todo_app.system.weather.cells import GeoCell
+from todo_app.system.weather.fetcher import (
+    fetch_weather_for_cells,
+    fetch_weather_for_cells_async,
+)
+from todo_app.system.weather.providers import WeatherFetchSkippedError
+from todo_app.todo.models import Weather
+
+
+def _get_cells(count: int) -> list[GeoCell]:
+    """Return the given number of sample cells."""
+    return [
+        GeoCell(key=f"{index}.00:0.00", lat=float(index), lon=0.0)
+        for index in range(count)
+    ]
+
+
+def test_fetch_weather_for_cells():
+    """
+    Given geo cells
+    When we call fetch_weather_for_cells
+    Then the weather is fetched for each cell.
+    """
+
+    def fetch(lat, lon):
+        return Weather(main="Clear", temperature=lat)
+
+    result = fetch_weather_for_cells(_get_cells(3), fetch)
+
+    assert result == {
+        "0.00:0.00": Weather(main="Clear", temperature=0.0),
+        "1.00:0.00": Weather(main="Clear", temperature=1.0),
+        "2.00:0.00": Weather(main="Clear", temperature=2.0),
+    }
+
+
+def test_fetch_weather_for_cells_with_failed_fetch():
+    """
+    Given geo cells
+    When we call fetch_weather_for_cells
+    And it's not possible to fetch the weather for some cells
+    Then None is returned for those cells.
+    """
+
+    def fetch(lat, lon):
+        return Weather(main="Clear", temperature=lat) if lat else None
+
+    result = fetch_weather_for_cells(_get_cells(2), fetch)
+
+    assert result == {
+        "0.00:0.00": None,
+        "1.00:0.00": Weather(main="Clear", temperature=1.0),
+    }
+
+
+def test_fetch_weather_for_cells_with_skipped_fetch():
+    """
+    Given geo cells
+    When we call fetch_weather_for_cells
+    And the fetch is skipped for some cells
+    Then those cells are left out of the result.
+    """
+
+    def fetch(lat, lon):
+        if not lat:
+            raise WeatherFetchSkippedError()
+        return Weather(main="Clear", temperature=lat)
+
+    result = fetch_weather_for_cells(_get_cells(2), fetch)
+
+    assert result == {"1.00:0.00": Weather(main="Clear", temperature=1.0)}
+
+
+def test_fetch_weather_for_cells_async_concurrency_limit():
+    """
+    Given geo cells
+    When we call fetch_weather_for_cells_async with a concurrency limit
+    Then the requests are executed concurrently
+    And the number of requests in progress never exceeds the limit.
+    """
+    lock = threading.Lock()
+    in_progress = []
+    max_in_progress = []
+
+    def fetch(lat, lon):
+        with lock:
+            in_progress.append(lat)
+            max_in_progress.append(len(in_progress))
+        time.sleep(0.02)
+        with lock:
+            in_progress.remove(lat)
+        return Weather(main="Clear", temperature=lat)
+
+    result = asyncio.run(
+        fetch_weather_for_cells_async(_get_cells(20), fetch, concurrency=4, timeout=1)
+    )
+
+    assert len(result) == 20
+    assert max(max_in_progress) == 4
+
+
+def test_fetch_weather_for_cells_async_timeout():
+    """
+    Given geo cells
+    When we call fetch_weather_for_cells_async
+    And a request takes longer than the timeout
+    Then None is returned for that cell.
+    """
+
+    def fetch(lat, lon):
+        if lat:
+            time.sleep(0.2)
+        return Weather(main="Clear", temperature=lat)
+
+    result = asyncio.run(
+        fetch_weather_for_cells_async(_get_cells(2), fetch, concurrency=2, timeout=0.05)
+    )
+
+    assert result == {
+        "0.00:0.00": Weather(main="Clear", temperature=0.0),
+        "1.00:0.00": None,
+    }
+
+
+def test_fetch_weather_for_cells_async_timeout_starts_with_fetch():
+    """
+    Given geo cells
+    When we call fetch_weather_for_cells_async
+    And the requests wait for a slot longer than the timeout
+    Then the weather is returned for all the cells.
+    """
+
+    def fetch(lat, lon):
+        time.sleep(0.03)
+        return Weather(main="Clear", temperature=lat)
+
+    result = asyncio.run(
+        fetch_weather_for_cells_async(_get_cells(4), fetch, concurrency=1, timeout=0.5)
+    )
+
+    assert all(weather is not None for weather in result.values())
+
+
+def test_fetch_weather_for_cells_async_timeout_does_not_wait_for_fetch():
+    """
+    Given geo cells
+    When we call fetch_weather_for_cells_async
+    And a request takes longer than the timeout
+    Then the result is returned without waiting for that request to finish.
+    """
+    release = threading.Event()
+    started = []
+
+    def fetch(lat, lon):
+        started.append(lat)
+        if not lat:
+            release.wait(5)
+        return Weather(main="Clear", temperature=lat)
+
+    start_time = time.perf_counter()
+    result = asyncio.run(
+        fetch_weather_for_cells_async(_get_cells(3), fetch, concurrency=2, timeout=0.1)
+    )
+    elapsed = time.perf_counter() - start_time
+    release.set()
+
+    assert elapsed < 1
+    assert result == {
+        "0.00:0.00": None,
+        "1.00:0.00": Weather(main="Clear", temperature=1.0),
+        "2.00:0.00": Weather(main="Clear", temperature=2.0),
+    }
+    assert sorted(started) == [0.0, 1.0, 2.0]
@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from django.utils import timezone as django_timezone
+from todo_app.system.weather.cells import GeoCell
+from todo_app.system.weather.forecast import (
+    get_forecast_weather,
+    get_weather_from_forecasts,
+)
+from todo_app.system.weather.providers import WeatherFetchSkippedError
+from todo_app.todo.models import Forecast, WeatherCell
+
+STARTS_AT = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _create_forecast(starts_at: datetime, fetched_at: datetime) -> Forecast:
+    """Return a sample forecast with 3 slots."""
+    return Forecast(
+        fetched_at=int(fetched_at.timestamp()),
+        starts_at=int(starts_at.timestamp()),
+        interval=3600,
+        conditions=["Clear", "Rain", "Snow"],
+        temperatures=[10.0, 4.0, -2.0],
+    )
+
+
+@pytest.mark.parametrize(
+    "minutes, expected_result",
+    (
+        (-90, None),
+        (-60, ("Clear", 10.0)),
+        (0, ("Clear", 10.0)),
+        (20, ("Clear", 8.0)),
+        (30, ("Rain", 7.0)),
+        (90, ("Snow", 1.0)),
+        (120, ("Snow", -2.0)),
+        (121, None),
+    ),
+)
+def test_get_forecast_weather(minutes, expected_result):
+    """
+    Given a forecast
+    When we call get_forecast_weather with a time
+    Then the temperature is interpolated between the surrounding slots
+    And the condition of the nearest slot is returned
+    And None is returned if the forecast does not cover the time.
+    """
+    at = STARTS_AT + timedelta(minutes=minutes)
+
+    result = get_forecast_weather(_create_forecast(STARTS_AT, STARTS_AT), at)
+
+    if expected_result is None:
+        assert result is None
+    else:
+        assert (result.main, result.temperature) == expected_result
+        assert result.fetched_at == at
+
+
+def test_get_forecast_weather_without_slots():
+    """
+    Given a forecast without slots
+    When we call get_forecast_weather
+    Then None is returned.
+    """
+    forecast = Forecast(fetched_at=0, starts_at=0, interval=3600)
+
+    assert get_forecast_weather(forecast, STARTS_AT) is None
+
+
+@patch("todo_app.system.weather.forecast.fetch_forecast")
+def test_get_weather_from_forecasts(mock_fetch_forecast, settings):
+    """
+    Given a geo cell with a recent forecast
+    And geo cells with an old forecast and without a forecast
+    When we call get_weather_from_forecasts
+    Then the weather of the first cell is taken from its stored forecast
+    And the forecasts of the other cells are fetched and stored.
+    """
+    settings.WEATHER_FORECAST_MAX_AGE = 3600
+    now = django_timezone.now()
+    WeatherCell(
+        key="0.00:0.00", lat=0.0, lon=0.0, forecast=_create_forecast(now, now)
+    ).save()
+    WeatherCell(
+        key="1.00:1.00",
+        lat=1.0,
+        lon=1.0,
+        forecast=_create_forecast(now, now - timedelta(hours=1)),
+    ).save()
+    WeatherCell(key="2.00:2.00", lat=2.0, lon=2.0).save()
+    new_forecast = _create_forecast(now, now)
+    new_forecast.temperatures = [20.0, 20.0, 20.0]
+    mock_fetch_forecast.return_value = new_forecast
+    cells = {
+        f"{index}.00:{index}.00": GeoCell(
+            key=f"{index}.00:{index}.00", lat=index, lon=index
+        )
+        for index in range(3)
+    }
+
+    result = get_weather_from_forecasts(cells)
+
+    assert {key: weather.temperature for key, weather in result.items()} == {
+        "0.00:0.00": 10.0,
+        "1.00:1.00": 20.0,
+        "2.00:2.00": 20.0,
+    }
+    assert sorted(call.args for call in mock_fetch_forecast.call_args_list) == [
+        (1.0, 1.0),
+        (2.0, 2.0),
+    ]
+    forecasts = {cell.key: cell.forecast for cell in WeatherCell.objects.all()}
+    assert forecasts["1.00:1.00"] == new_forecast
+    assert forecasts["2.00:2.00"] == new_forecast
+
+
+@patch("todo_app.system.weather.forecast.fetch_forecast", return_value=None)
+def test_get_weather_from_forecasts_with_failed_fetch(mock_fetch_forecast):
+    """
+    Given a geo cell without a forecast
+    When we call get_weather_from_forecasts
+    And it's not possible to fetch the forecast
+    Then None is returned as the weather of the cell
+    And no forecast is stored.
+    """
+    WeatherCell(key="0.00:0.00", lat=0.0, lon=0.0).save()
+
+    result = get_weather_from_forecasts(
+        {"0.00:0.00": GeoCell(key="0.00:0.00", lat=0.0, lon=0.0)}
+    )
+
+    assert result == {"0.00:0.00": None}
+    assert WeatherCell.objects.get(key="0.00:0.00").forecast is None
+    mock_fetch_forecast.assert_called_once_with(0.0, 0.0)
+
+
+@patch(
+    "todo_app.system.weather.forecast.fetch_forecast",
+    side_effect=WeatherFetchSkippedError,
+)
+def test_get_weather_from_forecasts_with_skipped_fetch(mock_fetch_forecast):
+    """
+    Given a geo cell without a forecast
+    When we call get_weather_from_forecasts
+    And the fetch of the forecast is skipped
+    Then the cell is left out of the result.
+    """
+    WeatherCell(key="0.00:0.00", lat=0.0, lon=0.0).save()
+
+    result = get_weather_from_forecasts(
+        {"0.00:0.00": GeoCell(key="0.00:0.00", lat=0.0, lon=0.0)}
+    )
+
+    assert result == {}
+    assert WeatherCell.objects.get(key="0.00:0.00").forecast is None
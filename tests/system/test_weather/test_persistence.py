@@ -0,0 +1,256 @@
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+import pytest
+from pymongo import WriteConcern
+from pymongo.errors import BulkWriteError
+from todo_app.system.weather.persistence import (
+    create_weather_cells,
+    write_forecasts,
+    write_weather,
+)
+from todo_app.todo.models import Forecast, Weather, WeatherCell
+from todo_app.todo.version import TaskListVersion
+
+
+def _create_cells(count: int) -> None:
+    """Create sample geo cells with weather."""
+    for index in range(count):
+        WeatherCell(
+            key=f"{index}.00:{index}.00",
+            lat=index,
+            lon=index,
+            weather=Weather(main="Snow", temperature=0.0),
+        ).save()
+
+
+def test_create_weather_cells():
+    """
+    Given an existing geo cell
+    When we call create_weather_cells with its key and the keys of new cells
+    Then the new cells are created with the coordinates from their keys
+    And the existing cell is not changed.
+    """
+    _create_cells(1)
+
+    create_weather_cells(["0.00:0.00", "51.51:-0.13", "52.23:21.01"])
+
+    cells = {cell.key: cell for cell in WeatherCell.objects.all()}
+    assert sorted(cells) == ["0.00:0.00", "51.51:-0.13", "52.23:21.01"]
+    assert cells["0.00:0.00"].weather.main == "Snow"
+    assert (cells["51.51:-0.13"].lat, cells["51.51:-0.13"].lon) == (51.51, -0.13)
+    assert cells["52.23:21.01"].weather is None
+
+
+def test_create_weather_cells_without_new_cells():
+    """
+    Given existing geo cells
+    When we call create_weather_cells with their keys
+    Then nothing is inserted.
+    """
+    _create_cells(2)
+
+    with patch.object(WeatherCell._get_collection(), "insert_many") as mock_insert:
+        create_weather_cells(["0.00:0.00", "1.00:1.00"])
+
+    mock_insert.assert_not_called()
+
+
+@pytest.mark.parametrize("code, is_raised", ((11000, False), (121, True)))
+def test_create_weather_cells_with_write_error(code, is_raised):
+    """
+    Given a geo cell that is created by another worker in the meantime
+    When we call create_weather_cells
+    Then the duplicate key errors are ignored
+    And the other errors are raised.
+    """
+    error = BulkWriteError({"writeErrors": [{"code": code}]})
+
+    with patch.object(WeatherCell._get_collection(), "insert_many", side_effect=error):
+        if is_raised:
+            with pytest.raises(BulkWriteError):
+                create_weather_cells(["0.00:0.00"])
+        else:
+            create_weather_cells(["0.00:0.00"])
+
+
+def test_write_weather(settings):
+    """
+    Given geo cells
+    When we call write_weather with the weather for some of the cells
+    Then the changed weather is stored for those cells in bulk writes of the
+        configured size
+    And the numbers of cells with the weather written and skipped are returned.
+    """
+    settings.WEATHER_WRITE_BATCH_SIZE = 1
+    _create_cells(4)
+    collection = WeatherCell._get_collection()
+
+    with patch.object(
+        collection, "with_options", return_value=collection
+    ) as mock_with_options, patch.object(
+        collection, "bulk_write", wraps=collection.bulk_write
+    ) as mock_bulk_write:
+        result = write_weather(
+            [
+                ("0.00:0.00", Weather(main="Rain", temperature=1.0)),
+                ("1.00:1.00", Weather(main="Clear", temperature=20.0)),
+                ("2.00:2.00", Weather(main="Snow", temperature=0.0)),
+            ]
+        )
+
+    assert result == {"written_cells": 2, "skipped_cells": 1, "bulk_writes": 6}
+    assert mock_bulk_write.call_count == 6
+    assert all(not kwargs["ordered"] for _, kwargs in mock_bulk_write.call_args_list)
+    mock_with_options.assert_called_once_with(write_concern=WriteConcern(w=1))
+
+    weather = [cell.weather for cell in WeatherCell.objects.order_by("key")]
+    assert weather == [
+        Weather(main="Rain", temperature=1.0),
+        Weather(main="Clear", temperature=20.0),
+        Weather(main="Snow", temperature=0.0),
+        Weather(main="Snow", temperature=0.0),
+    ]
+
+
+def test_write_weather_without_updates():
+    """
+    Given no weather updates
+    When we call write_weather
+    Then nothing is written.
+    """
+    with patch.object(WeatherCell, "_get_collection") as mock_get_collection:
+        assert write_weather([]) == {
+            "written_cells": 0,
+            "skipped_cells": 0,
+            "bulk_writes": 0,
+        }
+
+    mock_get_collection.return_value.with_options.return_value.bulk_write.assert_not_called()
+
+
+def test_write_weather_not_acknowledged(settings):
+    """
+    Given a geo cell
+    When we call write_weather with the write concern set to 0
+    Then the weather is written without waiting for the acknowledgement
+    And 0 is returned as the numbers of cells
+    And the weather is published to the task lists.
+    """
+    settings.WEATHER_WRITE_CONCERN = 0
+    collection = Mock()
+    collection.with_options.return_value.bulk_write.return_value = Mock(
+        acknowledged=False
+    )
+    collection.with_options.return_value.write_concern = WriteConcern(w=0)
+
+    updates = [("0.00:0.00", Weather(main="Rain", temperature=1.0))]
+
+    with patch.object(
+        WeatherCell, "_get_collection", return_value=collection
+    ), patch.object(TaskListVersion, "bump") as mock_bump, patch(
+        "todo_app.system.weather.persistence.publish_weather_change"
+    ) as mock_publish:
+        result = write_weather(iter(updates))
+
+    assert result == {"written_cells": 0, "skipped_cells": 0, "bulk_writes": 2}
+    mock_bump.assert_called_once_with()
+    mock_publish.assert_called_once_with(updates)
+    collection.with_options.assert_called_once_with(write_concern=WriteConcern(w=0))
+    assert collection.with_options.return_value.bulk_write.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "tolerance, temperature, is_written",
+    ((0.0, 0.0, False), (0.0, 0.1, True), (0.5, 0.5, False), (0.5, -0.6, True)),
+)
+def test_write_weather_with_unchanged_weather(
+    settings, tolerance, temperature, is_written
+):
+    """
+    Given a geo cell with weather
+    When we call write_weather with the weather with the same condition
+    Then the weather is written only if the temperature differs by more than the
+        configured tolerance
+    And otherwise only the time of the fetch and the schedule of the next refresh
+        are updated
+    And the version of the task list is changed only if the weather is written.
+    """
+    settings.WEATHER_WRITE_TOLERANCE = tolerance
+    _create_cells(1)
+    next_refresh_at = datetime(2024, 1, 1, 12, 0)
+    weather = Weather(
+        main="Snow",
+        temperature=temperature,
+        fetched_at=datetime(2024, 1, 1, 11, 59),
+        refresh_interval=60,
+        next_refresh_at=next_refresh_at,
+    )
+
+    with patch.object(TaskListVersion, "bump") as mock_bump:
+        result = write_weather([("0.00:0.00", weather)])
+
+    assert result == {
+        "written_cells": int(is_written),
+        "skipped_cells": int(not is_written),
+        "bulk_writes": 2,
+    }
+    assert mock_bump.call_count == int(is_written)
+    stored_weather = WeatherCell.objects.get(key="0.00:0.00").weather
+    assert stored_weather.temperature == (temperature if is_written else 0.0)
+    assert stored_weather.fetched_at == weather.fetched_at
+    assert stored_weather.refresh_interval == 60
+    assert stored_weather.next_refresh_at == next_refresh_at
+
+
+def test_write_forecasts(settings):
+    """
+    Given geo cells
+    When we call write_forecasts with the forecasts for some of the cells
+    Then the forecasts are stored for those cells in bulk writes of the configured
+        size.
+    """
+    settings.WEATHER_WRITE_BATCH_SIZE = 1
+    _create_cells(3)
+    forecast = Forecast(
+        fetched_at=1704110400,
+        starts_at=1704110400,
+        interval=10800,
+        conditions=["Clear", "Rain"],
+        temperatures=[1.0, 2.0],
+    )
+    collection = WeatherCell._get_collection()
+
+    with patch.object(
+        collection, "with_options", return_value=collection
+    ), patch.object(
+        collection, "bulk_write", wraps=collection.bulk_write
+    ) as mock_bulk_write:
+        write_forecasts([("0.00:0.00", forecast), ("2.00:2.00", forecast)])
+
+    assert mock_bulk_write.call_count == 2
+    forecasts = [cell.forecast for cell in WeatherCell.objects.order_by("key")]
+    assert forecasts == [forecast, None, forecast]
+    assert WeatherCell.objects.get(key="0.00:0.00").weather.main == "Snow"
+
+
+def test_write_weather_without_notification():
+    """
+    Given a geo cell
+    When we call write_weather without notifying the task lists
+    Then the weather is written
+    And the version of the task list is not changed
+    And the weather is not published.
+    """
+    _create_cells(1)
+
+    with patch.object(TaskListVersion, "bump") as mock_bump, patch(
+        "todo_app.system.weather.persistence.publish_weather_change"
+    ) as mock_publish:
+        result = write_weather(
+            [("0.00:0.00", Weather(main="Rain", temperature=1.0))], notify=False
+        )
+
+    assert result["written_cells"] == 1
+    mock_bump.assert_not_called()
+    mock_publish.assert_not_called()
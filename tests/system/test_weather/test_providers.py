@@ -0,0 +1,272 @@
+import time
+from unittest.mock import Mock
+
+import pytest
+from todo_app.system.weather.api import OpenWeatherProvider
+from todo_app.system.weather.providers import (
+    FakeWeatherProvider,
+    HedgedWeatherProvider,
+    LatencyTracker,
+    WeatherFetchSkippedError,
+    WeatherProvider,
+    get_forecast_size,
+    get_weather_provider,
+)
+
+
+def _mock_provider(result, latency: float = 0.0) -> Mock:
+    """Return a mock weather backend that answers after the given latency.
+
+    If the result is an exception, it's raised instead.
+    """
+
+    def fetch(lat, lon):
+        time.sleep(latency)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return Mock(
+        spec=WeatherProvider,
+        fetch=Mock(side_effect=fetch),
+        fetch_forecast=Mock(side_effect=fetch),
+    )
+
+
+def test_fake_provider():
+    """
+    Given the fake weather backend
+    When we fetch the weather for coordinates
+    Then the weather depending only on the latitude is returned.
+    """
+    result = FakeWeatherProvider().fetch(-40.0, 20.0)
+
+    assert result.main == "Clear"
+    assert result.temperature == 10.0
+    assert result.fetched_at
+
+
+def test_fake_provider_forecast(settings):
+    """
+    Given the fake weather backend
+    When we fetch the forecast for coordinates
+    Then the forecast starting now and covering its maximum age is returned.
+    """
+    settings.WEATHER_FORECAST_MAX_AGE = 3600
+
+    result = FakeWeatherProvider().fetch_forecast(-40.0, 20.0)
+
+    assert result.starts_at == result.fetched_at
+    assert result.interval == 10800
+    assert result.conditions == ["Clear", "Clear"]
+    assert result.temperatures == [10.0, 10.0]
+
+
+@pytest.mark.parametrize(
+    "max_age, expected_result", ((1, 2), (10800, 2), (10801, 3), (86400, 9))
+)
+def test_get_forecast_size(settings, max_age, expected_result):
+    """
+    Given the maximum age of a forecast
+    When we call get_forecast_size
+    Then the number of 3-hour slots covering the maximum age is returned.
+    """
+    settings.WEATHER_FORECAST_MAX_AGE = max_age
+
+    assert get_forecast_size() == expected_result
+
+
+def test_latency_tracker():
+    """
+    Given the latencies of the calls
+    When we get their percentile
+    Then the percentile of the most recent latencies is returned.
+    """
+    tracker = LatencyTracker(100)
+    assert tracker.get_percentile(95) is None
+
+    for latency in range(200, 0, -1):
+        tracker.add(latency)
+
+    assert len(tracker) == 100
+    assert tracker.get_percentile(95) == 95
+    assert tracker.get_percentile(0) == 1
+
+
+def test_hedged_provider_with_fast_primary():
+    """
+    Given the primary backend that answers within the threshold
+    When we fetch the weather from the hedged backend
+    Then the weather from the primary backend is returned
+    And the secondary backend is not called.
+    """
+    primary = _mock_provider("primary-weather")
+    secondary = _mock_provider("secondary-weather")
+
+    provider = HedgedWeatherProvider(primary, secondary, 1.0)
+
+    assert provider.fetch(10.0, 20.0) == "primary-weather"
+    primary.fetch.assert_called_once_with(10.0, 20.0)
+    secondary.fetch.assert_not_called()
+
+
+def test_hedged_provider_with_slow_primary():
+    """
+    Given the primary backend that doesn't answer within the threshold
+    When we fetch the weather from the hedged backend
+    Then the secondary backend is called too
+    And the weather from the backend that answers first is returned.
+    """
+    primary = _mock_provider("primary-weather", latency=0.5)
+    secondary = _mock_provider("secondary-weather")
+
+    provider = HedgedWeatherProvider(primary, secondary, 0.01)
+
+    assert provider.fetch(10.0, 20.0) == "secondary-weather"
+    secondary.fetch.assert_called_once_with(10.0, 20.0)
+
+
+@pytest.mark.parametrize(
+    "primary_result, secondary_result, expected_result",
+    (
+        (None, "secondary-weather", "secondary-weather"),
+        ("primary-weather", None, "primary-weather"),
+        (None, None, None),
+    ),
+)
+def test_hedged_provider_with_failed_backend(
+    primary_result, secondary_result, expected_result
+):
+    """
+    Given the primary backend that doesn't answer within the threshold
+    When we fetch the weather from the hedged backend
+    And one of the backends returns no weather
+    Then the weather from the other backend is returned.
+    """
+    primary = _mock_provider(primary_result, latency=0.05)
+    secondary = _mock_provider(secondary_result)
+
+    provider = HedgedWeatherProvider(primary, secondary, 0.01)
+
+    assert provider.fetch(10.0, 20.0) == expected_result
+
+
+def test_hedged_provider_with_primary_without_weather():
+    """
+    Given the primary backend that answers within the threshold without the weather
+    When we fetch the weather from the hedged backend
+    Then the weather from the secondary backend is returned.
+    """
+    primary = _mock_provider(None)
+    secondary = _mock_provider("secondary-weather")
+
+    provider = HedgedWeatherProvider(primary, secondary, 1.0)
+
+    assert provider.fetch(10.0, 20.0) == "secondary-weather"
+
+
+@pytest.mark.parametrize(
+    "primary_result, secondary_result, expected_result",
+    (
+        (WeatherFetchSkippedError(), "secondary-weather", "secondary-weather"),
+        ("primary-weather", WeatherFetchSkippedError(), "primary-weather"),
+        (WeatherFetchSkippedError(), None, None),
+    ),
+)
+def test_hedged_provider_with_skipped_backend(
+    primary_result, secondary_result, expected_result
+):
+    """
+    Given the primary backend that doesn't answer within the threshold
+    When we fetch the weather from the hedged backend
+    And one of the backends skips the request
+    Then the result of the other backend is returned.
+    """
+    primary = _mock_provider(primary_result, latency=0.05)
+    secondary = _mock_provider(secondary_result)
+
+    provider = HedgedWeatherProvider(primary, secondary, 0.01)
+
+    assert provider.fetch(10.0, 20.0) == expected_result
+
+
+def test_hedged_provider_with_all_backends_skipped():
+    """
+    Given the primary backend that skips the request within the threshold
+    When we fetch the weather from the hedged backend
+    And the secondary backend skips the request too
+    Then the fetch is reported as skipped.
+    """
+    primary = _mock_provider(WeatherFetchSkippedError())
+    secondary = _mock_provider(WeatherFetchSkippedError())
+
+    provider = HedgedWeatherProvider(primary, secondary, 1.0)
+
+    with pytest.raises(WeatherFetchSkippedError):
+        provider.fetch(10.0, 20.0)
+    secondary.fetch.assert_called_once_with(10.0, 20.0)
+
+
+def test_hedged_provider_forecast():
+    """
+    Given the primary backend that answers within the threshold without a forecast
+    When we fetch the forecast from the hedged backend
+    Then the forecast from the secondary backend is returned.
+    """
+    primary = _mock_provider(None)
+    secondary = _mock_provider("secondary-forecast")
+
+    provider = HedgedWeatherProvider(primary, secondary, 1.0)
+
+    assert provider.fetch_forecast(10.0, 20.0) == "secondary-forecast"
+    primary.fetch_forecast.assert_called_once_with(10.0, 20.0)
+    primary.fetch.assert_not_called()
+
+
+def test_hedged_provider_threshold():
+    """
+    Given the hedged backend
+    When we get the threshold after which the secondary backend is called
+    Then the configured delay is returned until enough latencies are known
+    And the 95th percentile latency of the primary backend is returned after that.
+    """
+    provider = HedgedWeatherProvider(Mock(), Mock(), 1.0)
+    for latency in range(1, provider.min_samples):
+        provider.latencies.add(latency / 100)
+
+    assert provider.get_threshold() == 1.0
+
+    provider.latencies.add(0.2)
+
+    assert provider.get_threshold() == 0.19
+
+
+def test_get_weather_provider(settings):
+    """
+    Given the default settings
+    When we call get_weather_provider
+    Then the Weather API backend is returned
+    And the same backend is returned by the next calls.
+    """
+    result = get_weather_provider()
+
+    assert isinstance(result, OpenWeatherProvider)
+    assert get_weather_provider() is result
+
+
+def test_get_weather_provider_with_secondary(settings):
+    """
+    Given the secondary backend configured
+    When we call get_weather_provider
+    Then the hedged backend with the primary and secondary backends is returned.
+    """
+    settings.WEATHER_SECONDARY_PROVIDER = "fake"
+    settings.WEATHER_HEDGE_DELAY = 0.5
+
+    result = get_weather_provider()
+
+    assert isinstance(result, HedgedWeatherProvider)
+    assert isinstance(result.primary, OpenWeatherProvider)
+    assert isinstance(result.secondary, FakeWeatherProvider)
+    assert result.delay == 0.5
+    assert result.name == "openweather+fake"
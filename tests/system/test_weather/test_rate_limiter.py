@@ -0,0 +1,165 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from redis.exceptions import ConnectionError
+from todo_app.system.weather.rate_limiter import RateLimiter
+
+KEY = "weather:rate_limiter"
+
+
+def _mock_pipe(tokens: str | None, updated_at: str | None, now: float) -> MagicMock:
+    """Return a mock cache pipeline with the given state of the bucket."""
+    pipe = MagicMock()
+    pipe.hmget.return_value = [tokens, updated_at]
+    pipe.time.return_value = (int(now), int(now % 1 * 1_000_000))
+    return pipe
+
+
+@pytest.fixture(autouse=True)
+def rate_limit_settings(settings):
+    """Configure the rate limit used in the tests."""
+    settings.WEATHER_RATE_LIMIT = 2.0
+    settings.WEATHER_RATE_LIMIT_BURST = 10
+    settings.WEATHER_RATE_LIMIT_MAX_WAIT = 1.0
+
+
+def test_take_token_from_new_bucket():
+    """
+    Given no bucket stored in the cache
+    When we take a token
+    Then the token is taken from a full bucket.
+    """
+    pipe = _mock_pipe(None, None, 100.0)
+
+    assert RateLimiter()._take_token(pipe) == 0
+
+    pipe.multi.assert_called_once_with()
+    pipe.hset.assert_called_once_with(KEY, mapping={"tokens": 9, "updated_at": 100.0})
+    pipe.expire.assert_called_once_with(KEY, 6)
+
+
+@pytest.mark.parametrize(
+    "tokens, updated_at, expected_tokens",
+    (
+        ("0.5", "99.5", 0.5),
+        ("1", "100", 0.0),
+        ("9.5", "90", 9.0),
+    ),
+)
+def test_take_token_from_refilled_bucket(tokens, updated_at, expected_tokens):
+    """
+    Given a bucket stored in the cache
+    When we take a token
+    Then the bucket is refilled at the configured rate, up to its capacity
+    And the token is taken.
+    """
+    pipe = _mock_pipe(tokens, updated_at, 100.0)
+
+    assert RateLimiter()._take_token(pipe) == 0
+
+    pipe.hset.assert_called_once_with(
+        KEY, mapping={"tokens": expected_tokens, "updated_at": 100.0}
+    )
+
+
+def test_take_token_from_empty_bucket():
+    """
+    Given an empty bucket stored in the cache
+    When we take a token
+    Then the token is not taken
+    And the number of seconds until the next token is available is returned.
+    """
+    pipe = _mock_pipe("0.2", "100", 100.0)
+
+    assert RateLimiter()._take_token(pipe) == pytest.approx(0.4)
+
+    pipe.hset.assert_called_once_with(KEY, mapping={"tokens": 0.2, "updated_at": 100.0})
+
+
+def test_acquire(cache_client):
+    """
+    Given tokens available in the bucket
+    When we call RateLimiter.acquire
+    Then the token is taken in a transaction.
+    """
+    limiter = RateLimiter()
+
+    assert limiter.acquire() is True
+
+    cache_client.transaction.assert_called_once_with(
+        limiter._take_token, KEY, value_from_callable=True
+    )
+
+
+@patch("time.sleep")
+def test_acquire_with_waiting(mock_sleep, cache_client):
+    """
+    Given no tokens available in the bucket
+    When we call RateLimiter.acquire
+    And the next token is available within the maximum waiting time
+    Then we wait for the token and take it.
+    """
+    cache_client.transaction.side_effect = [0.5, 0.0]
+
+    assert RateLimiter().acquire() is True
+
+    mock_sleep.assert_called_once_with(0.5)
+    cache_client.incr.assert_not_called()
+
+
+@patch("time.sleep")
+def test_acquire_throttled(mock_sleep, cache_client):
+    """
+    Given no tokens available in the bucket
+    When we call RateLimiter.acquire
+    And the next token is not available within the maximum waiting time
+    Then the token is not taken
+    And the throttled call is counted.
+    """
+    cache_client.transaction.side_effect = [1.5]
+
+    assert RateLimiter().acquire() is False
+
+    mock_sleep.assert_not_called()
+    cache_client.incr.assert_called_once_with(f"{KEY}:throttled")
+
+
+def test_acquire_with_cache_not_available(cache_client):
+    """
+    Given the cache is not available
+    When we call RateLimiter.acquire
+    Then the call is allowed.
+    """
+    cache_client.transaction.side_effect = ConnectionError
+
+    assert RateLimiter().acquire() is True
+
+
+@pytest.mark.parametrize(
+    "tokens, throttled, expected_result",
+    (
+        (None, None, {"tokens": 10, "throttled": 0}),
+        ("2.5", "7", {"tokens": 2.5, "throttled": 7}),
+    ),
+)
+def test_get_stats(cache_client, tokens, throttled, expected_result):
+    """
+    Given the state of the bucket
+    When we call RateLimiter.get_stats
+    Then the number of tokens and throttled calls is returned.
+    """
+    cache_client.hget.return_value = tokens
+    cache_client.get.return_value = throttled
+
+    assert RateLimiter().get_stats() == expected_result
+
+
+def test_get_stats_with_cache_not_available(cache_client):
+    """
+    Given the cache is not available
+    When we call RateLimiter.get_stats
+    Then None is returned.
+    """
+    cache_client.hget.side_effect = ConnectionError
+
+    assert RateLimiter().get_stats() is None
@@ -0,0 +1,759 @@
+from datetime import timedelta
+from unittest.mock import Mock, patch
+
+import pytest
+from django.conf import settings
+from django.utils import timezone
+from mongoengine.queryset import QuerySet
+from todo_app.system.weather.cells import GeoCell
+from todo_app.system.weather.refresh import (
+    get_cells,
+    get_stale_cells,
+    summarize_weather_refresh,
+    update_weather_for_cells,
+    update_weather_for_task,
+)
+from todo_app.system.weather.retries import RetryQueue
+from todo_app.todo.models import Location, Task, Weather, WeatherCell
+
+
+def _mock_response(status_code: int, data: dict) -> Mock:
+    """Return a mock HTTP response."""
+    result = Mock(status_code=status_code)
+    result.json.return_value = data
+    return result
+
+
+def _get_weather(task) -> Weather | None:
+    """Return the weather stored for the geo cell of the task."""
+    cell = WeatherCell.objects.filter(key=task.cell_key).first()
+    return cell.weather if cell else None
+
+
+def _create_tasks_without_weather(count: int, **kwargs) -> list[Task]:
+    """Create tasks in separate geo cells that have never been refreshed."""
+    return [
+        Task.objects.create(
+            content=f"Sample task {index}",
+            location=Location(lat=index, lon=index, label=f"Location {index}"),
+            **kwargs,
+        )
+        for index in range(count)
+    ]
+
+
+@patch("requests.Session.get")
+def test_update_weather_for_task(mock_get):
+    """
+    Given an active task in a geo cell without weather
+    When we call update_weather_for_task for that task
+    And we get a correct response
+    Then the weather is updated for the cell of the task.
+    """
+    (task,) = _create_tasks_without_weather(1)
+    mock_get.return_value = _mock_response(
+        200,
+        {
+            "weather": [{"main": "Snow"}],
+            "main": {"temp": 10.0},
+        },
+    )
+
+    update_weather_for_task(task)
+
+    mock_get.assert_called_once_with(
+        "https://api.openweathermap.org/data/2.5/weather",
+        params={
+            "lat": "0.0",
+            "lon": "0.0",
+            "appid": settings.WEATHER_API_KEY,
+            "units": "metric",
+        },
+        timeout=(
+            settings.WEATHER_HTTP_CONNECT_TIMEOUT,
+            settings.WEATHER_HTTP_READ_TIMEOUT,
+        ),
+    )
+
+    weather = _get_weather(task)
+    assert weather.main == "Snow"
+    assert weather.temperature == 10.0
+    assert weather.next_refresh_at is not None
+
+
+@patch("requests.Session.get")
+def test_update_weather_for_task_with_incorrect_response(mock_get, caplog):
+    """
+    Given an active task in a geo cell without weather
+    When we call update_weather_for_task for that task
+    And we get a wrong response
+    Then the weather is not updated for the cell of the task
+    And an error is logged.
+    """
+    (task,) = _create_tasks_without_weather(1)
+    mock_get.return_value = _mock_response(400, {})
+
+    update_weather_for_task(task)
+
+    mock_get.assert_called_once()
+    assert _get_weather(task) is None
+    assert f"Weather for task {task.id} has not been updated." in caplog.text
+
+
+@patch("requests.Session.get")
+def test_update_weather_for_task_with_weather_up_to_date(mock_get, task):
+    """
+    Given a task in a geo cell with weather that is not due for a refresh
+    When we call update_weather_for_task for that task
+    Then the weather is not fetched.
+    """
+    now = timezone.now()
+    WeatherCell.objects.filter(key=task.cell_key).update(
+        set__weather__fetched_at=now,
+        set__weather__next_refresh_at=now + timedelta(minutes=1),
+    )
+
+    update_weather_for_task(task)
+
+    mock_get.assert_not_called()
+
+
+@patch("requests.Session.get")
+def test_update_weather_for_task_with_refresh_put_off(mock_get, task, settings):
+    """
+    Given a task in a geo cell whose refresh has been put off while it had no active
+        tasks
+    When we call update_weather_for_task for that task
+    Then the weather is fetched, as it's older than the maximum refresh interval.
+    """
+    settings.WEATHER_MAX_REFRESH_INTERVAL = 600
+    now = timezone.now()
+    WeatherCell.objects.filter(key=task.cell_key).update(
+        set__weather__fetched_at=now - timedelta(minutes=11),
+        set__weather__next_refresh_at=now + timedelta(minutes=1),
+    )
+    mock_get.return_value = _mock_response(
+        200, {"weather": [{"main": "Rain"}], "main": {"temp": 5.0}}
+    )
+
+    update_weather_for_task(task)
+
+    mock_get.assert_called_once()
+    assert _get_weather(task).main == "Rain"
+
+
+@pytest.mark.usefixtures("create_active_tasks")
+@pytest.mark.usefixtures("create_finished_tasks")
+@patch("requests.Session.get")
+def test_update_weather_for_stale_cells(mock_get):
+    """
+    Given active and finished tasks sharing geo cells
+    And finished tasks in other geo cells
+    When we call update_weather_for_cells with the stale cells
+    And we get a correct response
+    Then the weather is updated for the cells with active tasks only
+    And it's written once for each cell.
+    """
+    for index in range(5, 7):
+        Task.objects.create(
+            content=f"Finished task {index}",
+            marked_as_done_at=timezone.now(),
+            location=Location(lat=index, lon=index, label=f"Location {index}"),
+        )
+    mock_get.return_value = _mock_response(
+        200,
+        {
+            "weather": [{"main": "Snow"}],
+            "main": {"temp": 10.0},
+        },
+    )
+
+    result = update_weather_for_cells(get_stale_cells().values())
+
+    assert result == {
+        "cells": 5,
+        "tasks": 5,
+        "updated_cells": 5,
+        "failed_cells": 0,
+        "deferred_cells": 0,
+        "written_cells": 5,
+        "skipped_cells": 0,
+        "bulk_writes": 2,
+    }
+
+    # Check if all the cells of active tasks have the weather updated
+    assert all(
+        _get_weather(task).temperature == 10.0
+        for task in Task.objects.filter(marked_as_done_at="")
+    )
+
+    # Check if the cells with finished tasks only have not been created
+    assert WeatherCell.objects.count() == 5
+
+
+@patch("requests.Session.get")
+def test_update_weather_for_stale_cells_with_incorrect_response(mock_get):
+    """
+    Given active tasks in geo cells without weather
+    When we call update_weather_for_cells with the stale cells
+    And we get a wrong response
+    Then the weather is not updated for any cell.
+    """
+    tasks = _create_tasks_without_weather(5)
+    mock_get.return_value = _mock_response(400, {})
+
+    result = update_weather_for_cells(get_stale_cells().values())
+
+    assert result == {
+        "cells": 5,
+        "tasks": 5,
+        "updated_cells": 0,
+        "failed_cells": 5,
+        "deferred_cells": 0,
+        "written_cells": 0,
+        "skipped_cells": 0,
+        "bulk_writes": 0,
+    }
+    assert all(_get_weather(task) is None for task in tasks)
+
+
+@patch("requests.Session.get")
+def test_update_weather_for_stale_cells_in_the_same_cell(mock_get):
+    """
+    Given active tasks with nearby locations
+    When we call update_weather_for_cells with the stale cells
+    And we get a correct response
+    Then the weather is fetched only once
+    And it's stored once for all the tasks.
+    """
+    for index in range(5):
+        Task.objects.create(
+            content=f"Sample task {index}",
+            location=Location(lat=51.5085 + index / 10000, lon=-0.1257, label="London"),
+        )
+
+    mock_get.return_value = _mock_response(
+        200,
+        {
+            "weather": [{"main": "Rain"}],
+            "main": {"temp": 5.0},
+        },
+    )
+
+    result = update_weather_for_cells(get_stale_cells().values())
+
+    mock_get.assert_called_once_with(
+        "https://api.openweathermap.org/data/2.5/weather",
+        params={
+            "lat": "51.51",
+            "lon": "-0.13",
+            "appid": settings.WEATHER_API_KEY,
+            "units": "metric",
+        },
+        timeout=(
+            settings.WEATHER_HTTP_CONNECT_TIMEOUT,
+            settings.WEATHER_HTTP_READ_TIMEOUT,
+        ),
+    )
+    assert result["tasks"] == 5
+    assert result["written_cells"] == 1
+    (cell,) = WeatherCell.objects.all()
+    assert cell.weather.main == "Rain" and cell.weather.temperature == 5.0
+
+
+@pytest.mark.usefixtures("create_active_tasks")
+@pytest.mark.usefixtures("create_finished_tasks")
+def test_get_stale_cells_with_active_and_finished_tasks():
+    """
+    Given active and finished tasks
+    When we call get_stale_cells
+    Then the cells with the active tasks are returned
+    And the numbers of active tasks are counted for each cell.
+    """
+    Task.objects.create(
+        content="Another task", location=Location(lat=0, lon=0, label="Location 0")
+    )
+
+    result = get_stale_cells()
+
+    assert {key: cell.tasks for key, cell in result.items()} == {
+        "0.00:0.00": 2,
+        "1.00:1.00": 1,
+        "2.00:2.00": 1,
+        "3.00:3.00": 1,
+        "4.00:4.00": 1,
+    }
+    assert result["1.00:1.00"] == GeoCell(
+        key="1.00:1.00",
+        lat=1.0,
+        lon=1.0,
+        tasks=1,
+        last_weather={"main": "Snow", "temperature": 0.0, "refresh_interval": None},
+    )
+
+
+@pytest.mark.usefixtures("create_active_tasks")
+def test_get_stale_cells_without_cells_pending_retry(cache_client):
+    """
+    Given active tasks in cells with stale weather
+    And some of the cells waiting for the retry of a failed fetch
+    When we call get_stale_cells
+    Then the cells waiting for the retry are skipped.
+    """
+    cache_client.zrange.return_value = ["1.00:1.00", "3.00:3.00"]
+
+    result = get_stale_cells()
+
+    assert sorted(result) == ["0.00:0.00", "2.00:2.00", "4.00:4.00"]
+    cache_client.zrange.assert_called_once_with(RetryQueue.queue_key, 0, -1)
+
+
+def test_get_stale_cells(settings):
+    """
+    Given active tasks in cells with the next refresh of the weather due, not due and
+        no weather
+    When we call get_stale_cells
+    Then only the cells with the refresh due or no weather are returned
+    And the cells with the most overdue refresh come first
+    And the number of tasks is limited.
+    """
+    settings.WEATHER_REFRESH_MAX_TASKS = 3
+    now = timezone.now()
+    tasks = _create_tasks_without_weather(5)
+
+    for task, delay in zip(tasks, (-10, 60, None, 600)):
+        WeatherCell(
+            key=task.cell_key,
+            lat=task.location.lat,
+            lon=task.location.lon,
+            weather=(
+                Weather(
+                    main="Snow",
+                    temperature=0.0,
+                    next_refresh_at=now - timedelta(seconds=delay),
+                )
+                if delay
+                else None
+            ),
+        ).save()
+
+    result = get_stale_cells()
+
+    assert set(list(result)[:2]) == {"2.00:2.00", "4.00:4.00"}
+    assert list(result)[2:] == ["3.00:3.00"]
+    assert WeatherCell.objects.count() == 5
+
+
+def test_get_stale_cells_reads_only_required_fields(settings):
+    """
+    Given active tasks
+    When we call get_stale_cells
+    And the cells are read in batches smaller than the number of cells
+    Then all the cells are returned
+    And only the keys, coordinates and weather used by the scheduler are read.
+    """
+    settings.WEATHER_REFRESH_BATCH_SIZE = 2
+    _create_tasks_without_weather(5)
+    WeatherCell.objects.update(
+        set__weather=Weather(main="Snow", temperature=0.0, fetched_at=timezone.now())
+    )
+    only = QuerySet.only
+
+    with patch.object(QuerySet, "only", autospec=True, side_effect=only) as mock_only:
+        result = get_stale_cells()
+
+    assert len(result) == 5
+    (_, *fields), _ = mock_only.call_args
+    assert fields == [
+        "key",
+        "lat",
+        "lon",
+        "weather.main",
+        "weather.temperature",
+        "weather.refresh_interval",
+    ]
+
+
+def test_get_stale_cells_counts_tasks_of_stale_cells_only(settings):
+    """
+    Given active tasks in cells with stale weather and in a cell with fresh weather
+    When we call get_stale_cells
+    And the cells are read in batches
+    Then the active tasks are counted only for the stale cells of each batch
+    And at most as many cells as the maximum number of tasks are read.
+    """
+    settings.WEATHER_REFRESH_BATCH_SIZE = 2
+    settings.WEATHER_REFRESH_MAX_TASKS = 3
+    tasks = _create_tasks_without_weather(5)
+    WeatherCell.objects.filter(key=tasks[0].cell_key).update(
+        set__weather=Weather(
+            main="Snow",
+            temperature=0.0,
+            next_refresh_at=timezone.now() + timedelta(minutes=1),
+        )
+    )
+    aggregate = QuerySet.aggregate
+
+    with patch.object(
+        QuerySet, "aggregate", autospec=True, side_effect=aggregate
+    ) as mock_aggregate:
+        result = get_stale_cells()
+
+    assert len(result) == 3
+    counted = [
+        sorted(queryset._query["cell_key"]["$in"])
+        for (queryset, _), _ in mock_aggregate.call_args_list
+    ]
+    assert counted == [sorted(list(result)[:2]), list(result)[2:]]
+    assert tasks[0].cell_key not in result
+
+
+def test_get_stale_cells_with_many_tasks_in_cell(settings):
+    """
+    Given stale cells with two active tasks each
+    When we call get_stale_cells with the maximum number of tasks set to two
+    Then only the first cell is returned.
+    """
+    settings.WEATHER_REFRESH_MAX_TASKS = 2
+    _create_tasks_without_weather(2)
+    _create_tasks_without_weather(2)
+
+    result = get_stale_cells()
+
+    assert [cell.tasks for cell in result.values()] == [2]
+
+
+def test_get_stale_cells_puts_off_idle_cells(settings):
+    """
+    Given stale cells without active tasks, with and without weather
+    And a stale cell with an active task
+    When we call get_stale_cells
+    Then only the cell with the active task is returned
+    And the refresh of the idle cell with weather is put off by the maximum interval
+    And the idle cell without weather is removed.
+    """
+    settings.WEATHER_MAX_REFRESH_INTERVAL = 600
+    now = timezone.now()
+    active, with_weather, without_weather = _create_tasks_without_weather(3)
+    WeatherCell.objects.filter(key=with_weather.cell_key).update(
+        set__weather=Weather(main="Snow", temperature=0.0, next_refresh_at=now)
+    )
+    Task.objects.filter(id__in=[with_weather.id, without_weather.id]).update(
+        set__marked_as_done_at=now
+    )
+
+    result = get_stale_cells()
+
+    assert list(result) == [active.cell_key]
+    cell = WeatherCell.objects.get(key=with_weather.cell_key)
+    assert cell.weather.next_refresh_at >= (now + timedelta(minutes=10)).replace(
+        microsecond=0, tzinfo=None
+    )
+    assert not WeatherCell.objects.filter(key=without_weather.cell_key).count()
+
+
+@pytest.mark.usefixtures("create_active_tasks", "create_finished_tasks")
+def test_get_cells_of_tasks():
+    """
+    Given active and finished tasks in geo cells with weather not due for a refresh
+    When we call get_cells with the IDs of the tasks
+    Then the cells of those tasks are returned, whether the tasks are active or not.
+    """
+    finished_task = Task.objects.get(content="Finished task 1")
+    active_task = Task.objects.get(content="Sample task 3")
+
+    result = get_cells(task_ids=[str(finished_task.id), str(active_task.id)])
+
+    assert sorted(result) == ["1.00:1.00", "3.00:3.00"]
+    assert result["1.00:1.00"].tasks == 1
+
+
+def test_get_cells_fetched_before(settings):
+    """
+    Given active tasks in geo cells with weather fetched at different times
+    When we call get_cells with the time of an outage
+    Then the cells without the weather fetched since then are returned.
+    """
+    now = timezone.now()
+    tasks = _create_tasks_without_weather(3)
+    for task, age in zip(tasks, (10, 600)):
+        WeatherCell(
+            key=task.cell_key,
+            lat=task.location.lat,
+            lon=task.location.lon,
+            weather=Weather(
+                main="Snow", temperature=0.0, fetched_at=now - timedelta(seconds=age)
+            ),
+        ).save()
+
+    result = get_cells(since=now - timedelta(seconds=60))
+
+    assert sorted(result) == ["1.00:1.00", "2.00:2.00"]
+
+
+@patch("requests.Session.get")
+def test_update_weather_for_cells(mock_get, task):
+    """
+    Given a geo cell with a task
+    When we call update_weather_for_cells
+    And we get a correct response
+    Then the weather is updated for the cell
+    And a correct summary is returned.
+    """
+    mock_get.return_value = _mock_response(
+        200,
+        {
+            "weather": [{"main": "Clear"}],
+            "main": {"temp": 25.0},
+        },
+    )
+    cell = GeoCell(key="10.00:20.00", lat=10.0, lon=20.0, tasks=1)
+
+    result = update_weather_for_cells([cell])
+
+    assert result == {
+        "cells": 1,
+        "tasks": 1,
+        "updated_cells": 1,
+        "failed_cells": 0,
+        "deferred_cells": 0,
+        "written_cells": 1,
+        "skipped_cells": 0,
+        "bulk_writes": 2,
+    }
+    weather = _get_weather(task)
+    assert weather.main == "Clear"
+    assert weather.temperature == 25.0
+    assert weather.fetched_at is not None
+    assert weather.refresh_interval == settings.WEATHER_MAX_AGE
+
+
+@patch("requests.Session.get")
+def test_update_weather_for_cells_with_unchanged_weather(mock_get, task):
+    """
+    Given a geo cell with a task
+    When we call update_weather_for_cells
+    And we get the same weather as the stored one
+    Then the weather is not written
+    And the skipped cell is reported in the summary.
+    """
+    mock_get.return_value = _mock_response(
+        200, {"weather": [{"main": "Snow"}], "main": {"temp": 0.0}}
+    )
+    cell = GeoCell(key="10.00:20.00", lat=10.0, lon=20.0, tasks=1)
+
+    result = update_weather_for_cells([cell])
+
+    assert result["written_cells"] == 0
+    assert result["skipped_cells"] == 1
+    weather = _get_weather(task)
+    assert weather.fetched_at is not None
+    assert weather.next_refresh_at is not None
+
+
+@patch("requests.Session.get")
+def test_update_weather_for_cells_schedules_next_refresh(mock_get, task, cache_client):
+    """
+    Given a geo cell with changed weather and viewed tasks
+    And a geo cell with stable weather and tasks that were not viewed
+    When we call update_weather_for_cells
+    And we get a correct response
+    Then the next refresh is scheduled for each cell
+    And only the refresh of the cell with stable weather is backed off.
+    """
+    mock_get.return_value = _mock_response(
+        200, {"weather": [{"main": "Clear"}], "main": {"temp": 25.0}}
+    )
+    cache_client.mget.return_value = ["1", None]
+    other_task = Task.objects.create(
+        content="Other task", location=Location(lat=30, lon=40, label="Other")
+    )
+    WeatherCell(key=other_task.cell_key, lat=30.0, lon=40.0).save()
+    last_weather = {"main": "Clear", "temperature": 25.0, "refresh_interval": 60}
+    cells = [
+        GeoCell(
+            key="10.00:20.00",
+            lat=10.0,
+            lon=20.0,
+            tasks=1,
+            last_weather={**last_weather, "temperature": 20.0},
+        ),
+        GeoCell(
+            key="30.00:40.00",
+            lat=30.0,
+            lon=40.0,
+            tasks=1,
+            last_weather=last_weather,
+        ),
+    ]
+
+    update_weather_for_cells(cells)
+
+    cache_client.mget.assert_called_with(
+        ["weather:viewed:10.00:20.00", "weather:viewed:30.00:40.00"]
+    )
+    assert _get_weather(task).refresh_interval == settings.WEATHER_MAX_AGE
+    other_weather = _get_weather(other_task)
+    assert other_weather.refresh_interval == 120
+    assert other_weather.next_refresh_at == other_weather.fetched_at + timedelta(
+        seconds=120
+    )
+
+
+@patch("requests.Session.get")
+def test_update_weather_for_cells_in_forecast_mode(mock_get, task, settings):
+    """
+    Given a geo cell with a task
+    And the forecast mode enabled
+    When we call update_weather_for_cells twice
+    And we get a correct forecast
+    Then the weather of the cell is taken from the forecast
+    And the forecast is fetched only once.
+    """
+    settings.WEATHER_FORECAST_MODE = True
+    starts_at = int(timezone.now().timestamp())
+    mock_get.return_value = _mock_response(
+        200,
+        {
+            "list": [
+                {
+                    "dt": starts_at + index * 10800,
+                    "weather": [{"main": "Clear"}],
+                    "main": {"temp": 25.0},
+                }
+                for index in range(3)
+            ]
+        },
+    )
+    cell = GeoCell(key="10.00:20.00", lat=10.0, lon=20.0, tasks=1)
+
+    update_weather_for_cells([cell])
+    result = update_weather_for_cells([cell])
+
+    assert result["updated_cells"] == 1
+    assert mock_get.call_count == 1
+    assert mock_get.call_args.args == (
+        "https://api.openweathermap.org/data/2.5/forecast",
+    )
+    weather = _get_weather(task)
+    assert weather.main == "Clear"
+    assert weather.temperature == 25.0
+    assert weather.refresh_interval == settings.WEATHER_MAX_AGE
+
+
+@patch.object(RetryQueue, "remove")
+@patch.object(RetryQueue, "add")
+@patch("requests.Session.get")
+def test_update_weather_for_cells_queues_failed_cells(
+    mock_get, mock_add, mock_remove, task
+):
+    """
+    Given geo cells with tasks
+    When we call update_weather_for_cells
+    And the weather of one of the cells is not fetched
+    Then that cell is queued for a retry
+    And the other cell is removed from the retry queue.
+    """
+    mock_get.side_effect = [
+        _mock_response(200, {"weather": [{"main": "Clear"}], "main": {"temp": 25.0}}),
+        _mock_response(500, {}),
+    ]
+    WeatherCell(key="30.00:40.00", lat=30.0, lon=40.0).save()
+    cells = [
+        GeoCell(key="10.00:20.00", lat=10.0, lon=20.0, tasks=1),
+        GeoCell(key="30.00:40.00", lat=30.0, lon=40.0, tasks=1),
+    ]
+
+    with patch("todo_app.system.weather.refresh.fetch_weather_for_cells") as mock_fetch:
+        mock_fetch.return_value = {
+            "10.00:20.00": Weather(
+                main="Clear", temperature=25.0, fetched_at=timezone.now()
+            ),
+            "30.00:40.00": None,
+        }
+        result = update_weather_for_cells(cells)
+
+    assert result["failed_cells"] == 1
+    mock_add.assert_called_once_with([cells[1]])
+    assert list(mock_remove.call_args.args[0]) == ["10.00:20.00"]
+
+
+@patch.object(RetryQueue, "postpone")
+@patch.object(RetryQueue, "add")
+def test_update_weather_for_cells_with_skipped_fetch(mock_add, mock_postpone, task):
+    """
+    Given geo cells with tasks
+    When we call update_weather_for_cells
+    And the fetch of one of the cells is skipped
+    Then that cell is not counted as failed
+    And its retry is postponed without a new attempt.
+    """
+    WeatherCell(key="30.00:40.00", lat=30.0, lon=40.0).save()
+    cells = [
+        GeoCell(key="10.00:20.00", lat=10.0, lon=20.0, tasks=1),
+        GeoCell(key="30.00:40.00", lat=30.0, lon=40.0, tasks=1),
+    ]
+
+    with patch("todo_app.system.weather.refresh.fetch_weather_for_cells") as mock_fetch:
+        mock_fetch.return_value = {
+            "10.00:20.00": Weather(
+                main="Clear", temperature=25.0, fetched_at=timezone.now()
+            ),
+        }
+        result = update_weather_for_cells(cells)
+
+    assert result["failed_cells"] == 0
+    assert result["deferred_cells"] == 1
+    mock_add.assert_called_once_with([])
+    mock_postpone.assert_called_once_with([cells[1]])
+
+
+@patch.object(RetryQueue, "add")
+def test_update_weather_for_cells_with_options(mock_add, task):
+    """
+    Given a geo cell with a task
+    When we call update_weather_for_cells with a cache, without the retries and
+        without notifying the task lists
+    Then the weather is fetched with the given cache
+    And the failed cell is not queued for a retry
+    And the task lists are not notified.
+    """
+    cache = Mock()
+    cache.get_or_fetch.return_value = None
+    cell = GeoCell(key="10.00:20.00", lat=10.0, lon=20.0, tasks=1)
+
+    with patch("todo_app.system.weather.refresh.write_weather") as mock_write:
+        mock_write.return_value = {}
+        result = update_weather_for_cells(
+            [cell], cache=cache, retry=False, notify=False
+        )
+
+    assert result["failed_cells"] == 1
+    cache.get_or_fetch.assert_called_once()
+    mock_add.assert_not_called()
+    mock_write.assert_called_once_with([], notify=False)
+
+
+def test_summarize_weather_refresh():
+    """
+    Given summaries of the weather updates
+    When we call summarize_weather_refresh
+    Then the summaries are combined.
+    """
+    result = summarize_weather_refresh(
+        [
+            {"cells": 2, "tasks": 5, "updated_cells": 1, "updated_tasks": 3},
+            {"cells": 1, "tasks": 1, "updated_cells": 1, "updated_tasks": 1},
+        ]
+    )
+
+    assert result == {"cells": 3, "tasks": 6, "updated_cells": 2, "updated_tasks": 4}
+
+
+def test_summarize_weather_refresh_without_summaries():
+    """
+    Given no summaries of the weather updates
+    When we call summarize_weather_refresh
+    Then an empty summary is returned.
+    """
+    assert summarize_weather_refresh([]) == {}
@@ -0,0 +1,242 @@
+import json
+from unittest.mock import call, patch
+
+import pytest
+from redis.exceptions import ConnectionError
+from todo_app.system.weather.cells import GeoCell
+from todo_app.system.weather.retries import RetryQueue
+
+CELLS = [
+    GeoCell(key=f"{index}.00:0.00", lat=index, lon=0.0, tasks=1) for index in range(3)
+]
+
+
+def _get_entry(cell: GeoCell, attempts: int) -> str:
+    """Return the entry of the retry queue for the cell."""
+    return json.dumps(
+        {
+            "cell": {
+                "key": cell.key,
+                "lat": cell.lat,
+                "lon": cell.lon,
+                "tasks": cell.tasks,
+                "last_weather": None,
+            },
+            "attempts": attempts,
+        }
+    )
+
+
+@pytest.mark.parametrize("attempts, expected_result", ((1, 60), (2, 120), (5, 960)))
+def test_get_backoff(attempts, expected_result):
+    """
+    Given the retry queue
+    When we get the backoff after the given number of failed attempts
+    Then the configured backoff doubled after each failed attempt is returned.
+    """
+    assert RetryQueue().get_backoff(attempts) == expected_result
+
+
+@patch("time.time", return_value=1000.0)
+def test_add(mock_time, cache_client, settings, caplog):
+    """
+    Given geo cells that failed for the first time, once before and in all the retries
+    When we add them to the retry queue
+    Then the retries of the first two cells are scheduled with the backoff
+    And the last cell is moved to the dead-letter list of the configured size.
+    """
+    settings.WEATHER_RETRY_MAX_ATTEMPTS = 2
+    settings.WEATHER_RETRY_DEAD_LETTER_SIZE = 10
+    cache_client.hmget.return_value = [
+        None,
+        _get_entry(CELLS[1], 1),
+        _get_entry(CELLS[2], 2),
+    ]
+    pipe = cache_client.pipeline.return_value
+
+    RetryQueue().add(CELLS)
+
+    cache_client.hmget.assert_called_once_with(
+        RetryQueue.entries_key, [cell.key for cell in CELLS]
+    )
+    assert pipe.mock_calls == [
+        call.hset(RetryQueue.entries_key, CELLS[0].key, _get_entry(CELLS[0], 1)),
+        call.zadd(RetryQueue.queue_key, {CELLS[0].key: 1060.0}),
+        call.hset(RetryQueue.entries_key, CELLS[1].key, _get_entry(CELLS[1], 2)),
+        call.zadd(RetryQueue.queue_key, {CELLS[1].key: 1120.0}),
+        call.lpush(
+            RetryQueue.dead_letter_key,
+            json.dumps(
+                {
+                    **json.loads(_get_entry(CELLS[2], 3)),
+                    "failed_at": 1000.0,
+                }
+            ),
+        ),
+        call.zrem(RetryQueue.queue_key, CELLS[2].key),
+        call.hdel(RetryQueue.entries_key, CELLS[2].key),
+        call.ltrim(RetryQueue.dead_letter_key, 0, 9),
+        call.execute(),
+    ]
+    assert "Weather for geo cell 2.00:0.00 has not been fetched in 3" in caplog.text
+
+
+def test_add_without_cells(cache_client):
+    """
+    Given no geo cells
+    When we add them to the retry queue
+    Then the cache is not called.
+    """
+    RetryQueue().add([])
+
+    cache_client.hmget.assert_not_called()
+
+
+@patch("time.time", return_value=1000.0)
+def test_postpone(mock_time, cache_client):
+    """
+    Given geo cells whose fetch has been skipped, one of them waiting for a retry
+    When we postpone their retries
+    Then the retry of the waiting cell is scheduled again with the same backoff
+    And the number of its failed attempts is not changed.
+    """
+    cache_client.hmget.return_value = [None, _get_entry(CELLS[1], 2)]
+    pipe = cache_client.pipeline.return_value
+
+    RetryQueue().postpone(CELLS[:2])
+
+    cache_client.hmget.assert_called_once_with(
+        RetryQueue.entries_key, [CELLS[0].key, CELLS[1].key]
+    )
+    assert pipe.mock_calls == [
+        call.zadd(RetryQueue.queue_key, {CELLS[1].key: 1120.0}),
+        call.execute(),
+    ]
+
+
+def test_postpone_without_cells(cache_client):
+    """
+    Given no geo cells
+    When we postpone their retries
+    Then the cache is not called.
+    """
+    RetryQueue().postpone([])
+
+    cache_client.hmget.assert_not_called()
+
+
+def test_remove(cache_client):
+    """
+    Given geo cells whose weather has been fetched
+    When we remove them from the retry queue
+    Then their retries and entries are removed.
+    """
+    pipe = cache_client.pipeline.return_value
+
+    RetryQueue().remove(iter(["0.00:0.00", "1.00:0.00"]))
+
+    assert pipe.mock_calls == [
+        call.zrem(RetryQueue.queue_key, "0.00:0.00", "1.00:0.00"),
+        call.hdel(RetryQueue.entries_key, "0.00:0.00", "1.00:0.00"),
+        call.execute(),
+    ]
+
+
+def test_remove_without_cells(cache_client):
+    """
+    Given no geo cells
+    When we remove them from the retry queue
+    Then the cache is not called.
+    """
+    RetryQueue().remove([])
+
+    cache_client.pipeline.assert_not_called()
+
+
+@patch("time.time", return_value=1000.0)
+def test_pop_due(mock_time, cache_client):
+    """
+    Given geo cells whose retry is due
+    And one of them taken by another worker in the meantime
+    When we pop the due cells from the retry queue
+    Then the cells taken by this worker are returned.
+    """
+    cache_client.zrangebyscore.return_value = [CELLS[0].key, CELLS[1].key]
+    cache_client.pipeline.return_value.execute.return_value = [1, 0]
+    cache_client.hmget.return_value = [_get_entry(CELLS[0], 1)]
+
+    result = RetryQueue().pop_due(10)
+
+    assert result == [CELLS[0]]
+    cache_client.zrangebyscore.assert_called_once_with(
+        RetryQueue.queue_key, "-inf", 1000.0, start=0, num=10
+    )
+    cache_client.hmget.assert_called_once_with(RetryQueue.entries_key, [CELLS[0].key])
+
+
+@pytest.mark.parametrize("keys, removed", (([], []), (["0.00:0.00"], [0])))
+def test_pop_due_without_cells(cache_client, keys, removed):
+    """
+    Given no geo cells whose retry is due or only cells taken by another worker
+    When we pop the due cells from the retry queue
+    Then no cells are returned.
+    """
+    cache_client.zrangebyscore.return_value = keys
+    cache_client.pipeline.return_value.execute.return_value = removed
+
+    assert RetryQueue().pop_due(10) == []
+
+    cache_client.hmget.assert_not_called()
+
+
+def test_get_pending(cache_client):
+    """
+    Given geo cells waiting for their retry
+    When we get the pending cells
+    Then their keys are returned.
+    """
+    cache_client.zrange.return_value = ["0.00:0.00", "1.00:0.00"]
+
+    assert RetryQueue().get_pending() == {"0.00:0.00", "1.00:0.00"}
+
+
+def test_get_dead_letters(cache_client):
+    """
+    Given geo cells with exhausted retries
+    When we get the dead letters
+    Then the cells with their attempts are returned.
+    """
+    cache_client.lrange.return_value = [_get_entry(CELLS[0], 6)]
+
+    result = RetryQueue().get_dead_letters()
+
+    assert result == [json.loads(_get_entry(CELLS[0], 6))]
+    cache_client.lrange.assert_called_once_with(RetryQueue.dead_letter_key, 0, -1)
+
+
+@pytest.mark.parametrize(
+    "method, args, expected_result, message",
+    (
+        ("add", (CELLS,), None, "Failed weather fetches have not been queued"),
+        ("postpone", (CELLS,), None, "Skipped weather fetches have not been queued"),
+        ("remove", (["0.00:0.00"],), None, "Weather retries have not been removed"),
+        ("pop_due", (10,), [], "Weather retries are not available"),
+        ("get_pending", (), set(), "Weather retries are not available"),
+    ),
+)
+def test_cache_not_available(
+    cache_client, caplog, method, args, expected_result, message
+):
+    """
+    Given the cache that is not available
+    When we call a method of the retry queue
+    Then a warning is logged
+    And the failed cells are left to the periodic refresh.
+    """
+    cache_client.hmget.side_effect = ConnectionError
+    cache_client.pipeline.side_effect = ConnectionError
+    cache_client.zrangebyscore.side_effect = ConnectionError
+    cache_client.zrange.side_effect = ConnectionError
+
+    assert getattr(RetryQueue(), method)(*args) == expected_result
+    assert message in caplog.text
@@ -0,0 +1,170 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import call
+
+import pytest
+from redis.exceptions import ConnectionError
+from todo_app.system.weather.scheduler import RefreshScheduler, record_task_views
+from todo_app.todo.models import Location, Task, Weather, WeatherCell
+
+FETCHED_AT = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture(autouse=True)
+def scheduler_settings(settings):
+    """Configure the scheduler used in the tests."""
+    settings.WEATHER_MAX_AGE = 60
+    settings.WEATHER_MAX_REFRESH_INTERVAL = 600
+    settings.WEATHER_CHANGE_THRESHOLD = 1.0
+    settings.WEATHER_VIEW_TIMEOUT = 300
+
+
+@pytest.mark.parametrize(
+    "last_weather, viewed, expected_interval",
+    (
+        (None, True, 60),
+        (None, False, 60),
+        ({"main": "Clear", "temperature": 20.0, "refresh_interval": None}, False, 60),
+        ({"main": "Clear", "temperature": 20.0, "refresh_interval": 60}, True, 120),
+        ({"main": "Clear", "temperature": 20.5, "refresh_interval": 60}, True, 120),
+        ({"main": "Clear", "temperature": 21.0, "refresh_interval": 240}, True, 60),
+        ({"main": "Rain", "temperature": 20.0, "refresh_interval": 240}, True, 60),
+        ({"main": "Rain", "temperature": 20.0, "refresh_interval": 240}, False, 480),
+        ({"main": "Clear", "temperature": 20.0, "refresh_interval": 480}, True, 600),
+        ({"main": "Clear", "temperature": 20.0, "refresh_interval": 10}, True, 60),
+        ({"main": "Clear", "refresh_interval": 120}, True, 60),
+    ),
+)
+def test_schedule(last_weather, viewed, expected_interval):
+    """
+    Given the weather that has just been fetched and the last weather of the cell
+    When we schedule the next refresh
+    Then the minimum interval is used for new cells and cells with changed weather
+        and viewed tasks
+    And the interval is doubled for other cells, up to the maximum interval.
+    """
+    weather = Weather(main="Clear", temperature=20.0, fetched_at=FETCHED_AT)
+
+    RefreshScheduler().schedule(weather, last_weather, viewed)
+
+    assert weather.refresh_interval == expected_interval
+    assert weather.next_refresh_at == FETCHED_AT + timedelta(seconds=expected_interval)
+
+
+def test_record_views(cache_client):
+    """
+    Given cells viewed recently and cells not viewed recently
+    When we call RefreshScheduler.record_views
+    Then all the cells are marked as viewed
+    And the cells that were not viewed recently are returned.
+    """
+    pipe = cache_client.pipeline.return_value
+    pipe.execute.return_value = [None, "1"]
+
+    result = RefreshScheduler().record_views(["1.00:2.00", "3.00:4.00"])
+
+    assert result == {"1.00:2.00"}
+    cache_client.pipeline.assert_called_once_with(transaction=False)
+    assert pipe.set.call_args_list == [
+        call("weather:viewed:1.00:2.00", 1, ex=300, get=True),
+        call("weather:viewed:3.00:4.00", 1, ex=300, get=True),
+    ]
+
+
+def test_record_views_with_cache_not_available(cache_client):
+    """
+    Given the cache is not available
+    When we call RefreshScheduler.record_views
+    Then no cells are returned.
+    """
+    cache_client.pipeline.return_value.execute.side_effect = ConnectionError
+
+    assert RefreshScheduler().record_views(["1.00:2.00"]) == set()
+
+
+def test_get_viewed(cache_client):
+    """
+    Given cells viewed recently and cells not viewed recently
+    When we call RefreshScheduler.get_viewed
+    Then the cells viewed recently are returned.
+    """
+    cache_client.mget.return_value = ["1", None]
+
+    result = RefreshScheduler().get_viewed(["1.00:2.00", "3.00:4.00"])
+
+    assert result == {"1.00:2.00"}
+    cache_client.mget.assert_called_once_with(
+        ["weather:viewed:1.00:2.00", "weather:viewed:3.00:4.00"]
+    )
+
+
+def test_get_viewed_without_cells(cache_client):
+    """
+    Given no cells
+    When we call RefreshScheduler.get_viewed
+    Then no cells are returned without calling the cache.
+    """
+    assert RefreshScheduler().get_viewed([]) == set()
+
+    cache_client.mget.assert_not_called()
+
+
+def test_get_viewed_with_cache_not_available(cache_client):
+    """
+    Given the cache is not available
+    When we call RefreshScheduler.get_viewed
+    Then all the cells are considered viewed.
+    """
+    cache_client.mget.side_effect = ConnectionError
+
+    assert RefreshScheduler().get_viewed(["1.00:2.00"]) == {"1.00:2.00"}
+
+
+def test_record_task_views(cache_client):
+    """
+    Given tasks in a cell viewed recently and in a cell not viewed recently
+    When we call record_task_views
+    Then the next refresh of the cell not viewed recently is brought forward to now.
+    """
+    next_refresh_at = datetime.now(timezone.utc) + timedelta(minutes=10)
+    tasks = []
+    for index in range(2):
+        task = Task.objects.create(
+            content=f"Sample task {index}",
+            location=Location(lat=index, lon=index, label=f"Location {index}"),
+        )
+        WeatherCell(
+            key=task.cell_key,
+            lat=index,
+            lon=index,
+            weather=Weather(
+                main="Snow", temperature=0.0, next_refresh_at=next_refresh_at
+            ),
+        ).save()
+        tasks.append(task)
+    cache_client.pipeline.return_value.execute.return_value = [None, "1"]
+
+    record_task_views(tasks)
+
+    new_cell, viewed_cell = (
+        WeatherCell.objects.get(key=key) for key in ("0.00:0.00", "1.00:1.00")
+    )
+    assert (
+        viewed_cell.weather.next_refresh_at - new_cell.weather.next_refresh_at
+        > timedelta(minutes=9)
+    )
+
+
+def test_record_task_views_without_new_cells(task, cache_client, settings):
+    """
+    Given tasks in cells viewed recently
+    When we call record_task_views
+    Then the cells are not updated.
+    """
+    cache_client.pipeline.return_value.execute.return_value = ["1"]
+
+    record_task_views([task])
+
+    cache_client.pipeline.return_value.set.assert_called_once_with(
+        "weather:viewed:10.00:20.00", 1, ex=settings.WEATHER_VIEW_TIMEOUT, get=True
+    )
+    assert WeatherCell.objects.get(key=task.cell_key).weather.next_refresh_at is None
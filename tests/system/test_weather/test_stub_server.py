@@ -0,0 +1,111 @@
+import pytest
+import requests
+from todo_app.system.weather.stub_server import (
+    FORECAST_PATH,
+    WEATHER_PATH,
+    StubWeatherServer,
+)
+
+
+@pytest.fixture(name="stub_server")
+def stub_server_fixture(request):
+    """Start the stub of the Weather API with the parameters of the test."""
+    server = StubWeatherServer(("127.0.0.1", 0), **getattr(request, "param", {}))
+    server.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_weather(stub_server):
+    """
+    Given the stub of the Weather API
+    When we request the current weather
+    Then the weather for the requested coordinates is returned
+    And the request is counted.
+    """
+    response = requests.get(
+        f"{stub_server.url}{WEATHER_PATH}",
+        params={"lat": "10.0", "lon": "20.0", "units": "metric"},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "coord": {"lat": 10.0, "lon": 20.0},
+        "weather": [{"main": "Clear"}],
+        "main": {"temp": 25.0},
+    }
+    assert stub_server.requests == {200: 1}
+
+
+def test_get_forecast(stub_server):
+    """
+    Given the stub of the Weather API
+    When we request the forecast
+    Then the requested number of 3-hour slots for the coordinates is returned.
+    """
+    response = requests.get(
+        f"{stub_server.url}{FORECAST_PATH}",
+        params={"lat": "10.0", "lon": "20.0", "units": "metric", "cnt": "3"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["cnt"] == 3
+    assert [slot["dt"] - data["list"][0]["dt"] for slot in data["list"]] == [
+        0,
+        10800,
+        21600,
+    ]
+    assert data["list"][0]["dt"] % 10800 == 0
+    assert data["list"][0]["weather"] == [{"main": "Clear"}]
+    assert data["list"][0]["main"] == {"temp": 25.0}
+
+
+def test_get_unknown_path(stub_server):
+    """
+    Given the stub of the Weather API
+    When we request an unknown path
+    Then the response with status code 404 is returned.
+    """
+    response = requests.get(f"{stub_server.url}/data/2.5/onecall")
+
+    assert response.status_code == 404
+    assert stub_server.requests == {404: 1}
+
+
+@pytest.mark.parametrize(
+    "stub_server, expected_status_code",
+    (
+        ({"error_rate": 1.0}, 500),
+        ({"too_many_requests_rate": 1.0}, 429),
+    ),
+    indirect=["stub_server"],
+)
+def test_get_weather_with_failures(stub_server, expected_status_code):
+    """
+    Given the stub of the Weather API that fails all the requests
+    When we request the current weather
+    Then the response with the status code of the failure is returned.
+    """
+    response = requests.get(f"{stub_server.url}{WEATHER_PATH}")
+
+    assert response.status_code == expected_status_code
+    assert stub_server.requests == {expected_status_code: 1}
+
+
+def test_draw_status_code():
+    """
+    Given the stub of the Weather API with a seed
+    When we draw the status codes of many responses
+    Then the fractions of the failures match the configured rates.
+    """
+    server = StubWeatherServer(
+        ("127.0.0.1", 0), error_rate=0.2, too_many_requests_rate=0.1, seed=1
+    )
+    server.server_close()
+
+    status_codes = [server.draw_status_code() for _ in range(10000)]
+
+    assert status_codes.count(500) / len(status_codes) == pytest.approx(0.2, abs=0.02)
+    assert status_codes.count(429) / len(status_codes) == pytest.approx(0.1, abs=0.02)
@@ -1,16 +1,16 @@
 import pytest
-from todo_app.todo.colors import get_task_css_classes
+from todo_app.todo.colors import get_task_css_classes, get_weather_css_classes
 from todo_app.todo.models import Location, Task, Weather
 
 
 def _get_task(temperature: float, main: str) -> Task:
-    return Task(
+    result = Task(
         content="sample task",
         location=Location(lat=0, lon=0, label="sample location"),
-        weather=Weather(temperature=temperature, main=main)
-        if temperature is not None or main is not None
-        else None,
     )
+    if temperature is not None or main is not None:
+        result.weather = Weather(temperature=temperature, main=main)
+    return result
 
 
 @pytest.mark.parametrize(
@@ -38,3 +38,19 @@ def test_get_task_css_classes(task, expected_result):
     Then we get a correct result.
     """
     assert get_task_css_classes(task) == expected_result
+
+
+@pytest.mark.parametrize(
+    "weather, expected_result",
+    (
+        (None, "border"),
+        (Weather(temperature=20, main="Clear"), "border-red bg-red-100"),
+    ),
+)
+def test_get_weather_css_classes(weather, expected_result):
+    """
+    Given the weather of the tasks
+    When we get the CSS classes for it
+    Then the correct classes are returned.
+    """
+    assert get_weather_css_classes(weather) == expected_result
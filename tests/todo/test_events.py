@@ -0,0 +1,257 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from redis.exceptions import ConnectionError
+from todo_app.system.document_store import SingletonMeta
+from todo_app.todo.events import (
+    CHANNEL,
+    EventBroadcaster,
+    publish_task_change,
+    publish_weather_change,
+)
+from todo_app.todo.models import Location, Task, Weather
+
+
+class FakePubSub:
+    """Subscription to the channel that returns the messages put into its queue."""
+
+    def __init__(self, error: Exception | None = None):
+        self.messages = asyncio.Queue()
+        self.subscribe = AsyncMock(side_effect=error)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def listen(self):
+        """Yield the confirmation of the subscription and then the messages."""
+        yield {"type": "subscribe", "data": 1}
+        while (message := await self.messages.get()) is not None:
+            yield {"type": "message", "data": message}
+
+
+@pytest.fixture(name="broadcaster")
+def broadcaster_fixture():
+    """Create a new broadcaster, as its queues belong to the event loop of a test."""
+    SingletonMeta._instances.pop(EventBroadcaster, None)
+    yield EventBroadcaster()
+    SingletonMeta._instances.pop(EventBroadcaster, None)
+
+
+def _mock_client(pubsub: FakePubSub):
+    """Patch the asynchronous cache client to return the given subscription."""
+    client = MagicMock()
+    client.pubsub.return_value = pubsub
+    client.aclose = AsyncMock()
+    return patch("redis.asyncio.Redis.from_url", return_value=client)
+
+
+def test_publish_task_change(task, cache_client, settings):
+    """
+    Given a changed task in a geo cell with weather
+    When we publish the change of the task
+    Then its card with the weather of the cell is published.
+    """
+    settings.TASK_EVENTS = True
+
+    publish_task_change(Task.objects.get(id=task.id))
+
+    channel, data = cache_client.publish.call_args.args
+    event = json.loads(data)
+    assert channel == CHANNEL
+    assert event["type"] == "task"
+    assert event["id"] == str(task.id)
+    assert event["finished"] is False
+    assert f'id="task#{task.id}"' in event["html"]
+    assert "0.0&deg;C, Snow" in event["html"]
+
+
+def test_publish_task_change_without_weather(cache_client, settings):
+    """
+    Given a new task in a geo cell without weather
+    When we publish the change of the task
+    Then its card is published without the weather.
+    """
+    settings.TASK_EVENTS = True
+    task = Task.objects.create(
+        content="New task", location=Location(lat=1, lon=2, label="Location")
+    )
+
+    publish_task_change(task)
+
+    event = json.loads(cache_client.publish.call_args.args[1])
+    assert task.weather is None
+    assert "data-task-weather hidden" in event["html"]
+
+
+def test_publish_weather_change(cache_client, settings):
+    """
+    Given the weather of geo cells
+    When we publish the change of the weather
+    Then the weather with the CSS classes of the tasks is published for each cell.
+    """
+    settings.TASK_EVENTS = True
+
+    publish_weather_change(
+        [
+            ("0.00:0.00", Weather(main="Rain", temperature=1.5)),
+            ("1.00:1.00", Weather(main="Clear", temperature=20.0)),
+        ]
+    )
+
+    channel, data = cache_client.publish.call_args.args
+    assert channel == CHANNEL
+    assert json.loads(data) == {
+        "type": "weather",
+        "cells": {
+            "0.00:0.00": {
+                "text": "1.5\N{DEGREE SIGN}C, Rain",
+                "classes": "border-indigo bg-indigo-100",
+            },
+            "1.00:1.00": {
+                "text": "20.0\N{DEGREE SIGN}C, Clear",
+                "classes": "border-red bg-red-100",
+            },
+        },
+    }
+
+
+def test_publish_weather_change_without_cells(cache_client, settings):
+    """
+    Given no geo cells
+    When we publish the change of the weather
+    Then nothing is published.
+    """
+    settings.TASK_EVENTS = True
+
+    publish_weather_change([])
+
+    cache_client.publish.assert_not_called()
+
+
+def test_publish_without_events(task, cache_client, settings):
+    """
+    Given the changes that are not pushed to the task lists
+    When we publish the changes of a task and the weather
+    Then nothing is published.
+    """
+    settings.TASK_EVENTS = False
+
+    publish_task_change(task)
+    publish_weather_change([("0.00:0.00", Weather(main="Rain", temperature=1.5))])
+
+    cache_client.publish.assert_not_called()
+
+
+def test_publish_with_cache_not_available(cache_client, settings, caplog):
+    """
+    Given the cache that is not available
+    When we publish the change of the weather
+    Then a warning is logged.
+    """
+    settings.TASK_EVENTS = True
+    cache_client.publish.side_effect = ConnectionError
+
+    publish_weather_change([("0.00:0.00", Weather(main="Rain", temperature=1.5))])
+
+    assert "Change of the task list has not been published" in caplog.text
+
+
+def test_listen(broadcaster):
+    """
+    Given two streams listening to the changes
+    When changes are published
+    Then each stream receives all of them
+    And the subscription is shared by the streams and closed with the last one.
+    """
+    pubsub = FakePubSub()
+
+    async def run():
+        first, second = broadcaster.listen(10), broadcaster.listen(10)
+        first_task = asyncio.create_task(first.__anext__())
+        second_task = asyncio.create_task(second.__anext__())
+        await asyncio.sleep(0)
+        await pubsub.messages.put('{"type": "weather"}')
+
+        results = [await first_task, await second_task]
+        listener = broadcaster.listener
+        await first.aclose()
+        assert broadcaster.listener is listener
+        await second.aclose()
+        await asyncio.sleep(0)
+        return results, listener
+
+    with _mock_client(pubsub) as mock_from_url:
+        results, listener = asyncio.run(run())
+
+    assert results == ['{"type": "weather"}', '{"type": "weather"}']
+    mock_from_url.assert_called_once()
+    pubsub.subscribe.assert_awaited_once_with(CHANNEL)
+    assert listener.cancelled()
+    assert broadcaster.listener is None
+    assert not broadcaster.queues
+
+
+def test_listen_without_changes(broadcaster):
+    """
+    Given a stream listening to the changes
+    When there are no changes for the given time
+    Then None is yielded to keep the stream alive.
+    """
+
+    async def run():
+        stream = broadcaster.listen(0.01)
+        result = await stream.__anext__()
+        await stream.aclose()
+        return result
+
+    with _mock_client(FakePubSub()):
+        assert asyncio.run(run()) is None
+
+
+def test_listen_with_slow_stream(broadcaster):
+    """
+    Given a stream that does not keep up with the changes
+    When more changes than the size of its queue are published
+    Then the oldest changes are dropped for the stream.
+    """
+    broadcaster.queue_size = 2
+    pubsub = FakePubSub()
+
+    async def run():
+        stream = broadcaster.listen(10)
+        first = asyncio.create_task(stream.__anext__())
+        await asyncio.sleep(0)
+        await pubsub.messages.put("0")
+        result = [await first]
+        for index in range(1, 4):
+            await pubsub.messages.put(str(index))
+        await asyncio.sleep(0.01)
+        result += [await stream.__anext__(), await stream.__anext__()]
+        await stream.aclose()
+        return result
+
+    with _mock_client(pubsub):
+        assert asyncio.run(run()) == ["0", "2", "3"]
+
+
+def test_listen_with_cache_not_available(broadcaster, caplog):
+    """
+    Given the cache that is not available
+    When a stream listens to the changes
+    Then the stream ends
+    And a warning is logged.
+    """
+
+    async def run():
+        return [data async for data in broadcaster.listen(10)]
+
+    with _mock_client(FakePubSub(error=ConnectionError)):
+        assert asyncio.run(run()) == []
+
+    assert broadcaster.listener is None
+    assert "Changes of the task list are not available" in caplog.text
@@ -1,18 +1,22 @@
+from unittest.mock import patch
+
 import pytest
+from django.utils import timezone
 from mongoengine.errors import ValidationError
-from todo_app.todo.models import Location, Task, Weather
+from todo_app.todo.models import Location, Task, Weather, WeatherCell
+from todo_app.todo.version import TaskListVersion
 
 
 def test_creating_task():
     """
-    Given a task content, location and weather defined
+    Given a task content and location defined
     When we create a task using that data
-    Then the task with correct data is created.
+    Then the task with correct data is created
+    And the key of its geo cell is set.
     """
     task = Task.objects.create(
         content="sample task",
-        location=Location(lat=0, lon=0, label="sample location"),
-        weather=Weather(main="Snow", temperature=0.0),
+        location=Location(lat=51.5085, lon=-0.1257, label="sample location"),
     )
 
     assert task.id is not None
@@ -21,10 +25,42 @@ def test_creating_task():
 
     assert new_task.content == "sample task"
     assert new_task.created_at is not None
-    assert new_task.location.lat == 0
-    assert new_task.location.lon == 0
+    assert new_task.location.lat == 51.5085
+    assert new_task.location.lon == -0.1257
     assert new_task.location.label == "sample location"
-    assert new_task.weather.main == "Snow"
+    assert new_task.cell_key == "51.51:-0.13"
+
+
+def test_saving_task_changes_list_version(task):
+    """
+    Given a task
+    When we save it
+    Then the version of the task list is changed.
+    """
+    with patch.object(TaskListVersion, "bump") as mock_bump:
+        task.save()
+
+    mock_bump.assert_called_once_with()
+
+
+def test_saving_task_creates_weather_cell():
+    """
+    Given an active and a finished task in geo cells that don't exist yet
+    When we save them
+    Then the cell of the active task is created without weather
+    And the cell of the finished task is not created.
+    """
+    Task.objects.create(
+        content="active task", location=Location(lat=1, lon=2, label="Active")
+    )
+    Task.objects.create(
+        content="finished task",
+        location=Location(lat=3, lon=4, label="Finished"),
+        marked_as_done_at=timezone.now(),
+    )
+
+    (cell,) = WeatherCell.objects.all()
+    assert (cell.key, cell.lat, cell.lon, cell.weather) == ("1.00:2.00", 1, 2, None)
 
 
 def test_creating_task_without_location():
@@ -34,36 +70,46 @@ def test_creating_task_without_location():
     Then a ValidationError is raised.
     """
     with pytest.raises(ValidationError):
-        Task.objects.create(
-            content="sample task",
-            weather=Weather(main="Snow", temperature=0.0),
-        )
+        Task.objects.create(content="sample task")
 
 
-def test_creating_task_without_weather():
+def test_loading_task_with_embedded_weather():
     """
-    Given a task content and location defined
-    When we create a task using that data
-    Then the task with correct data is created
-    And the weather is not defined in the task.
+    Given a task stored with the weather embedded by the previous versions
+    When we load the task
+    Then the embedded weather is ignored.
     """
     task = Task.objects.create(
         content="sample task",
         location=Location(lat=0, lon=0, label="sample location"),
     )
-
-    assert task.id is not None
+    Task._get_collection().update_one(
+        {"_id": task.id}, {"$set": {"weather": {"main": "Snow", "temperature": 0.0}}}
+    )
 
     new_task = Task.objects.get(id=task.id)
 
     assert new_task.content == "sample task"
-    assert new_task.created_at is not None
-    assert new_task.location.lat == 0
-    assert new_task.location.lon == 0
-    assert new_task.location.label == "sample location"
     assert new_task.weather is None
 
 
+def test_task_cell_key_changes_with_location():
+    """
+    Given a task
+    When we change its location
+    Then the key of its geo cell is updated.
+    """
+    task = Task.objects.create(
+        content="sample task",
+        location=Location(lat=0, lon=0, label="sample location"),
+    )
+
+    task.location = Location(lat=52.2297, lon=21.0122, label="Warsaw")
+    task.save()
+
+    assert task.reload().cell_key == "52.23:21.01"
+
+
 def test_task_created_at_changes_only_once():
     """
     Given a task
@@ -81,3 +127,54 @@ def test_task_created_at_changes_only_once():
     task.save()
 
     assert task.created_at == created_at
+
+
+def test_task_indexes():
+    """
+    Given the task collection
+    When we check its indexes
+    Then the index used by the weather refresh exists.
+    """
+    Task.ensure_indexes()
+
+    keys = [
+        index["key"] for index in Task._get_collection().index_information().values()
+    ]
+
+    assert [("marked_as_done_at", 1), ("cell_key", 1)] in keys
+
+
+def test_creating_weather_cell():
+    """
+    Given a cell key, coordinates and weather defined
+    When we create a geo cell using that data
+    Then the cell is stored with the key as its ID.
+    """
+    WeatherCell(
+        key="51.51:-0.13",
+        lat=51.51,
+        lon=-0.13,
+        weather=Weather(main="Snow", temperature=0.0),
+    ).save()
+
+    cell = WeatherCell.objects.get(key="51.51:-0.13")
+
+    assert (cell.lat, cell.lon) == (51.51, -0.13)
+    assert cell.weather.main == "Snow"
+    assert WeatherCell._get_collection().find_one({"_id": "51.51:-0.13"})
+
+
+def test_weather_cell_indexes():
+    """
+    Given the geo cell collection
+    When we check its indexes
+    Then the index used by the weather refresh exists.
+    """
+    WeatherCell.ensure_indexes()
+
+    keys = [
+        index["key"]
+        for index in WeatherCell._get_collection().index_information().values()
+    ]
+
+    assert [("weather.next_refresh_at", 1)] in keys
@@ -0,0 +1,180 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from django.core import signing
+from mongoengine.queryset import QuerySet
+from todo_app.todo.models import Location, Task
+from todo_app.todo.pagination import KeysetPaginator
+
+CREATED_AT = datetime(2024, 1, 1, 12, 0)
+
+
+def _create_tasks(count: int, step: timedelta = timedelta(minutes=1)) -> list[str]:
+    """Create tasks the given time apart and return their contents, newest first."""
+    for index in range(count):
+        Task.objects.create(
+            content=f"Task {index}",
+            location=Location(lat=index, lon=index, label=f"Location {index}"),
+            created_at=CREATED_AT + index * step,
+        )
+    return [task.content for task in Task.objects.order_by("-created_at", "-id")]
+
+
+def _get_paginator(page_size: int = 2) -> KeysetPaginator:
+    """Return the paginator of all the tasks by their creation time."""
+    return KeysetPaginator(Task.objects.all(), "created_at", page_size)
+
+
+def _get_contents(page) -> list[str]:
+    """Return the contents of the tasks on the page."""
+    return [task.content for task in page.items]
+
+
+@pytest.mark.parametrize("step", (timedelta(minutes=1), timedelta(0)))
+def test_get_page(step):
+    """
+    Given tasks, created at different times or at the same time
+    When we page through them forwards and backwards with the cursors
+    Then each task is on exactly one page, newest first
+    And the cursors point to the neighbouring pages only if they exist.
+    """
+    contents = _create_tasks(5, step)
+    paginator = _get_paginator()
+
+    first = paginator.get_page()
+    second = paginator.get_page(first.next_cursor)
+    third = paginator.get_page(second.next_cursor)
+
+    assert [_get_contents(page) for page in (first, second, third)] == [
+        contents[:2],
+        contents[2:4],
+        contents[4:],
+    ]
+    assert first.prev_cursor is None
+    assert third.next_cursor is None
+
+    second_again = paginator.get_page(third.prev_cursor)
+    first_again = paginator.get_page(second_again.prev_cursor)
+
+    assert _get_contents(second_again) == contents[2:4]
+    assert _get_contents(first_again) == contents[:2]
+    assert first_again.prev_cursor is None
+    assert paginator.get_page(second_again.next_cursor).items == third.items
+
+
+def test_get_page_with_a_new_task():
+    """
+    Given a page of the tasks
+    When a new task is created
+    And we go back to the previous page
+    Then the new task is not moved to the current page.
+    """
+    contents = _create_tasks(4)
+    paginator = _get_paginator()
+    second = paginator.get_page(paginator.get_page().next_cursor)
+
+    Task.objects.create(
+        content="New task",
+        location=Location(lat=0, lon=0, label="Location"),
+        created_at=CREATED_AT + timedelta(hours=1),
+    )
+    first = paginator.get_page(second.prev_cursor)
+
+    assert _get_contents(first) == contents[:2]
+    assert _get_contents(paginator.get_page(first.prev_cursor)) == ["New task"]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    (
+        "incorrect-cursor",
+        signing.dumps(
+            ["next", "2024-01-01T12:01:00", "0" * 24], salt="todo.pagination.other"
+        ),
+        signing.dumps(["next", "incorrect-time"], salt="todo.pagination.created_at"),
+    ),
+)
+def test_get_page_with_incorrect_cursor(cursor):
+    """
+    Given tasks
+    When we get the page with an incorrect cursor or the cursor of another field
+    Then the first page is returned.
+    """
+    contents = _create_tasks(3)
+
+    result = _get_paginator().get_page(cursor)
+
+    assert _get_contents(result) == contents[:2]
+    assert result.prev_cursor is None
+
+
+def test_get_page_after_tasks_are_removed():
+    """
+    Given the cursor of the last page of the tasks
+    When the tasks on that page are removed
+    Then the first page is returned for the cursor.
+    """
+    contents = _create_tasks(3)
+    paginator = _get_paginator()
+    cursor = paginator.get_page().next_cursor
+    Task.objects.filter(content=contents[-1]).delete()
+
+    assert _get_contents(paginator.get_page(cursor)) == contents[:2]
+
+
+def test_get_page_without_tasks():
+    """
+    Given no tasks
+    When we get the first page
+    Then the page is empty and there are no other pages.
+    """
+    result = _get_paginator().get_page()
+
+    assert result.items == []
+    assert result.next_cursor is None
+    assert result.prev_cursor is None
+
+
+def test_get_page_reads_only_the_page():
+    """
+    Given many tasks
+    When we get a page after the first one
+    Then only the tasks on the page and one more are read
+    And the previous tasks are not skipped over.
+    """
+    _create_tasks(10)
+    paginator = _get_paginator(3)
+    cursor = paginator.get_page().next_cursor
+
+    with patch.object(
+        QuerySet, "limit", autospec=True, side_effect=QuerySet.limit
+    ) as mock_limit, patch.object(QuerySet, "skip", autospec=True) as mock_skip:
+        result = paginator.get_page(cursor)
+
+    assert len(result.items) == 3
+    assert [call.args[1] for call in mock_limit.call_args_list] == [4]
+    mock_skip.assert_not_called()
+
+
+def test_get_page_from_stages():
+    """
+    Given tasks
+    When we page through them with the aggregation stages of the pages
+    Then the pages are the same as the ones read by the paginator itself.
+    """
+    _create_tasks(5)
+    paginator = _get_paginator()
+    collection = Task._get_collection()
+
+    cursor = None
+    for _ in range(3):
+        documents = [
+            Task._from_son(document)
+            for document in collection.aggregate(paginator.get_stages(cursor))
+        ]
+        page = paginator.get_page_from(cursor, documents)
+
+        assert page == paginator.get_page(cursor)
+        cursor = page.next_cursor
+    assert cursor is None
@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+from unittest.mock import call, patch
+
+from redis.exceptions import ConnectionError
+from todo_app.todo.version import TaskListVersion
+
+
+def test_get(cache_client):
+    """
+    Given the stored version of the task list
+    When we get the version
+    Then the version and the time of the last change are returned.
+    """
+    cache_client.hmget.return_value = ["abc", "1704110400.5"]
+
+    result = TaskListVersion().get()
+
+    assert result == ("abc", datetime(2024, 1, 1, 12, 0, 0, 500000, timezone.utc))
+    cache_client.hmget.assert_called_once_with(
+        TaskListVersion.key, ["token", "changed_at"]
+    )
+    cache_client.pipeline.assert_not_called()
+
+
+@patch("time.time", return_value=1704110400.0)
+@patch("uuid.uuid4")
+def test_get_without_version(mock_uuid4, mock_time, cache_client, settings):
+    """
+    Given no stored version of the task list
+    When we get the version
+    Then a new version is stored with the configured timeout and returned.
+    """
+    settings.TASK_LIST_VERSION_TIMEOUT = 60
+    mock_uuid4.return_value.hex = "abc"
+    pipe = cache_client.pipeline.return_value
+
+    result = TaskListVersion().get()
+
+    assert result == ("abc", datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc))
+    assert pipe.mock_calls == [
+        call.hset(
+            TaskListVersion.key,
+            mapping={"token": "abc", "changed_at": "1704110400.0"},
+        ),
+        call.expire(TaskListVersion.key, 60),
+        call.execute(),
+    ]
+
+
+def test_bump(cache_client):
+    """
+    Given the stored version of the task list
+    When we bump the version
+    Then a new version is stored.
+    """
+    pipe = cache_client.pipeline.return_value
+
+    TaskListVersion().bump()
+
+    (hset_call,) = pipe.hset.call_args_list
+    assert len(hset_call.kwargs["mapping"]["token"]) == 32
+    pipe.execute.assert_called_once_with()
+
+
+def test_cache_not_available(cache_client, caplog):
+    """
+    Given the cache that is not available
+    When we get and bump the version of the task list
+    Then no version is returned
+    And warnings are logged.
+    """
+    cache_client.hmget.side_effect = ConnectionError
+    cache_client.pipeline.side_effect = ConnectionError
+
+    assert TaskListVersion().get() is None
+    TaskListVersion().bump()
+
+    assert "Version of the task list is not available" in caplog.text
+    assert "Version of the task list has not been changed" in caplog.text
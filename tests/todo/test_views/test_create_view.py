@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import pytest
 from django.urls import reverse
 from todo_app.todo.models import Task
@@ -5,11 +7,15 @@ from todo_app.todo.models import Task
 URL = reverse("todo:task-create")
 
 
-def test_task_created_successfully(client):
+@patch("todo_app.todo.views.create.publish_task_change")
+@patch("todo_app.todo.views.create.dispatch_weather_prefetch")
+def test_task_created_successfully(mock_dispatch, mock_publish, client):
     """
     Given correct task data
     When we perform a POST request using the data and a valid URL
     Then a new task is created
+    And the prefetch of its weather is queued
+    And the new task is published to the task lists
     And the user is redirected to the list of tasks.
     """
     assert not Task.objects.all()
@@ -32,6 +38,8 @@ def test_task_created_successfully(client):
     assert task.location.lat == 1.0
     assert task.location.lon == 2.0
     assert task.location.label == "Sample location"
+    mock_dispatch.assert_called_once_with(str(task.id))
+    mock_publish.assert_called_once_with(task)
 
 
 def test_with_no_content(client):
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import pytest
 from django.urls import reverse
 from todo_app.todo.models import Task
@@ -5,12 +7,17 @@ from todo_app.todo.models import Task
 URL_PATH = "todo:task-edit"
 
 
-def test_task_updated_successfully(client, task):
+@patch("todo_app.todo.views.edit.publish_task_change")
+@patch("todo_app.todo.views.edit.dispatch_weather_prefetch")
+def test_task_updated_successfully(mock_dispatch, mock_publish, client, task):
     """
     Given an existing task
-    And correct task data
+    And correct task data with a location in another geo cell
     When we perform a POST request using the data and a valid URL
     Then the task is updated
+    And it's moved to the other geo cell
+    And the prefetch of the weather is queued
+    And the updated task is published to the task lists
     And the user is redirected to the list of tasks.
     """
     assert Task.objects.count() == 1
@@ -36,6 +43,40 @@ def test_task_updated_successfully(client, task):
     assert updated_task.location.lat == 1.0
     assert updated_task.location.lon == 2.0
     assert updated_task.location.label == "Sample location"
+    assert updated_task.cell_key == "1.00:2.00"
+    mock_dispatch.assert_called_once_with(str(task.id))
+    mock_publish.assert_called_once_with(updated_task)
+
+
+@patch("todo_app.todo.views.edit.dispatch_weather_prefetch")
+def test_task_updated_with_same_location(mock_dispatch, client, task):
+    """
+    Given an existing task
+    And correct task data with nearby coordinates in the same geo cell
+    When we perform a POST request using the data and a valid URL
+    Then the task is updated
+    And it stays in the same geo cell
+    And the prefetch of the weather is not queued.
+    """
+    url = reverse(URL_PATH, kwargs={"task_id": str(task.id)})
+
+    response = client.post(
+        url,
+        data={
+            "task_id": task.id,
+            "content": "sample task",
+            "location": "10.001::20.001::New label",
+        },
+    )
+
+    assert response.status_code == 302
+
+    updated_task = Task.objects.first()
+
+    assert updated_task.content == "sample task"
+    assert updated_task.location.label == "New label"
+    assert updated_task.cell_key == task.cell_key
+    mock_dispatch.assert_not_called()
 
 
 def test_with_no_content(client, task):
@@ -0,0 +1,174 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from django.http import Http404
+from django.test import AsyncRequestFactory, RequestFactory
+from django.urls import reverse
+from todo_app.core.middleware import DISCONNECTED_KEY
+from todo_app.todo.events import EventBroadcaster
+from todo_app.todo.views import task_events_view
+
+URL = reverse("todo:task-events")
+
+
+def _get_request(data=None):
+    """Return an ASGI request served through DisconnectMiddleware."""
+    request = AsyncRequestFactory().get(URL, data)
+    request.scope[DISCONNECTED_KEY] = asyncio.Event()
+    return request
+
+
+async def _read(response):
+    return [chunk async for chunk in response.streaming_content]
+
+
+def test_without_events(client, settings):
+    """
+    Given the changes that are not pushed to the task lists
+    When we get a response from the view with the changes
+    Then 404 is returned.
+    """
+    settings.TASK_EVENTS = False
+
+    response = client.get(URL)
+
+    assert response.status_code == 404
+
+
+def test_without_asgi(settings):
+    """
+    Given the changes that are pushed to the task lists
+    And a request that is not served by an ASGI server
+    When we get a response from the view with the changes
+    Then 404 is returned.
+    """
+    settings.TASK_EVENTS = True
+
+    with pytest.raises(Http404):
+        asyncio.run(task_events_view(RequestFactory().get(URL)))
+
+
+def test_with_events(settings):
+    """
+    Given the changes that are pushed to the task lists
+    When we get a response from the view with the changes
+    Then the changes are streamed as Server-Sent Events
+    And the stream is kept alive while there are no changes.
+    """
+    settings.TASK_EVENTS = True
+
+    async def listen(self, timeout):
+        yield '{"type": "weather"}'
+        yield None
+
+    async def run():
+        response = await task_events_view(_get_request())
+        return response, await _read(response)
+
+    with patch.object(EventBroadcaster, "listen", listen):
+        response, chunks = asyncio.run(run())
+
+    assert response["Content-Type"] == "text/event-stream"
+    assert response["Cache-Control"] == "no-cache"
+    assert response["X-Accel-Buffering"] == "no"
+    assert chunks == [
+        b"retry: 5000\n\n",
+        b'data: {"type": "weather"}\n\n',
+        b": keepalive\n\n",
+    ]
+
+
+def test_with_disconnected_client(settings):
+    """
+    Given the changes that are pushed to the task lists
+    When the client disconnects from the stream of the changes
+    Then the stream ends with the next change or keepalive
+    And the changes are no longer listened to.
+    """
+    settings.TASK_EVENTS = True
+    closed = []
+
+    async def listen(self, timeout):
+        try:
+            while True:
+                yield None
+        finally:
+            closed.append(True)
+
+    async def run():
+        request = _get_request()
+        response = await task_events_view(request)
+        chunks = []
+        async for chunk in response.streaming_content:
+            chunks.append(chunk)
+            if len(chunks) == 2:
+                request.scope[DISCONNECTED_KEY].set()
+        return chunks
+
+    with patch.object(EventBroadcaster, "listen", listen):
+        chunks = asyncio.run(run())
+
+    assert chunks == [b"retry: 5000\n\n", b": keepalive\n\n"]
+    assert closed == [True]
+
+
+@pytest.mark.parametrize(
+    "view_timeout, expected_calls",
+    ((0, [["10.00:20.00", "-1.00:2.50"]] * 2), (300, [])),
+)
+def test_with_viewed_cells(settings, view_timeout, expected_calls):
+    """
+    Given the changes that are pushed to the task lists
+    And the keys of the viewed geo cells given in the query, some of them invalid
+    When the changes are streamed
+    Then the valid cells are marked as viewed again halfway through the view timeout.
+    """
+    settings.TASK_EVENTS = True
+    settings.WEATHER_CELL_PRECISION = 2
+    settings.WEATHER_VIEW_TIMEOUT = view_timeout
+    cell_keys = ["10.00:20.00", "-1.00:2.50", "1:2", "a:b", "1.00:2.00:3.00"]
+    calls = []
+
+    async def listen(self, timeout):
+        yield None
+        yield '{"type": "weather"}'
+
+    async def run():
+        response = await task_events_view(_get_request({"cell": cell_keys}))
+        return await _read(response)
+
+    with patch.object(EventBroadcaster, "listen", listen), patch(
+        "todo_app.todo.views.events.record_cell_views", calls.append
+    ):
+        asyncio.run(run())
+
+    assert calls == expected_calls
+
+
+def test_with_too_many_viewed_cells(settings):
+    """
+    Given the changes that are pushed to the task lists
+    And the keys of more viewed geo cells than the tasks on a page
+    When the changes are streamed
+    Then only as many cells as the tasks on a page are marked as viewed.
+    """
+    settings.TASK_EVENTS = True
+    settings.TASK_PAGE_SIZE = 2
+    settings.WEATHER_CELL_PRECISION = 2
+    settings.WEATHER_VIEW_TIMEOUT = 0
+    calls = []
+
+    async def listen(self, timeout):
+        yield None
+
+    async def run():
+        request = _get_request({"cell": ["1.00:1.00", "2.00:2.00", "3.00:3.00"]})
+        return await _read(await task_events_view(request))
+
+    with patch.object(EventBroadcaster, "listen", listen), patch(
+        "todo_app.todo.views.events.record_cell_views", calls.append
+    ):
+        asyncio.run(run())
+
+    assert calls == [["1.00:1.00", "2.00:2.00"]]
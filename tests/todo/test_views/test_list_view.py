@@ -1,5 +1,16 @@
+import asyncio
+from contextlib import ExitStack
+from unittest.mock import patch
+
 import pytest
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import urlencode
+from mongomock.collection import Collection
+from redis.exceptions import ConnectionError
+from todo_app.todo.models import Task
+
+QUERY_METHODS = ("find", "find_one", "aggregate", "count_documents")
 
 URL = reverse("todo:task-list")
 
@@ -100,3 +111,221 @@ def test_without_tasks(client):
 
     assert "Finished tasks" not in content
     assert not response.context_data["finished_tasks"]
+
+
+@pytest.mark.usefixtures("create_active_tasks")
+@pytest.mark.usefixtures("create_finished_tasks")
+def test_records_views_of_active_tasks(client, cache_client):
+    """
+    Given active and finished tasks exist
+    When we get a response from the task list view
+    Then the cells of the active tasks are marked as viewed.
+    """
+    client.get(URL)
+
+    viewed_keys = {
+        call.args[0] for call in cache_client.pipeline.return_value.set.call_args_list
+    }
+    assert viewed_keys == {
+        f"weather:viewed:{index}.00:{index}.00" for index in range(5)
+    }
+
+
+@pytest.mark.usefixtures("create_active_tasks")
+@pytest.mark.usefixtures("create_finished_tasks")
+def test_with_weather_of_cells(client):
+    """
+    Given active and finished tasks in geo cells with weather
+    When we get a response from the task list view
+    Then the weather of the cells is displayed for all the tasks.
+    """
+    response = client.get(URL)
+
+    tasks = (
+        response.context_data["active_tasks"] + response.context_data["finished_tasks"]
+    )
+    assert all(task.weather.main == "Snow" for task in tasks)
+    assert str(response.content).count(", Snow") == 10
+
+
+@pytest.mark.usefixtures("create_active_tasks")
+@pytest.mark.usefixtures("create_finished_tasks")
+def test_with_pages_of_tasks(client, settings):
+    """
+    Given active and finished tasks exist
+    When we get the pages of the task list view
+    Then the active and finished tasks are paginated separately
+    And the cursor of the other list is kept in the links to the pages.
+    """
+    settings.TASK_PAGE_SIZE = 2
+
+    response = client.get(URL)
+
+    active_page = response.context_data["active_page"]
+    finished_page = response.context_data["finished_page"]
+    assert len(response.context_data["active_tasks"]) == 2
+    assert len(response.context_data["finished_tasks"]) == 2
+    assert active_page["prev_url"] is None
+    assert "Older" in str(response.content)
+
+    response = client.get(URL + finished_page["next_url"])
+    response = client.get(URL + response.context_data["active_page"]["next_url"])
+
+    assert response.request["QUERY_STRING"].startswith("finished=")
+    assert [task.content for task in response.context_data["active_tasks"]] == [
+        "Sample task 2",
+        "Sample task 1",
+    ]
+    assert [task.content for task in response.context_data["finished_tasks"]] == [
+        "Finished task 2",
+        "Finished task 1",
+    ]
+    assert response.context_data["finished_page"]["prev_url"] is not None
+
+
+@pytest.mark.usefixtures("create_active_tasks")
+@pytest.mark.usefixtures("create_finished_tasks")
+def test_with_single_query(client, settings):
+    """
+    Given active and finished tasks exist
+    When we get a page of the task list view
+    Then the tasks of both lists and their weather are read with a single query.
+    """
+    settings.TASK_PAGE_SIZE = 2
+    calls = []
+    nested = []
+
+    def patch_method(name):
+        method = getattr(Collection, name)
+
+        def wrapper(self, *args, **kwargs):
+            # The in-memory document store runs some queries with other ones.
+            if not nested:
+                calls.append((self.name, name))
+            nested.append(name)
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                nested.pop()
+
+        return patch.object(Collection, name, wrapper)
+
+    cursor = client.get(URL).context_data["active_page"]["next_url"]
+    with ExitStack() as stack:
+        for name in QUERY_METHODS:
+            stack.enter_context(patch_method(name))
+        response = client.get(URL + cursor)
+
+    assert calls == [("task", "aggregate")]
+    assert [task.content for task in response.context_data["active_tasks"]] == [
+        "Sample task 2",
+        "Sample task 1",
+    ]
+    assert [task.content for task in response.context_data["finished_tasks"]] == [
+        "Finished task 4",
+        "Finished task 3",
+    ]
+    assert all(
+        task.weather is not None
+        for name in ("active_tasks", "finished_tasks")
+        for task in response.context_data[name]
+    )
+
+
+@pytest.mark.usefixtures("create_active_tasks")
+def test_with_stale_cursor(client, settings):
+    """
+    Given active tasks exist
+    And a cursor of a page whose tasks have been finished since
+    When we get the page of the task list view
+    Then the first page of the active tasks is returned.
+    """
+    settings.TASK_PAGE_SIZE = 3
+    cursor = client.get(URL).context_data["active_page"]["next_url"]
+    for task in Task.objects.order_by("created_at")[:2]:
+        task.marked_as_done_at = timezone.now()
+        task.save()
+
+    response = client.get(URL + cursor)
+
+    assert len(response.context_data["active_tasks"]) == 3
+    assert response.context_data["active_page"]["prev_url"] is None
+    assert len(response.context_data["finished_tasks"]) == 2
+
+
+@pytest.mark.usefixtures("create_active_tasks")
+def test_with_unchanged_version(client, cache_client):
+    """
+    Given active tasks exist
+    And the version of the task list that has not changed since the last request
+    When we get the task list view again
+    Then "304 Not Modified" is returned without reading the tasks.
+    """
+    cache_client.hmget.return_value = ["abc", "1704110400.0"]
+    response = client.get(URL)
+
+    assert response.status_code == 200
+    assert response["ETag"] == '"abc"'
+    assert response["Last-Modified"] == "Mon, 01 Jan 2024 12:00:00 GMT"
+
+    with patch.object(Collection, "aggregate") as mock_aggregate:
+        response = client.get(URL, HTTP_IF_NONE_MATCH='"abc"')
+        modified_response = client.get(
+            URL, HTTP_IF_MODIFIED_SINCE="Mon, 01 Jan 2024 12:00:00 GMT"
+        )
+
+    assert response.status_code == 304
+    assert modified_response.status_code == 304
+    mock_aggregate.assert_not_called()
+
+    response = client.get(URL, HTTP_IF_NONE_MATCH='"def"')
+
+    assert response.status_code == 200
+    assert len(response.context_data["active_tasks"]) == 5
+
+
+@pytest.mark.usefixtures("create_active_tasks")
+def test_without_version(client, cache_client):
+    """
+    Given active tasks exist
+    And the cache that is not available
+    When we get the task list view
+    Then the list is returned without its version.
+    """
+    cache_client.hmget.side_effect = ConnectionError
+
+    response = client.get(URL, HTTP_IF_NONE_MATCH='"abc"')
+
+    assert response.status_code == 200
+    assert "ETag" not in response
+    assert "Last-Modified" not in response
+    assert len(response.context_data["active_tasks"]) == 5
+
+
+@pytest.mark.usefixtures("create_active_tasks")
+@pytest.mark.parametrize(
+    "task_events, disconnected, expected_streamed",
+    ((True, asyncio.Event(), True), (True, None, False), (False, None, False)),
+)
+def test_with_events(client, settings, task_events, disconnected, expected_streamed):
+    """
+    Given the changes that are or are not pushed to the task lists
+    And the list that is or is not served by an ASGI server
+    When we get a response from the task list view
+    Then the list listens to the changes if they're pushed and it's served by ASGI
+    And the stream of the changes marks the cells of the active tasks as viewed
+    And otherwise the list is reloaded every minute.
+    """
+    settings.TASK_EVENTS = task_events
+
+    with patch("todo_app.todo.views.list.get_disconnected", return_value=disconnected):
+        response = client.get(URL)
+
+    content = response.content.decode()
+    assert ("listenToTaskEvents('/todo/events/?cell" in content) is expected_streamed
+    assert ('http-equiv="refresh"' in content) is not expected_streamed
+    if expected_streamed:
+        cell_keys = [task.cell_key for task in response.context_data["active_tasks"]]
+        assert response.context_data["task_events_url"] == (
+            f"/todo/events/?{urlencode({'cell': cell_keys}, doseq=True)}"
+        )
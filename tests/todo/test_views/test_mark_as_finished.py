@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import pytest
 from django.urls import reverse
 from todo_app.todo.models import Task
@@ -5,11 +7,13 @@ from todo_app.todo.models import Task
 URL_PATH = "todo:mark-task-as-finished"
 
 
-def test_task_marked_as_finished_successfully(client, task):
+@patch("todo_app.todo.views.mark_as_finished.publish_task_change")
+def test_task_marked_as_finished_successfully(mock_publish, client, task):
     """
     Given a correct task ID
     When we perform a GET request using the ID and a valid URL
     Then the task is marked as finished
+    And the task is published to the task lists
     And the user is redirected to the list of tasks.
     """
     task.marked_as_done_at = None
@@ -25,6 +29,7 @@ def test_task_marked_as_finished_successfully(client, task):
     updated_task = Task.objects.get(id=task.id)
 
     assert updated_task.marked_as_done_at is not None
+    mock_publish.assert_called_once_with(updated_task)
 
 
 def test_with_incorrect_task_id(client):